@@ -1,7 +1,12 @@
+import functools
 import os
 import sys
+from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
+import requests
+from sqlalchemy import event
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 WEB_DIR = os.path.join(BASE_DIR, "web")
@@ -9,37 +14,125 @@ WEB_DIR = os.path.join(BASE_DIR, "web")
 if WEB_DIR not in sys.path:
     sys.path.insert(0, WEB_DIR)
 
+from app import create_app as _create_app  # noqa: E402
+from app import db  # noqa: E402
+from app.config import get_config, load_chart_config  # noqa: E402
+
+
+_APP_ENV_PREFIXES = ("DATABASE_URL", "COINGECKO_", "PROPHET_", "RNN_")
+
+
+def _app_env_key() -> frozenset:
+    return frozenset(
+        (key, value)
+        for key, value in os.environ.items()
+        if key.startswith(_APP_ENV_PREFIXES)
+    )
+
+
+# init_db rebinds module-level engine/session globals, so only one app can be
+# live per process; later requests for the same environment reuse it.
+@functools.lru_cache(maxsize=1)
+def _cached_app(env_key: frozenset):
+    get_config(reload=True)
+    return _create_app()
+
+
+# Session scope is per process, so each pytest-xdist worker builds its own
+# app and in-memory database and no cross-worker locking is needed.
+@pytest.fixture(scope="session")
+def _base_app():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+        app = _cached_app(_app_env_key())
+    app.config.update(
+        TESTING=True,
+        WTF_CSRF_ENABLED=False,
+        SECRET_KEY="test-secret",
+        PASSWORD_HASH_METHOD="pbkdf2:sha256:1",
+        COINGECKO_BASE_URL="https://api.coingecko.com/api/v3",
+        COINGECKO_VS_CURRENCY="usd",
+        MAX_HISTORY_DAYS=365,
+        COINGECKO_REQUEST_DELAY=0.0,
+        COINGECKO_RETRY_COUNT=0,
+        COINGECKO_RETRY_DELAY=0.0,
+        PROPHET_FUTURE_DAYS=0,
+        RNN_FUTURE_DAYS=0,
+    )
+    # The views read a snapshot of these settings built by create_app.
+    app.extensions["chart_config"] = load_chart_config(app.config)
+
+    engine = db.get_engine()
+
+    # pysqlite defers BEGIN, which would turn the per-test SAVEPOINT into the
+    # outermost transaction; emit BEGIN ourselves so rollbacks stay isolated.
+    # StaticPool keeps a single connection, so configure it in place. An
+    # in-memory database already journals in memory; durability is not needed.
+    with engine.connect() as connection:
+        dbapi_connection = connection.connection.driver_connection
+        dbapi_connection.isolation_level = None
+        dbapi_connection.execute("PRAGMA synchronous=OFF")
+        dbapi_connection.execute("PRAGMA temp_store=MEMORY")
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
 
-@pytest.fixture()
-def app(tmp_path, monkeypatch):
-    db_path = tmp_path / "test.db"
-    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
-    monkeypatch.setenv("FLASK_SECRET_KEY", "test-secret")
-    monkeypatch.setenv("COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3")
-    monkeypatch.setenv("COINGECKO_VS_CURRENCY", "usd")
-    monkeypatch.setenv("MAX_HISTORY_DAYS", "365")
-    monkeypatch.setenv("COINGECKO_REQUEST_DELAY", "0")
-    monkeypatch.setenv("COINGECKO_RETRY_COUNT", "0")
-    monkeypatch.setenv("COINGECKO_RETRY_DELAY", "0")
-    monkeypatch.setenv("PROPHET_FUTURE_DAYS", "0")
-    monkeypatch.setenv("RNN_FUTURE_DAYS", "0")
-
-    from app import create_app
-
-    app = create_app()
-    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
     return app
 
 
+@pytest.fixture()
+def db_session(_base_app):
+    connection = db.get_engine().connect()
+    transaction = connection.begin()
+    db.SessionLocal.remove()
+    db.SessionLocal.configure(
+        bind=connection, join_transaction_mode="create_savepoint"
+    )
+    try:
+        yield db.SessionLocal()
+    finally:
+        db.SessionLocal.remove()
+        transaction.rollback()
+        connection.close()
+        db.SessionLocal.configure(bind=db.get_engine())
+
+
+@pytest.fixture()
+def app(_base_app, db_session):
+    from app.auth_utils import invalidate_user_cache, invalidate_user_cryptos
+    from app.routes import charts, dashboard
+
+    # Row ids restart after each rollback, so process-level caches keyed on
+    # them must not leak between tests.
+    invalidate_user_cache()
+    invalidate_user_cryptos()
+    dashboard.invalidate_dashboard_rows()
+    charts.invalidate_detail_data()
+    config = dict(_base_app.config)
+    yield _base_app
+    _base_app.config.clear()
+    _base_app.config.update(config)
+    _base_app.extensions["chart_config"] = load_chart_config(config)
+
+
 @pytest.fixture()
 def client(app):
     return app.test_client()
 
 
-@pytest.fixture()
-def user(app):
+@pytest.fixture(scope="session")
+def password_hash():
     from werkzeug.security import generate_password_hash
 
+    # A single PBKDF2 iteration: tests need a valid hash, not a slow one.
+    return generate_password_hash(
+        "Password123!", method="pbkdf2:sha256:1", salt_length=4
+    )
+
+
+@pytest.fixture()
+def user(app, password_hash):
     from app.db import get_session
     from app.models import User
 
@@ -47,12 +140,14 @@ def user(app):
         session = get_session()
         user = User(
             email="user@example.com",
-            password_hash=generate_password_hash("Password123!"),
+            password_hash=password_hash,
         )
         session.add(user)
+        session.flush()
+        # Read before commit expires the instance; avoids a refresh SELECT.
+        snapshot = SimpleNamespace(id=user.id, email=user.email)
         session.commit()
-        session.refresh(user)
-        return user
+        return snapshot
 
 
 @pytest.fixture()
@@ -62,3 +157,63 @@ def auth_client(client, user):
         data={"email": user.email, "password": "Password123!"},
     )
     return client
+
+
+@pytest.fixture(scope="session")
+def crypto_detail_js():
+    return Path(WEB_DIR, "app", "static", "js", "crypto_detail.js").read_text()
+
+
+class FakeResponse:
+    def __init__(self, status_code, json_data=None, ok=None):
+        self.status_code = status_code
+        self._json_data = json_data or {}
+        self.ok = ok if ok is not None else 200 <= status_code < 300
+
+    def json(self):
+        return self._json_data
+
+
+@pytest.fixture()
+def fake_http(monkeypatch):
+    def install(module, status_code, json_data=None, ok=None):
+        response = FakeResponse(status_code, json_data=json_data, ok=ok)
+        fake = SimpleNamespace(
+            RequestException=requests.RequestException, last_kwargs={}
+        )
+
+        def get(*args, **kwargs):
+            fake.last_kwargs = kwargs
+            return response
+
+        fake.get = get
+        monkeypatch.setattr(f"app.services.{module}.requests", fake)
+        return fake
+
+    return install
+
+
+# Clients are stateless between calls; fake_http swaps the module-level
+# ``requests`` so the same instances can serve every test. Retries still run,
+# just without the back-off sleeps.
+@pytest.fixture(scope="session")
+def coincap_client():
+    from app.services.coincap import CoincapClient
+
+    return CoincapClient("https://coincap.test", retry_delay=0)
+
+
+@pytest.fixture(scope="session")
+def coingecko_client():
+    from app.services.coingecko import CoinGeckoClient
+
+    return CoinGeckoClient("https://api.coingecko.com/api/v3", retry_delay=0)
+
+
+@pytest.fixture(scope="session")
+def cryptocompare_client():
+    from app.services.cryptocompare import CryptoCompareClient
+
+    return CryptoCompareClient(
+        "https://min-api.cryptocompare.com/data/v2", retry_delay=0
+    )
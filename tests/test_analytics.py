@@ -1,6 +1,16 @@
+from datetime import date, timedelta
+
+import numpy as np
 import pytest
 
-from app.services.analytics import compute_ema_series
+from app.services.analytics import (
+    _ema_kernel,
+    compute_ema_series,
+    compute_indicators,
+    compute_price_indicators,
+    merge_prophet_forecast,
+    warm_indicator_kernels,
+)
 
 
 def test_compute_ema_series_recursion():
@@ -8,3 +18,80 @@ def test_compute_ema_series_recursion():
     result = compute_ema_series(values, 3)
     assert result[:2] == [None, None]
     assert result[2:] == pytest.approx([2.0, 3.0, 4.0])
+    assert compute_ema_series(np.array(values), 3) == result
+    assert compute_ema_series(np.array([]), 3) == []
+
+
+def test_warm_indicator_kernels_compiles_ema_period():
+    warm_indicator_kernels(ema_periods=(4,))
+    kernel = _ema_kernel(4)
+    # Without numba the kernel is plain Python and has nothing to compile.
+    assert getattr(kernel, "signatures", [None])
+
+
+def test_indicator_kernels_compile_from_explicit_signatures():
+    pytest.importorskip("numba")
+    from app.services import analytics
+
+    kernels = (
+        analytics._window_sums,
+        analytics._rolling_mean,
+        analytics._rolling_mean_std,
+        _ema_kernel(5),
+    )
+    # Compiled when decorated; calls never add a lazily compiled overload.
+    assert [len(kernel.signatures) for kernel in kernels] == [1, 1, 1, 1]
+    compute_price_indicators(np.arange(1.0, 60.0))
+    compute_ema_series(np.arange(1.0, 10.0), 5)
+    assert [len(kernel.signatures) for kernel in kernels] == [1, 1, 1, 1]
+
+
+def test_compute_indicators_basic():
+    start = date(2024, 1, 1)
+    rows = [
+        {"date": start + timedelta(days=offset), "price": float(offset + 1)}
+        for offset in range(25)
+    ]
+    result = compute_indicators(rows)
+
+    assert len(result) == 25
+    assert type(result[0]) is dict
+    assert result[0]["date"] == "2024-01-01"
+    assert result[0]["sma_7"] == pytest.approx(1.0)
+    assert result[6]["sma_7"] == pytest.approx(4.0)
+    assert result[10]["sma_7"] == pytest.approx(8.0)
+    assert result[18]["bb_upper"] is None
+    assert result[19]["sma_20"] == pytest.approx(10.5)
+    assert result[19]["std_20"] == pytest.approx(5.766281297335398)
+    assert result[19]["bb_upper"] == pytest.approx(10.5 + 2 * 5.766281297335398)
+    assert result[24]["sma_50"] == pytest.approx(13.0)
+
+    columns = compute_price_indicators(np.arange(1.0, 26.0))
+    assert "date" not in columns
+    assert columns["bb_upper"][19] == pytest.approx(result[19]["bb_upper"])
+
+
+def test_merge_prophet_forecast_appends_rows():
+    series = [
+        {"date": "2024-01-01", "price": 1.0, "sma_7": 1.0},
+        {"date": "2024-01-02", "price": 2.0, "sma_7": 1.5},
+    ]
+    forecast = [
+        {"date": "2024-01-02", "yhat": 2.1},
+        {"date": "2024-01-03", "yhat": 3.1},
+    ]
+    result = merge_prophet_forecast(series, forecast)
+
+    assert [row["date"] for row in result] == [
+        "2024-01-01",
+        "2024-01-02",
+        "2024-01-03",
+    ]
+    assert result[1]["price"] == 2.0
+    assert result[1]["yhat"] == 2.1
+    assert result[2] == {
+        "date": "2024-01-03",
+        "price": None,
+        "sma_7": None,
+        "yhat": 3.1,
+    }
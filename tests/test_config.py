@@ -0,0 +1,54 @@
+from app.config import (
+    _clean_base_url,
+    _coerce_float,
+    _coerce_int,
+    _load_from_env,
+    get_config,
+)
+
+
+def test_coerce_numbers():
+    assert _coerce_float("", 1.1) == 1.1
+    assert _coerce_float("-0.5", 1.1) == -0.5
+    assert _coerce_float("1e-3", 1.1) == 0.001
+    assert _coerce_float("1.-", 1.1) == 1.1
+    assert _coerce_int("7", 30) == 7
+    assert _coerce_int("-7", 30) == 30
+
+
+def test_load_from_env_reads_numbers(monkeypatch):
+    monkeypatch.setenv("COINCAP_RETRY_DELAY", " 2.5 ")
+    monkeypatch.setenv("RNN_FUTURE_DAYS", "abc")
+    monkeypatch.delenv("AUTH_CACHE_TTL", raising=False)
+
+    config = _load_from_env()
+
+    assert config.COINCAP_RETRY_DELAY == 2.5
+    assert config.RNN_FUTURE_DAYS == 30
+    assert config.AUTH_CACHE_TTL == 5.0
+
+
+def test_templates_auto_reload_only_set_from_env(monkeypatch):
+    monkeypatch.delenv("TEMPLATES_AUTO_RELOAD", raising=False)
+    assert _load_from_env().TEMPLATES_AUTO_RELOAD is None
+
+    monkeypatch.setenv("TEMPLATES_AUTO_RELOAD", "0")
+    assert _load_from_env().TEMPLATES_AUTO_RELOAD is False
+
+    monkeypatch.setenv("TEMPLATES_AUTO_RELOAD", "true")
+    assert _load_from_env().TEMPLATES_AUTO_RELOAD is True
+
+
+def test_clean_base_url():
+    assert _clean_base_url(" https://api.example.com/v3/?key=1#top ") == (
+        "https://api.example.com/v3"
+    )
+    assert _clean_base_url("https://api.example.com#a?b") == "https://api.example.com"
+    assert _clean_base_url("") == ""
+
+
+def test_config_is_process_singleton():
+    config = get_config()
+
+    assert get_config() is config
+    assert get_config(reload=True) is not config
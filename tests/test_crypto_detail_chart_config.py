@@ -1,21 +1,24 @@
 from datetime import date, timedelta
-from pathlib import Path
 
-from app.db import get_session
+from flask import g
+from sqlalchemy import update
+
+from app.db import bump_prices_version
 from app.models import Cryptocurrency, Price, ProphetForecast, UserCrypto
+from app.routes import charts
 
 
-def test_crypto_detail_includes_prophet_line_data(auth_client, app, user):
-    with app.app_context():
-        session = get_session()
-        crypto = Cryptocurrency(coingecko_id="btc", name="Bitcoin", symbol="btc")
-        session.add(crypto)
-        session.commit()
-        crypto_id = crypto.id
-        session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
-        cutoff_date = date.today() - timedelta(days=1)
-        session.add(Price(crypto_id=crypto.id, date=cutoff_date, price=1))
-        session.add(
+def test_crypto_detail_includes_prophet_line_data(auth_client, app, user, db_session):
+    session = db_session
+    crypto = Cryptocurrency(coingecko_id="btc", name="Bitcoin", symbol="btc")
+    session.add(crypto)
+    session.flush()
+    crypto_id = crypto.id
+    cutoff_date = date.today() - timedelta(days=1)
+    session.add_all(
+        [
+            UserCrypto(user_id=user.id, crypto_id=crypto.id),
+            Price(crypto_id=crypto.id, date=cutoff_date, price=1),
             ProphetForecast(
                 crypto_id=crypto.id,
                 date=cutoff_date,
@@ -24,39 +27,166 @@ def test_crypto_detail_includes_prophet_line_data(auth_client, app, user):
                 yhat_upper=1,
                 cutoff_date=cutoff_date,
                 horizon_days=30,
-            )
-        )
-        session.commit()
+            ),
+        ]
+    )
+    session.commit()
 
     response = auth_client.get(f"/cryptos/{crypto_id}")
     assert response.status_code == 200
-    expected_line = cutoff_date.isoformat()
     payload = response.get_data(as_text=True)
-    assert f'data-prophet-cutoff="{cutoff_date.isoformat()}"' in payload
-    assert f'data-prophet-line="{expected_line}"' in payload
+    data_url = f"/cryptos/{crypto_id}/data?days=365"
+    assert f'data-url="{data_url}"' in payload
+    assert f'<link rel="preload" href="{data_url}" as="fetch" crossorigin>' in payload
+    assert "data-prophet" not in payload
 
+    response = auth_client.get(f"/cryptos/{crypto_id}/data?days=365")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["prophet"] == {
+        "forecast": [
+            {
+                "date": cutoff_date.isoformat(),
+                "yhat": 1.0,
+                "yhat_lower": 1.0,
+                "yhat_upper": 1.0,
+            }
+        ],
+        "cutoff": cutoff_date.isoformat(),
+    }
+    assert data["lstm"] == {"forecast": [], "cutoff": None}
+    assert [row["price"] for row in data["series"]] == [1.0]
 
-def test_crypto_detail_defaults_to_one_year_range(auth_client, app, user):
-    with app.app_context():
-        session = get_session()
-        crypto = Cryptocurrency(
-            coingecko_id="eth", name="Ethereum", symbol="eth"
-        )
-        session.add(crypto)
-        session.commit()
-        crypto_id = crypto.id
-        session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
-        session.commit()
+
+def test_crypto_detail_data_revalidates_with_etag(auth_client, user, db_session):
+    session = db_session
+    crypto = Cryptocurrency(coingecko_id="ada", name="Cardano", symbol="ada")
+    session.add(crypto)
+    session.flush()
+    crypto_id = crypto.id
+    session.add_all(
+        [
+            UserCrypto(user_id=user.id, crypto_id=crypto.id),
+            Price(crypto_id=crypto.id, date=date.today(), price=2),
+        ]
+    )
+    session.commit()
+
+    response = auth_client.get(f"/cryptos/{crypto_id}/data")
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    cached = auth_client.get(
+        f"/cryptos/{crypto_id}/data", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.get_data() == b""
+    assert cached.headers["ETag"] == etag
+    assert auth_client.get("/cryptos/999999/data").status_code == 404
+
+
+def test_crypto_detail_page_revalidates_until_prices_change(
+    auth_client, user, db_session
+):
+    session = db_session
+    crypto = Cryptocurrency(coingecko_id="dot", name="Polkadot", symbol="dot")
+    session.add(crypto)
+    session.flush()
+    crypto_id = crypto.id
+    session.add_all(
+        [
+            UserCrypto(user_id=user.id, crypto_id=crypto.id),
+            Price(crypto_id=crypto.id, date=date.today(), price=2),
+        ]
+    )
+    session.commit()
+
+    etag = auth_client.get(f"/cryptos/{crypto_id}").headers["ETag"]
+    cached = auth_client.get(f"/cryptos/{crypto_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["Cache-Control"] == "private, no-cache"
+
+    # Rewriting today's close in place still changes the page.
+    session.execute(update(Price).where(Price.crypto_id == crypto_id).values(price=3))
+    bump_prices_version(session, [crypto_id])
+    session.commit()
+    fresh = auth_client.get(f"/cryptos/{crypto_id}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+
+
+def test_crypto_detail_page_etag_tracks_template_version(
+    auth_client, app, user, db_session, monkeypatch
+):
+    session = db_session
+    crypto = Cryptocurrency(coingecko_id="link", name="Chainlink", symbol="link")
+    session.add(crypto)
+    session.flush()
+    crypto_id = crypto.id
+    session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
+    session.commit()
+
+    etag = auth_client.get(f"/cryptos/{crypto_id}").headers["ETag"]
+    assert len(app.extensions["charts.page_version"]) == 16
+
+    # A release with different templates must not answer 304.
+    monkeypatch.setitem(app.extensions, "charts.page_version", "next-release")
+    fresh = auth_client.get(f"/cryptos/{crypto_id}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+
+
+def test_detail_page_state_returns_latest_window_closes(app, user, db_session):
+    session = db_session
+    crypto = Cryptocurrency(coingecko_id="sol", name="Solana", symbol="sol")
+    empty = Cryptocurrency(coingecko_id="xrp", name="XRP", symbol="xrp")
+    session.add_all([crypto, empty])
+    session.flush()
+    today = date.today()
+    session.add_all(
+        [
+            Price(crypto_id=crypto.id, date=today - timedelta(days=offset), price=offset)
+            for offset in range(3)
+        ]
+    )
+    session.commit()
+
+    with app.test_request_context():
+        g.user = user
+        etag, latest = charts._detail_page_state(session, crypto.id, 30)
+        assert latest == [
+            {"date": (today - timedelta(days=1)).isoformat(), "price": 1.0},
+            {"date": today.isoformat(), "price": 0.0},
+        ]
+        empty_etag, empty_latest = charts._detail_page_state(session, empty.id, 30)
+        assert empty_latest == []
+        assert empty_etag != etag
+
+
+def test_crypto_detail_defaults_to_one_year_range(auth_client, app, user, db_session):
+    session = db_session
+    crypto = Cryptocurrency(
+        coingecko_id="eth", name="Ethereum", symbol="eth"
+    )
+    session.add(crypto)
+    session.flush()
+    crypto_id = crypto.id
+    session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
+    session.commit()
 
     response = auth_client.get(f"/cryptos/{crypto_id}")
     assert response.status_code == 200
     payload = response.get_data(as_text=True)
     expected_days = min(365, app.config["MAX_HISTORY_DAYS"])
     assert f'value="{expected_days}" selected' in payload
+    template = app.extensions["charts.detail_template"]
+    assert template.name == "crypto_detail.html"
+    assert auth_client.get(f"/cryptos/{crypto_id}").status_code == 200
+    assert app.extensions["charts.detail_template"] is template
 
 
-def test_prophet_chart_styles_present():
-    content = Path("web/app/static/js/crypto_detail.js").read_text()
+def test_prophet_chart_styles_present(crypto_detail_js):
+    content = crypto_detail_js
     build_start = content.index("const buildForecastTraces")
     build_end = content.index("const buildMarkerShape")
     build_block = content[build_start:build_end]
@@ -66,3 +196,71 @@ def test_prophet_chart_styles_present():
     assert 'fill: "tonexty"' in content
     assert 'line: { color: "rgba(0, 0, 0, 0)", width: 0 }' in content
     assert "showlegend: false" in content
+
+
+def test_crypto_detail_data_refreshes_after_new_forecast(
+    auth_client, app, user, db_session
+):
+    session = db_session
+    crypto = Cryptocurrency(coingecko_id="sol", name="Solana", symbol="sol")
+    session.add(crypto)
+    session.flush()
+    crypto_id = crypto.id
+    cutoff_date = date.today() - timedelta(days=1)
+    session.add_all(
+        [
+            UserCrypto(user_id=user.id, crypto_id=crypto.id),
+            Price(crypto_id=crypto.id, date=cutoff_date, price=1),
+        ]
+    )
+    session.commit()
+
+    data = auth_client.get(f"/cryptos/{crypto_id}/data").get_json()
+    assert data["prophet"]["cutoff"] is None
+    assert any(key[0] == crypto_id for key in charts._DETAIL_DATA)
+
+    session.add(
+        ProphetForecast(
+            crypto_id=crypto_id,
+            date=cutoff_date,
+            yhat=1,
+            yhat_lower=1,
+            yhat_upper=1,
+            cutoff_date=cutoff_date,
+            horizon_days=30,
+        )
+    )
+    session.commit()
+
+    data = auth_client.get(f"/cryptos/{crypto_id}/data").get_json()
+    assert data["prophet"]["cutoff"] == cutoff_date.isoformat()
+
+
+def test_crypto_detail_data_cache_is_bounded_and_tracks_upserts(
+    auth_client, user, db_session, monkeypatch
+):
+    session = db_session
+    crypto = Cryptocurrency(coingecko_id="avax", name="Avalanche", symbol="avax")
+    session.add(crypto)
+    session.flush()
+    crypto_id = crypto.id
+    session.add_all(
+        [
+            UserCrypto(user_id=user.id, crypto_id=crypto.id),
+            Price(crypto_id=crypto.id, date=date.today(), price=2),
+        ]
+    )
+    session.commit()
+
+    monkeypatch.setattr(charts, "DETAIL_CACHE_MAX_ENTRIES", 2)
+    for days in (10, 20, 30):
+        auth_client.get(f"/cryptos/{crypto_id}/data?days={days}")
+    assert list(charts._DETAIL_DATA) == [(crypto_id, 20), (crypto_id, 30)]
+
+    # Upserts from another process bypass invalidate_detail_data but bump the
+    # crypto's prices version.
+    session.execute(update(Price).where(Price.crypto_id == crypto_id).values(price=5))
+    bump_prices_version(session, [crypto_id])
+    session.commit()
+    data = auth_client.get(f"/cryptos/{crypto_id}/data?days=30").get_json()
+    assert data["series"][-1]["price"] == 5.0
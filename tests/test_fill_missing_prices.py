@@ -1,7 +1,7 @@
 from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 
-from app.db import get_session
+from app.db import bulk_upsert_prices
 from app.models import Cryptocurrency, Price
 from app.services.price_updater import fill_missing_prices
 
@@ -21,17 +21,21 @@ def _ts_ms(day: date, hour: int) -> int:
     )
 
 
-def test_fill_missing_prices_between_first_and_last(app):
-    session = get_session()
+def test_fill_missing_prices_between_first_and_last(app, db_session):
+    session = db_session
     crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
     session.add(crypto)
-    session.commit()
+    session.flush()
 
     today = date.today()
     start = today - timedelta(days=4)
     end = today - timedelta(days=1)
-    session.add(Price(crypto_id=crypto.id, date=start, price=Decimal("100.0")))
-    session.add(Price(crypto_id=crypto.id, date=end, price=Decimal("130.0")))
+    session.add_all(
+        [
+            Price(crypto_id=crypto.id, date=start, price=Decimal("100.0")),
+            Price(crypto_id=crypto.id, date=end, price=Decimal("130.0")),
+        ]
+    )
     session.commit()
 
     missing_day_1 = today - timedelta(days=3)
@@ -60,3 +64,33 @@ def test_fill_missing_prices_between_first_and_last(app):
         missing_day_2,
         end,
     }
+
+
+def test_bulk_upsert_prices_skips_existing_rows(app, db_session):
+    session = db_session
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    session.add(crypto)
+    session.flush()
+    day = date.today() - timedelta(days=1)
+    session.add(Price(crypto_id=crypto.id, date=day, price=Decimal("100.0")))
+    session.commit()
+
+    inserted = bulk_upsert_prices(
+        session,
+        [
+            {"crypto_id": crypto.id, "date": day, "price": Decimal("999.0")},
+            {
+                "crypto_id": crypto.id,
+                "date": day - timedelta(days=1),
+                "price": Decimal("90.0"),
+            },
+        ],
+    )
+    session.commit()
+
+    assert inserted == 1
+    stored = {
+        row.date: row.price
+        for row in session.query(Price).filter(Price.crypto_id == crypto.id)
+    }
+    assert stored == {day: 100.0, day - timedelta(days=1): 90.0}
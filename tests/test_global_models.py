@@ -1,10 +1,12 @@
 from datetime import date, timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
 from sqlalchemy import select
 
+from app.config import load_chart_config
 from app.db import get_session
 from app.models import Cryptocurrency, LstmForecast, Price
 from app.services.global_inference import predict_with_global_model
@@ -23,14 +25,15 @@ def _seed_crypto(session, name: str, symbol: str, coingecko_id: str):
 
 
 def _seed_prices(session, crypto_id: int, start: date, days: int):
-    for offset in range(days):
-        session.add(
-            Price(
-                crypto_id=crypto_id,
-                date=start + timedelta(days=offset),
-                price=100 + offset,
-            )
-        )
+    rows = [
+        {
+            "crypto_id": crypto_id,
+            "date": start + timedelta(days=offset),
+            "price": 100 + offset,
+        }
+        for offset in range(days)
+    ]
+    session.execute(Price.__table__.insert(), rows)
     session.commit()
 
 
@@ -55,6 +58,15 @@ def test_canonical_model_key_deterministic(monkeypatch, tmp_path):
     )
     assert first == second
     assert first[1] == str(tmp_path)
+    float_key = canonical_model_key(
+        "global_shared",
+        "RNNModel",
+        "LSTM",
+        30,
+        "log_return",
+        {"input_chunk_length": 10.0, "n_epochs": 1},
+    )
+    assert float_key[0] != first[0]
     assert first[2].endswith(".pt")
 
 
@@ -123,6 +135,10 @@ def test_validation_kept_after_chunk_reduction(app, monkeypatch, tmp_path):
         def from_dataframe(cls, df, time_col="date", value_cols=None):
             return cls(pd.to_datetime(df[time_col]), df[value_cols].to_numpy())
 
+        @classmethod
+        def from_times_and_values(cls, times, values, columns=None):
+            return cls(times, values)
+
         def split_before(self, split_point):
             if isinstance(split_point, (float, int)):
                 idx = int(len(self) * float(split_point))
@@ -144,6 +160,7 @@ def test_validation_kept_after_chunk_reduction(app, monkeypatch, tmp_path):
             return self._values.shape[1]
 
     fit_calls: list[object] = []
+    fit_kwargs: list[dict] = []
 
     class FakeModel:
         supports_future_covariates = False
@@ -154,6 +171,7 @@ def test_validation_kept_after_chunk_reduction(app, monkeypatch, tmp_path):
 
         def fit(self, train_series, val_series=None, **kwargs):
             fit_calls.append(val_series)
+            fit_kwargs.append(kwargs)
 
         def save(self, path):
             Path(path).write_text("")
@@ -207,10 +225,37 @@ def test_validation_kept_after_chunk_reduction(app, monkeypatch, tmp_path):
             crypto_ids=[btc.id],
             horizon_days=3,
             transform="log_return",
+            pin_memory=True,
         )
 
     assert fit_calls
     assert fit_calls[0] is not None
+    assert fit_kwargs[0]["dataloader_kwargs"] == {"pin_memory": True}
+
+
+def test_build_covariates_matches_calendar(monkeypatch):
+    from app.services import global_training as gt
+
+    class FakeTimeSeries:
+        @staticmethod
+        def from_times_and_values(times, values, columns=None):
+            return times, values, columns
+
+    monkeypatch.setattr(gt, "TimeSeries", FakeTimeSeries)
+    rows = [
+        {"date": date(2024, 2, 28), "price": 1},
+        {"date": date(2024, 3, 1), "price": 2},
+    ]
+
+    times, values, columns = gt._build_covariates(rows, horizon_days=2)
+
+    expected = pd.date_range("2024-02-28", "2024-03-03", freq="D")
+    assert list(times) == list(expected)
+    assert columns == ["dow_sin", "dow_cos", "doy_sin", "doy_cos"]
+    dow = expected.dayofweek.to_numpy()
+    doy = expected.dayofyear.to_numpy()
+    assert values[:, 0] == pytest.approx(np.sin(2 * np.pi * dow / 7.0))
+    assert values[:, 3] == pytest.approx(np.cos(2 * np.pi * doy / 365.25))
 
 
 def test_per_crypto_store_forecast_compatible(app, monkeypatch):
@@ -255,6 +300,7 @@ def test_global_create_uses_multi_crypto_ids(
     from app.db import get_session
     from app.models import UserCrypto
     from app.routes import charts as charts_routes
+    from app.services import forecast_jobs
 
     with app.app_context():
         session = get_session()
@@ -268,6 +314,7 @@ def test_global_create_uses_multi_crypto_ids(
         extra_two_id = extra_two.id
 
     app.config["RNN_FUTURE_DAYS"] = 30
+    app.extensions["chart_config"] = load_chart_config(app.config)
     captured: dict[str, object] = {}
 
     def fake_train_global_model(*_args, **kwargs):
@@ -291,8 +338,8 @@ def test_global_create_uses_multi_crypto_ids(
             }
         ]
 
-    def fake_start_job(job_key, job_type, label, target):
-        result = target()
+    def fake_start_job(job_key, job_type, label, target, kwargs=None):
+        result = target(**(kwargs or {}))
         return {
             "job_key": job_key,
             "job_type": job_type,
@@ -303,13 +350,13 @@ def test_global_create_uses_multi_crypto_ids(
         }
 
     monkeypatch.setattr(
-        charts_routes, "train_global_model", fake_train_global_model
+        forecast_jobs, "train_global_model", fake_train_global_model
     )
     monkeypatch.setattr(
-        charts_routes, "predict_with_global_model", fake_predict_with_global_model
+        forecast_jobs, "predict_with_global_model", fake_predict_with_global_model
     )
     monkeypatch.setattr(
-        charts_routes, "_global_model_has_artifacts", lambda _run: True
+        forecast_jobs, "_global_model_has_artifacts", lambda _run: True
     )
     monkeypatch.setattr(charts_routes, "start_job", fake_start_job)
 
@@ -352,6 +399,7 @@ def test_global_retrain_uses_run_crypto_ids(
     from app.db import get_session
     from app.models import UserCrypto
     from app.routes import charts as charts_routes
+    from app.services import forecast_jobs
     from app.services.model_registry import create_model_run
 
     with app.app_context():
@@ -383,6 +431,7 @@ def test_global_retrain_uses_run_crypto_ids(
         run_id = run.id
 
     app.config["RNN_FUTURE_DAYS"] = 30
+    app.extensions["chart_config"] = load_chart_config(app.config)
     captured: dict[str, object] = {}
 
     def fake_train_global_model(*_args, **kwargs):
@@ -404,8 +453,8 @@ def test_global_retrain_uses_run_crypto_ids(
             }
         ]
 
-    def fake_start_job(job_key, job_type, label, target):
-        result = target()
+    def fake_start_job(job_key, job_type, label, target, kwargs=None):
+        result = target(**(kwargs or {}))
         return {
             "job_key": job_key,
             "job_type": job_type,
@@ -416,15 +465,15 @@ def test_global_retrain_uses_run_crypto_ids(
         }
 
     monkeypatch.setattr(
-        charts_routes, "train_global_model", fake_train_global_model
+        forecast_jobs, "train_global_model", fake_train_global_model
     )
     monkeypatch.setattr(
-        charts_routes,
+        forecast_jobs,
         "predict_with_global_model",
         fake_predict_with_global_model,
     )
     monkeypatch.setattr(
-        charts_routes, "_global_model_has_artifacts", lambda _run: True
+        forecast_jobs, "_global_model_has_artifacts", lambda _run: True
     )
     monkeypatch.setattr(charts_routes, "start_job", fake_start_job)
 
@@ -444,3 +493,21 @@ def test_global_retrain_uses_run_crypto_ids(
     assert response.status_code == 200
     assert set(captured["crypto_ids"]) == {primary_id, extra_one_id}
     assert captured["cell_type"] == cell_type
+
+
+def test_inference_autocast_defaults_to_fp32(monkeypatch):
+    from contextlib import nullcontext
+
+    from app.services import global_inference as gi
+
+    monkeypatch.delenv("GLOBAL_INFERENCE_DTYPE", raising=False)
+    assert gi._resolve_inference_dtype(None) == "fp32"
+    assert gi._resolve_inference_dtype(" BF16 ") == "bf16"
+    assert isinstance(gi._inference_autocast("fp32"), nullcontext)
+
+
+def test_trainer_precision_only_mixed_on_gpu():
+    from app.services import global_training as gt
+
+    assert gt._trainer_precision("cpu", True) is None
+    assert gt._trainer_precision("gpu", False) is None
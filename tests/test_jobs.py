@@ -0,0 +1,125 @@
+import time
+
+from app.services import jobs
+
+
+class FakeAsyncResult:
+    def __init__(self, state, result=None):
+        self.state = state
+        self.result = result
+
+
+class FakeCelery:
+    def __init__(self):
+        self.states = {}
+        self.sent = []
+
+    def AsyncResult(self, task_id):
+        return self.states.get(task_id, FakeAsyncResult("PENDING"))
+
+    def send_task(self, name, kwargs=None, task_id=None):
+        self.sent.append((name, kwargs, task_id))
+        self.states[task_id] = FakeAsyncResult("STARTED")
+
+
+def _forecast(crypto_id, horizon_days):
+    return crypto_id + horizon_days
+
+
+def test_thread_job_passes_kwargs(monkeypatch):
+    monkeypatch.setattr(jobs, "_JOBS", {})
+    jobs.start_job(
+        "t:1", "t", "Test", _forecast, {"crypto_id": 1, "horizon_days": 2}
+    )
+    for _ in range(100):
+        job = jobs.get_job_status("t:1", "t", "Test")
+        if job["state"] != "running":
+            break
+        time.sleep(0.01)
+
+    assert job["state"] == "done"
+    assert job["result"] == 3
+
+
+def test_celery_job_maps_task_states(app, monkeypatch):
+    celery = FakeCelery()
+    monkeypatch.setattr(jobs, "_CELERY", celery)
+
+    assert jobs.get_job_status("t:1", "t", "Test")["state"] == "idle"
+
+    job = jobs.start_job("t:1", "t", "Test", _forecast, {"crypto_id": 1})
+    assert job["state"] == "running"
+    task_id = job["task_id"]
+    assert celery.sent == [
+        ("test_jobs._forecast", {"crypto_id": 1}, task_id),
+    ]
+    jobs.start_job("t:1", "t", "Test", _forecast, {"crypto_id": 1})
+    assert len(celery.sent) == 1
+
+    # One job at a time, as with threads.
+    busy = jobs.start_job("t:2", "t", "Other", _forecast, {"crypto_id": 2})
+    assert busy["state"] == "busy"
+    assert busy["active_job_key"] == "t:1"
+    assert len(celery.sent) == 1
+
+    celery.states[task_id] = FakeAsyncResult("SUCCESS", 30)
+    job = jobs.get_job_status("t:1", "t", "Test")
+    assert job["state"] == "done"
+    assert job["message"] == "Test updated: 30 points."
+
+    # The finished state is stored; the backend is not asked again.
+    celery.states[task_id] = FakeAsyncResult("FAILURE", ValueError("boom"))
+    assert jobs.get_job_status("t:1", "t", "Test")["state"] == "done"
+
+    job = jobs.start_job("t:2", "t", "Other", _forecast, {"crypto_id": 2})
+    celery.states[job["task_id"]] = FakeAsyncResult("FAILURE", ValueError("boom"))
+    job = jobs.get_job_status("t:2", "t", "Other")
+    assert job["state"] == "error"
+    assert job["error"] == "boom"
+
+
+def test_celery_requeue_does_not_report_previous_result(app, monkeypatch):
+    celery = FakeCelery()
+    monkeypatch.setattr(jobs, "_CELERY", celery)
+
+    first = jobs.start_job("t:1", "t", "Test", _forecast, {"crypto_id": 1})
+    celery.states[first["task_id"]] = FakeAsyncResult("SUCCESS", 30)
+    assert jobs.get_job_status("t:1", "t", "Test")["state"] == "done"
+
+    second = jobs.start_job("t:1", "t", "Test", _forecast, {"crypto_id": 1})
+    assert second["task_id"] != first["task_id"]
+    # Not picked up by a worker yet: PENDING for the new id, not the old SUCCESS.
+    del celery.states[second["task_id"]]
+    job = jobs.get_job_status("t:1", "t", "Test")
+    assert job["state"] == "running"
+    assert job["task_id"] == second["task_id"]
+
+
+def test_celery_pending_run_expires(app, monkeypatch):
+    celery = FakeCelery()
+    monkeypatch.setattr(jobs, "_CELERY", celery)
+
+    lost = jobs.start_job("t:1", "t", "Test", _forecast, {"crypto_id": 1})
+    del celery.states[lost["task_id"]]
+    monkeypatch.setattr(jobs, "CELERY_PENDING_TIMEOUT", -1.0)
+
+    job = jobs.get_job_status("t:1", "t", "Test")
+    assert job["state"] == "error"
+    assert job["message"] == "No worker picked up the update; start it again."
+    restarted = jobs.start_job("t:2", "t", "Other", _forecast, {"crypto_id": 2})
+    assert restarted["state"] == "running"
+
+
+def test_wait_for_job_returns_when_thread_job_finishes(monkeypatch):
+    monkeypatch.setattr(jobs, "_JOBS", {})
+
+    def slow():
+        time.sleep(0.05)
+        return 5
+
+    jobs.start_job("t:2", "t", "Test", slow)
+    job = jobs.wait_for_job("t:2", "t", "Test", timeout=5)
+
+    assert job["state"] == "done"
+    assert job["result"] == 5
+    assert jobs.wait_for_job("t:3", "t", "Test", timeout=5)["state"] == "idle"
@@ -1,3 +1,19 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, update
+
+from app.auth_utils import (
+    CryptoSummary,
+    fetch_user_crypto,
+    invalidate_user_cache,
+    validate_email,
+)
+from app.models import Cryptocurrency, Price, User, UserCrypto
+from app.routes import charts, dashboard
+from app.services import price_updater
+
 
 def test_dashboard_requires_login(client):
     response = client.get("/")
@@ -20,6 +36,14 @@ def test_dashboard_prophet_bulk_disabled(auth_client):
     assert payload["message"] == "Prophet forecast disabled"
 
 
+def test_dashboard_prophet_bulk_disabled_flashes_error(auth_client):
+    response = auth_client.post("/prophet/bulk")
+    assert response.status_code == 302
+    with auth_client.session_transaction() as flask_session:
+        flashes = flask_session["_flashes"]
+    assert flashes == [("error", "Prophet forecast disabled")]
+
+
 def test_health_requires_login(client):
     response = client.get("/api/health")
     assert response.status_code == 401
@@ -53,3 +77,369 @@ def test_login_logout_flow(client, user):
     assert response.status_code == 200
     response = client.post("/logout", follow_redirects=True)
     assert response.status_code == 200
+
+
+def test_session_serializer_reused(app):
+    interface = app.session_interface
+    serializer = interface.get_signing_serializer(app)
+
+    assert serializer is interface.get_signing_serializer(app)
+    assert serializer.loads(serializer.dumps({"user_id": 1})) == {"user_id": 1}
+
+
+def test_current_user_cached_until_invalidated(auth_client, user, db_session):
+    assert auth_client.get("/").status_code == 200
+    db_session.execute(
+        update(User).where(User.id == user.id).values(is_active=False)
+    )
+    db_session.commit()
+
+    assert auth_client.get("/").status_code == 200
+    invalidate_user_cache(user.id)
+    assert auth_client.get("/").status_code == 302
+
+
+def test_security_headers_on_pages(client):
+    response = client.get("/login")
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert response.headers["Content-Security-Policy"].startswith("default-src 'self'")
+
+
+def test_security_headers_on_passthrough_responses(app):
+    with app.test_request_context("/login"):
+        response = app.response_class(iter([b"data"]), direct_passthrough=True)
+        response = app.process_response(response)
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+
+
+def test_static_assets_public(client):
+    response = client.get("/static/js/crypto_detail.js")
+    assert response.status_code == 200
+    assert response.headers["Etag"]
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.headers["Content-Security-Policy"].startswith("default-src")
+    response.close()
+
+
+def test_dashboard_rows_refresh_when_prices_change(auth_client, user, db_session):
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(crypto)
+    db_session.flush()
+    db_session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
+    db_session.commit()
+    assert "2024-01-02" not in auth_client.get("/").get_data(as_text=True)
+
+    db_session.add(Price(crypto_id=crypto.id, date=date(2024, 1, 2), price=10))
+    db_session.commit()
+
+    assert "2024-01-02" in auth_client.get("/").get_data(as_text=True)
+
+
+def test_dashboard_cache_holds_plain_rows_and_is_bounded(
+    auth_client, user, db_session, monkeypatch
+):
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(crypto)
+    db_session.flush()
+    db_session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
+    db_session.commit()
+    auth_client.get("/")
+
+    _stored_at, _state, rows = dashboard._DASHBOARD_ROWS[user.id]
+    assert rows[0]["crypto"] == CryptoSummary(crypto.id, "bitcoin", "Bitcoin", "BTC")
+
+    monkeypatch.setattr(dashboard, "DASHBOARD_CACHE_MAX_ENTRIES", 2)
+    for other_user_id in (user.id + 1, user.id + 2):
+        dashboard._store_dashboard_rows(other_user_id, (), [])
+    assert list(dashboard._DASHBOARD_ROWS) == [user.id + 1, user.id + 2]
+
+
+def test_price_update_drops_only_the_written_crypto(
+    auth_client, user, db_session, monkeypatch
+):
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    other = Cryptocurrency(name="Ethereum", symbol="ETH", coingecko_id="ethereum")
+    db_session.add_all([crypto, other])
+    db_session.flush()
+    db_session.add_all(
+        [
+            UserCrypto(user_id=user.id, crypto_id=crypto.id),
+            UserCrypto(user_id=user.id, crypto_id=other.id),
+            Price(crypto_id=crypto.id, date=date.today() - timedelta(days=2), price=10),
+        ]
+    )
+    db_session.commit()
+    auth_client.get("/")
+    auth_client.get(f"/cryptos/{crypto.id}/data")
+    auth_client.get(f"/cryptos/{other.id}/data")
+    monkeypatch.setattr(
+        price_updater,
+        "_fetch_historical_price",
+        lambda client, coin_id, vs_currency, as_of: Decimal("12345"),
+    )
+
+    # Nothing is written for a crypto outside the dashboard.
+    auth_client.post(f"/prices/update/{other.id + 1}")
+    assert user.id in dashboard._DASHBOARD_ROWS
+    assert len(charts._DETAIL_DATA) == 2
+
+    auth_client.post(f"/prices/update/{crypto.id}")
+    assert user.id not in dashboard._DASHBOARD_ROWS
+    assert [key[0] for key in charts._DETAIL_DATA] == [other.id]
+    assert "12,345" in auth_client.get("/").get_data(as_text=True)
+
+
+def test_api_cryptos_returns_latest_price(auth_client, user, db_session):
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(crypto)
+    db_session.flush()
+    db_session.add_all(
+        [
+            UserCrypto(user_id=user.id, crypto_id=crypto.id),
+            Price(crypto_id=crypto.id, date=date(2024, 1, 1), price=5),
+            Price(crypto_id=crypto.id, date=date(2024, 1, 3), price=7),
+            Price(crypto_id=crypto.id, date=date(2024, 1, 2), price=6),
+        ]
+    )
+    db_session.commit()
+
+    payload = auth_client.get("/api/cryptos").get_json()
+
+    assert payload[0]["latest_price"] == 7.0
+    assert payload[0]["latest_date"] == "2024-01-03"
+
+
+def test_api_prices_serializes_rows(auth_client, user, db_session):
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(crypto)
+    db_session.flush()
+    db_session.add_all(
+        [
+            UserCrypto(user_id=user.id, crypto_id=crypto.id),
+            Price(crypto_id=crypto.id, date=date(2024, 1, 2), price=6),
+            Price(crypto_id=crypto.id, date=date(2024, 1, 1), price=5.5),
+        ]
+    )
+    db_session.commit()
+
+    response = auth_client.get(f"/api/cryptos/{crypto.id}/prices")
+
+    assert response.mimetype == "application/json"
+    assert response.get_json() == [
+        {"date": "2024-01-01", "price": 5.5},
+        {"date": "2024-01-02", "price": 6.0},
+    ]
+
+
+def test_api_prices_serializes_with_orjson(auth_client, user, db_session):
+    orjson = pytest.importorskip("orjson")
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(crypto)
+    db_session.flush()
+    db_session.add_all(
+        [
+            UserCrypto(user_id=user.id, crypto_id=crypto.id),
+            Price(crypto_id=crypto.id, date=date(2024, 1, 1), price=5.5),
+        ]
+    )
+    db_session.commit()
+
+    response = auth_client.get(f"/api/cryptos/{crypto.id}/prices")
+
+    assert response.get_data() == orjson.dumps([{"date": "2024-01-01", "price": 5.5}])
+    assert response.mimetype == "application/json"
+
+
+def test_validate_email():
+    assert validate_email("user@example.com")
+    assert validate_email("a@b.c.d")
+    assert not validate_email("user@example")
+    assert not validate_email("user@.com")
+    assert not validate_email("user@example.")
+    assert not validate_email("us er@example.com")
+    assert not validate_email("a@b@c.com")
+    assert not validate_email("a@" + "." * 50000 + " ")
+
+
+def test_fetch_user_crypto_requires_ownership(auth_client, user, db_session):
+    owned = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    other = Cryptocurrency(name="Ethereum", symbol="ETH", coingecko_id="ethereum")
+    db_session.add_all([owned, other])
+    db_session.flush()
+    db_session.add(UserCrypto(user_id=user.id, crypto_id=owned.id))
+    db_session.commit()
+
+    summary = fetch_user_crypto(db_session, user.id, owned.id)
+    assert summary == CryptoSummary(owned.id, "bitcoin", "Bitcoin", "BTC")
+    assert fetch_user_crypto(db_session, user.id, owned.id) is summary
+    assert fetch_user_crypto(db_session, user.id, other.id) is None
+    assert auth_client.get(f"/cryptos/{other.id}").status_code == 404
+
+    # Removing the crypto drops the cached ownership set right away.
+    assert auth_client.get(f"/cryptos/{owned.id}").status_code == 200
+    auth_client.post(f"/cryptos/{owned.id}/remove")
+    assert auth_client.get(f"/cryptos/{owned.id}").status_code == 404
+
+
+def test_ownership_cache_has_its_own_ttl(user, db_session, monkeypatch):
+    from app import auth_utils
+
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(crypto)
+    db_session.flush()
+    db_session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
+    db_session.commit()
+    assert auth_utils.user_crypto_exists(db_session, user.id, crypto.id)
+
+    # Revoked by another process: no local invalidation happens.
+    db_session.execute(delete(UserCrypto).where(UserCrypto.crypto_id == crypto.id))
+    db_session.commit()
+    monkeypatch.setattr(auth_utils, "USER_CACHE_TTL", 3600.0)
+    monkeypatch.setattr(auth_utils, "OWNERSHIP_CACHE_TTL", 0.0)
+    assert not auth_utils.user_crypto_exists(db_session, user.id, crypto.id)
+
+
+def test_chart_form_number_parsing():
+    from app.routes import charts
+
+    assert charts._parse_int_range(" 12 ", 5, 1, 10) == 10
+    assert charts._parse_int_range("1_0", 5, 1) == 10
+    assert charts._parse_int_range("²", 5, 1) == 5
+    assert charts._parse_optional_int("-3") is None
+    assert charts._parse_int_list("64, x, 0,1024", [8]) == [64, 1, 512]
+    assert charts._parse_int_list("x", [8]) == [8]
+    assert charts._parse_float_range("0.9", 0.8, 0.8, 0.95) == 0.9
+    assert charts._parse_float_range("1e-1", 0.8, 0.05, 0.95) == 0.1
+    assert charts._parse_float_range("abc", 0.8, 0.05, 0.95) == 0.8
+
+
+def test_chart_redirect_matches_url_for(app):
+    from flask import url_for
+
+    from app.routes import charts
+
+    with app.test_request_context(
+        "/cryptos/7/prophet", method="POST", data={"range_days": "30"}
+    ):
+        response = charts._redirect_with_days(7)
+        assert response.location == url_for(
+            "charts.crypto_detail", crypto_id=7, days="30"
+        )
+    with app.test_request_context("/cryptos/7/prophet", method="POST"):
+        response = charts._redirect_with_days(7)
+        assert response.location == url_for("charts.crypto_detail", crypto_id=7)
+
+
+def test_job_status_long_poll_returns_idle(auth_client, user, db_session):
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(crypto)
+    db_session.flush()
+    db_session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
+    db_session.commit()
+
+    response = auth_client.get(f"/cryptos/{crypto.id}/jobs/prophet?wait=5")
+
+    assert response.status_code == 200
+    assert response.get_json()["state"] == "idle"
+
+
+def test_forecast_disabled_job_response(auth_client, user, db_session):
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(crypto)
+    db_session.flush()
+    db_session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
+    db_session.commit()
+
+    response = auth_client.post(
+        f"/cryptos/{crypto.id}/gru", headers={"Accept": "application/json"}
+    )
+
+    assert response.get_json() == {
+        "job_key": f"gru:{crypto.id}",
+        "job_type": "gru",
+        "label": "GRU",
+        "state": "error",
+        "message": "GRU forecast disabled",
+    }
+
+
+def test_forecast_all_queues_each_model(
+    auth_client, app, user, db_session, monkeypatch
+):
+    from app.config import load_chart_config
+    from app.routes import charts
+
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(crypto)
+    db_session.flush()
+    db_session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
+    db_session.commit()
+
+    response = auth_client.post(
+        f"/cryptos/{crypto.id}/forecast/all",
+        headers={"Accept": "application/json"},
+    )
+    assert response.status_code == 200
+    assert {job["state"] for job in response.get_json().values()} == {"error"}
+
+    app.config.update(PROPHET_FUTURE_DAYS=30, RNN_FUTURE_DAYS=30)
+    app.extensions["chart_config"] = load_chart_config(app.config)
+    started = []
+
+    def fake_start_job(job_key, job_type, label, target, kwargs=None):
+        started.append((job_key, target.__name__, kwargs.get("cell_type")))
+        return {"job_key": job_key, "job_type": job_type, "state": "running"}
+
+    monkeypatch.setattr(charts, "start_job", fake_start_job)
+    response = auth_client.post(
+        f"/cryptos/{crypto.id}/forecast/all",
+        data={"prophet_days": "90", "gru_model": "block"},
+        headers={"Accept": "application/json"},
+    )
+
+    assert response.status_code == 202
+    assert sorted(response.get_json()) == ["gru", "lstm", "prophet"]
+    assert started == [
+        (f"prophet:{crypto.id}", "run_prophet_forecast", None),
+        (f"lstm:{crypto.id}", "run_rnn_forecast", "LSTM"),
+        (f"gru:{crypto.id}", "run_rnn_forecast", "GRU"),
+    ]
+    assert auth_client.post("/cryptos/999999/forecast/all").status_code == 404
+
+
+def test_running_job_points_to_status_url(
+    auth_client, app, user, db_session, monkeypatch
+):
+    from app.config import load_chart_config
+    from app.routes import charts
+
+    crypto = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(crypto)
+    db_session.flush()
+    db_session.add(UserCrypto(user_id=user.id, crypto_id=crypto.id))
+    db_session.commit()
+    app.config.update(PROPHET_FUTURE_DAYS=30)
+    app.extensions["chart_config"] = load_chart_config(app.config)
+    monkeypatch.setattr(
+        charts,
+        "start_job",
+        lambda job_key, job_type, label, target, kwargs=None: {
+            "job_key": job_key,
+            "job_type": job_type,
+            "state": "running",
+        },
+    )
+
+    response = auth_client.post(
+        f"/cryptos/{crypto.id}/prophet", headers={"Accept": "application/json"}
+    )
+
+    assert response.status_code == 202
+    assert response.headers["Location"] == f"/cryptos/{crypto.id}/jobs/prophet"
+
+
+def test_job_key_reuses_string():
+    from app.routes import charts
+
+    assert charts._job_key("lstm", 3) == "lstm:3"
+    assert charts._job_key("lstm", 3) is charts._job_key("lstm", 3)
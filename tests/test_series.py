@@ -1,4 +1,19 @@
-from app.services.series import clamp_days
+from datetime import date, timedelta
+
+from flask import g
+from sqlalchemy import event
+
+from app.models import Cryptocurrency, GruForecast, Price, ProphetForecast
+from app.services.forecasts import fetch_forecast_bundles
+from app.services.prophet import fetch_prophet_forecast
+from app.services.series import (
+    clamp_days,
+    crypto_ids_with_min_prices,
+    current_date,
+    fetch_price_arrays,
+    fetch_price_series_many,
+    window_start,
+)
 
 
 def test_clamp_days():
@@ -6,3 +21,174 @@ def test_clamp_days():
     assert clamp_days("7", 365) == 7
     assert clamp_days("", 365) == 0
     assert clamp_days("abc", 365) == 0
+
+
+def test_current_date_is_pinned_per_app_context(app):
+    with app.app_context():
+        g._today = date(2020, 1, 1)
+        assert current_date() == date(2020, 1, 1)
+        assert window_start(31) == date(2019, 12, 1)
+        assert window_start(0) is None
+    with app.app_context():
+        assert current_date() == date.today()
+    assert current_date() == date.today()
+
+
+def test_fetch_price_series_many_groups_by_crypto(app, db_session):
+    btc = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    eth = Cryptocurrency(name="Ethereum", symbol="ETH", coingecko_id="ethereum")
+    db_session.add_all([btc, eth])
+    db_session.flush()
+    start = date.today() - timedelta(days=3)
+    db_session.execute(
+        Price.__table__.insert(),
+        [
+            {"crypto_id": btc.id, "date": start + timedelta(days=1), "price": 2},
+            {"crypto_id": btc.id, "date": start, "price": 1},
+            {"crypto_id": eth.id, "date": start, "price": 10},
+        ],
+    )
+    db_session.commit()
+
+    series = fetch_price_series_many(db_session, [btc.id, eth.id], 0)
+
+    assert series[btc.id] == [
+        {"date": start, "price": 1.0},
+        {"date": start + timedelta(days=1), "price": 2.0},
+    ]
+    assert series[eth.id] == [{"date": start, "price": 10.0}]
+    dates, prices = fetch_price_arrays(db_session, btc.id, 0)
+    assert dates.dtype == "datetime64[D]"
+    assert dates.tolist() == [start, start + timedelta(days=1)]
+    assert prices.tolist() == [1.0, 2.0]
+    assert crypto_ids_with_min_prices(
+        db_session, [eth.id, btc.id, 999], 0, 2
+    ) == [btc.id]
+    assert crypto_ids_with_min_prices(db_session, [eth.id, btc.id], 0, 1) == [
+        eth.id,
+        btc.id,
+    ]
+
+
+def test_fetch_prophet_forecast_serializes_columns(app, db_session):
+    btc = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(btc)
+    db_session.flush()
+    day = date.today()
+    db_session.add_all(
+        [
+            ProphetForecast(
+                crypto_id=btc.id,
+                date=day + timedelta(days=1),
+                yhat=2,
+                yhat_lower=None,
+                yhat_upper=3,
+                cutoff_date=day,
+                horizon_days=2,
+            ),
+            ProphetForecast(
+                crypto_id=btc.id,
+                date=day - timedelta(days=1),
+                yhat=1,
+                yhat_lower=0.5,
+                yhat_upper=1.5,
+                cutoff_date=day,
+                horizon_days=2,
+            ),
+        ]
+    )
+    db_session.commit()
+
+    forecast = fetch_prophet_forecast(db_session, btc.id, day)
+
+    assert forecast == [
+        {
+            "date": (day + timedelta(days=1)).isoformat(),
+            "yhat": 2.0,
+            "yhat_lower": None,
+            "yhat_upper": 3.0,
+        }
+    ]
+
+
+def test_fetch_forecast_bundles_groups_models(app, db_session):
+    btc = Cryptocurrency(name="Bitcoin", symbol="BTC", coingecko_id="bitcoin")
+    db_session.add(btc)
+    db_session.flush()
+    day = date.today()
+    db_session.add_all(
+        [
+            ProphetForecast(
+                crypto_id=btc.id,
+                date=day,
+                yhat=1,
+                yhat_lower=0.5,
+                yhat_upper=1.5,
+                cutoff_date=day - timedelta(days=1),
+                horizon_days=30,
+            ),
+            GruForecast(
+                crypto_id=btc.id,
+                date=day + timedelta(days=1),
+                yhat=3,
+                cutoff_date=day,
+                horizon_days=7,
+            ),
+            GruForecast(
+                crypto_id=btc.id,
+                date=day,
+                yhat=2,
+                cutoff_date=day,
+                horizon_days=7,
+            ),
+        ]
+    )
+    db_session.commit()
+
+    crypto_id = btc.id
+    selects = []
+
+    def record(_conn, _cursor, statement, *_args):
+        if statement.startswith("SELECT"):
+            selects.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        bundles = fetch_forecast_bundles(db_session, crypto_id, None)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(selects) == 1
+    assert bundles["gru"]["horizon_days"] == 7
+
+    assert bundles["prophet"]["cutoff_date"] == day - timedelta(days=1)
+    assert bundles["prophet"]["forecast"] == [
+        {
+            "date": day.isoformat(),
+            "yhat": 1.0,
+            "yhat_lower": 0.5,
+            "yhat_upper": 1.5,
+        }
+    ]
+    assert bundles["lstm"] == {
+        "forecast": [],
+        "cutoff_date": None,
+        "horizon_days": None,
+    }
+    assert bundles["gru"]["horizon_days"] == 7
+    assert [point["yhat"] for point in bundles["gru"]["forecast"]] == [2.0, 3.0]
+
+
+def test_forecast_tables_index_created_at(app, db_session):
+    from sqlalchemy import inspect
+
+    from app.db import _FORECAST_CREATED_INDEXES
+
+    inspector = inspect(db_session.connection())
+    for name, table in _FORECAST_CREATED_INDEXES:
+        indexes = {
+            index["name"]: index["column_names"]
+            for index in inspector.get_indexes(table)
+        }
+        assert indexes[name] == ["crypto_id", "created_at"]
@@ -49,3 +49,5 @@ def test_update_daily_prices_fills_missing_days(app):
         date(2024, 1, 2),
         date(2024, 1, 3),
     }
+    session.refresh(crypto)
+    assert crypto.prices_version == 1
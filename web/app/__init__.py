@@ -1,20 +1,88 @@
 from flask import Flask, g
+from flask.sessions import SecureCookieSessionInterface
 from flask_wtf.csrf import CSRFProtect
+from werkzeug.middleware.shared_data import SharedDataMiddleware
 
-from .auth_utils import load_current_user, require_login
-from .config import Config
+from .auth_utils import (
+    configure_auth_cache,
+    load_current_user,
+    register_public_endpoints,
+    require_login,
+)
+from .config import get_config, load_chart_config
 from .db import init_db
 from .routes import api, auth, charts, cryptos, dashboard, prices
+from .services.analytics import warm_indicator_kernels
+from .services.jobs import make_celery
 
 csrf = CSRFProtect()
 
+_SECURITY_HEADERS = (
+    ("X-Frame-Options", "DENY"),
+    ("X-Content-Type-Options", "nosniff"),
+    ("Referrer-Policy", "strict-origin-when-cross-origin"),
+    (
+        "Content-Security-Policy",
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-eval' https://cdn.jsdelivr.net; "
+        "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+        "style-src-elem 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+        "style-src-attr 'self' 'unsafe-inline'; "
+        "img-src 'self' data:; "
+        "font-src 'self'; "
+        "connect-src 'self'",
+    ),
+)
+
+
+class _StaticFilesMiddleware(SharedDataMiddleware):
+    # Static responses are answered below Flask, where set_security_headers
+    # never runs; add the same headers on the way out.
+    def __init__(self, app, static_url_path: str, static_folder: str):
+        super().__init__(app, {static_url_path: static_folder}, cache_timeout=0)
+        self._prefix = f"{static_url_path}/"
+
+    def __call__(self, environ, start_response):
+        if not environ.get("PATH_INFO", "").startswith(self._prefix):
+            return self.app(environ, start_response)
+
+        def start_with_headers(status, headers, exc_info=None):
+            present = {name.lower() for name, _value in headers}
+            headers.extend(
+                header
+                for header in _SECURITY_HEADERS
+                if header[0].lower() not in present
+            )
+            return start_response(status, headers, exc_info)
+
+        return super().__call__(environ, start_with_headers)
+
+
+class _CachedSessionInterface(SecureCookieSessionInterface):
+    # Flask builds a new signing serializer on both open_session and
+    # save_session; keep one per secret key instead.
+    _cached = None
+
+    def get_signing_serializer(self, app):
+        cached = self._cached
+        if cached is not None and cached[0] == app.secret_key:
+            return cached[1]
+        serializer = super().get_signing_serializer(app)
+        self._cached = (app.secret_key, serializer)
+        return serializer
+
 
 def create_app() -> Flask:
     app = Flask(__name__)
-    app.config.from_object(Config())
+    app.config.from_object(get_config())
+    app.extensions["chart_config"] = load_chart_config(app.config)
+    app.session_interface = _CachedSessionInterface()
 
     csrf.init_app(app)
     init_db(app)
+    make_celery(app)
+    configure_auth_cache(app)
+    warm_indicator_kernels(ema_periods=(dashboard.EMA_PERIOD,))
 
     @app.before_request
     def load_user():
@@ -30,20 +98,8 @@ def create_app() -> Flask:
 
     @app.after_request
     def set_security_headers(response):
-        response.headers.setdefault("X-Frame-Options", "DENY")
-        response.headers.setdefault("X-Content-Type-Options", "nosniff")
-        response.headers.setdefault("Referrer-Policy", "strict-origin-when-cross-origin")
-        response.headers.setdefault(
-            "Content-Security-Policy",
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-eval' https://cdn.jsdelivr.net; "
-            "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-            "style-src-elem 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-            "style-src-attr 'self' 'unsafe-inline'; "
-            "img-src 'self' data:; "
-            "font-src 'self'; "
-            "connect-src 'self'",
-        )
+        for name, value in _SECURITY_HEADERS:
+            response.headers.setdefault(name, value)
         return response
 
     app.register_blueprint(dashboard.bp)
@@ -51,6 +107,16 @@ def create_app() -> Flask:
     app.register_blueprint(prices.bp)
     app.register_blueprint(charts.bp)
     app.register_blueprint(api.bp)
+    # The JSON API is read-only; HTML form blueprints keep CSRF enforcement.
+    csrf.exempt(api.bp)
     app.register_blueprint(auth.bp)
+    register_public_endpoints(app)
+
+    # Static assets are served before Flask dispatch, so they skip the
+    # user/login hooks and session handling entirely. max-age=0 keeps Flask's
+    # default of revalidating with the ETag, since asset URLs are unversioned.
+    app.wsgi_app = _StaticFilesMiddleware(
+        app.wsgi_app, app.static_url_path, app.static_folder
+    )
 
     return app
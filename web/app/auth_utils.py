@@ -1,31 +1,117 @@
 import re
+import threading
+import time
+from dataclasses import dataclass
 from functools import wraps
 
 from flask import g, jsonify, redirect, request, session, url_for
 from sqlalchemy import select
 
 from .db import get_session
-from .models import User, UserCrypto
+from .models import Cryptocurrency, User, UserCrypto
+
+# Same acceptance as ^[^@\s]+@[^@\s]+\.[^@\s]+$, checked in linear time; that
+# pattern backtracks quadratically on long dotted domains that fail at the end.
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+")
+PASSWORD_RULES = (
+    (re.compile(r"[a-z]"), "Password must include a lowercase letter"),
+    (re.compile(r"[A-Z]"), "Password must include an uppercase letter"),
+    (re.compile(r"\d"), "Password must include a number"),
+    (re.compile(r"[^A-Za-z0-9]"), "Password must include a symbol"),
+)
+
+PUBLIC_ENDPOINTS = frozenset(
+    {
+        "auth.login",
+        "auth.login_post",
+        "auth.register",
+        "auth.register_post",
+        "static",
+    }
+)
+_PUBLIC_ENDPOINTS = PUBLIC_ENDPOINTS
+
+# A deactivated user keeps access on other workers for up to this long; set
+# from AUTH_CACHE_TTL at start-up.
+USER_CACHE_TTL = 5.0
+_USER_CACHE_LOCK = threading.Lock()
+_USER_CACHE: dict[int, tuple[float, User]] = {}
+
+# Ownership sets are dropped on add/remove in this process; other workers
+# catch up within OWNERSHIP_CACHE_TTL (AUTH_CACHE_TTL too), which bounds how
+# long a revoked crypto stays reachable there. Crypto rows are never edited
+# once created.
+OWNERSHIP_CACHE_TTL = 5.0
+CRYPTO_CACHE_TTL = 300.0
+_CRYPTO_CACHE_LOCK = threading.Lock()
+_USER_CRYPTOS: dict[int, tuple[float, frozenset[int]]] = {}
+_CRYPTO_SUMMARIES: dict[int, tuple[float, "CryptoSummary"]] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class CryptoSummary:
+    id: int
+    coingecko_id: str
+    name: str | None
+    symbol: str | None
+
+
+def register_public_endpoints(app) -> None:
+    # Called once blueprints are registered so every static endpoint is known.
+    global _PUBLIC_ENDPOINTS
+    _PUBLIC_ENDPOINTS = PUBLIC_ENDPOINTS | frozenset(
+        rule.endpoint
+        for rule in app.url_map.iter_rules()
+        if rule.endpoint == "static" or rule.endpoint.endswith(".static")
+    )
+
+
+def configure_auth_cache(app) -> None:
+    global OWNERSHIP_CACHE_TTL, USER_CACHE_TTL
+    USER_CACHE_TTL = OWNERSHIP_CACHE_TTL = app.config["AUTH_CACHE_TTL"]
+
+
+def _is_public_endpoint(endpoint: str | None) -> bool:
+    return endpoint in _PUBLIC_ENDPOINTS
 
-EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
-PUBLIC_ENDPOINTS = {
-    "auth.login",
-    "auth.login_post",
-    "auth.register",
-    "auth.register_post",
-    "static",
-}
+def invalidate_user_cache(user_id: int | None = None) -> None:
+    with _USER_CACHE_LOCK:
+        if user_id is None:
+            _USER_CACHE.clear()
+        else:
+            _USER_CACHE.pop(user_id, None)
+
+
+def _cached_user(user_id: int) -> User | None:
+    now = time.monotonic()
+    with _USER_CACHE_LOCK:
+        cached = _USER_CACHE.get(user_id)
+        if cached is None:
+            return None
+        if now - cached[0] > USER_CACHE_TTL:
+            del _USER_CACHE[user_id]
+            return None
+        return cached[1]
 
 
 def load_current_user():
     user_id = session.get("user_id")
-    if not user_id:
+    if not user_id or _is_public_endpoint(request.endpoint):
         g.user = None
         return None
-    db = get_session()
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
-    if user and not user.is_active:
+    user = _cached_user(user_id)
+    if user is None:
+        db = get_session()
+        user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+        if user is None:
+            g.user = None
+            return None
+        # Detached so later commits in this or other sessions never expire it.
+        db.expunge(user)
+        with _USER_CACHE_LOCK:
+            _USER_CACHE[user_id] = (time.monotonic(), user)
+    if not user.is_active:
         user = None
     g.user = user
     return user
@@ -34,7 +120,7 @@ def load_current_user():
 def require_login():
     if request.endpoint is None:
         return None
-    if request.endpoint in PUBLIC_ENDPOINTS or request.endpoint.startswith("static"):
+    if _is_public_endpoint(request.endpoint):
         return None
     if getattr(g, "user", None) is None:
         if request.blueprint == "api":
@@ -51,42 +137,74 @@ def is_safe_next_url(next_url: str | None) -> bool:
 
 
 def validate_email(email: str) -> bool:
-    return bool(EMAIL_RE.match(email))
+    if not EMAIL_RE.fullmatch(email):
+        return False
+    domain = email.rpartition("@")[2]
+    return "." in domain[1:-1]
 
 
 def validate_password(password: str) -> list[str]:
     errors: list[str] = []
     if len(password) < 8:
         errors.append("Password must be at least 8 characters")
-    if not re.search(r"[a-z]", password):
-        errors.append("Password must include a lowercase letter")
-    if not re.search(r"[A-Z]", password):
-        errors.append("Password must include an uppercase letter")
-    if not re.search(r"\d", password):
-        errors.append("Password must include a number")
-    if not re.search(r"[^A-Za-z0-9]", password):
-        errors.append("Password must include a symbol")
+    errors.extend(
+        message for pattern, message in PASSWORD_RULES if not pattern.search(password)
+    )
     return errors
 
 
-def user_crypto_exists(session_db, user_id: int, crypto_id: int) -> bool:
-    return (
+def invalidate_user_cryptos(user_id: int | None = None) -> None:
+    with _CRYPTO_CACHE_LOCK:
+        if user_id is None:
+            _USER_CRYPTOS.clear()
+            _CRYPTO_SUMMARIES.clear()
+        else:
+            _USER_CRYPTOS.pop(user_id, None)
+
+
+def user_crypto_ids(session_db, user_id: int) -> frozenset[int]:
+    now = time.monotonic()
+    with _CRYPTO_CACHE_LOCK:
+        cached = _USER_CRYPTOS.get(user_id)
+    if cached is not None and now - cached[0] <= OWNERSHIP_CACHE_TTL:
+        return cached[1]
+    crypto_ids = frozenset(
         session_db.execute(
-            select(UserCrypto.id)
-            .where(UserCrypto.user_id == user_id)
-            .where(UserCrypto.crypto_id == crypto_id)
-            .limit(1)
-        ).scalar_one_or_none()
-        is not None
+            select(UserCrypto.crypto_id).where(UserCrypto.user_id == user_id)
+        ).scalars()
     )
+    with _CRYPTO_CACHE_LOCK:
+        _USER_CRYPTOS[user_id] = (now, crypto_ids)
+    return crypto_ids
+
+
+def user_crypto_exists(session_db, user_id: int, crypto_id: int) -> bool:
+    return crypto_id in user_crypto_ids(session_db, user_id)
 
 
-def require_user_crypto(session_db, user_id: int, crypto_id: int) -> UserCrypto | None:
-    return session_db.execute(
-        select(UserCrypto)
-        .where(UserCrypto.user_id == user_id)
-        .where(UserCrypto.crypto_id == crypto_id)
-    ).scalar_one_or_none()
+def fetch_user_crypto(
+    session_db, user_id: int, crypto_id: int
+) -> CryptoSummary | None:
+    if not user_crypto_exists(session_db, user_id, crypto_id):
+        return None
+    now = time.monotonic()
+    with _CRYPTO_CACHE_LOCK:
+        cached = _CRYPTO_SUMMARIES.get(crypto_id)
+    if cached is not None and now - cached[0] <= CRYPTO_CACHE_TTL:
+        return cached[1]
+    row = session_db.execute(
+        select(
+            Cryptocurrency.coingecko_id,
+            Cryptocurrency.name,
+            Cryptocurrency.symbol,
+        ).where(Cryptocurrency.id == crypto_id)
+    ).one_or_none()
+    if row is None:
+        return None
+    summary = CryptoSummary(crypto_id, *row)
+    with _CRYPTO_CACHE_LOCK:
+        _CRYPTO_SUMMARIES[crypto_id] = (now, summary)
+    return summary
 
 
 def login_required(view):
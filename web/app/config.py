@@ -1,76 +1,171 @@
 import os
+from dataclasses import dataclass
 
 
+@dataclass(frozen=True, slots=True)
 class Config:
-    def __init__(self) -> None:
-        self.SECRET_KEY = os.environ.get("FLASK_SECRET_KEY", "dev-secret")
-        self.DATABASE_URL = os.environ.get("DATABASE_URL", "")
-        base_url_raw = os.environ.get("COINGECKO_BASE_URL", "").strip()
-        if not base_url_raw:
-            base_url_raw = "https://api.coingecko.com/api/v3"
-        base_url = base_url_raw.split("?", 1)[0].split("#", 1)[0].rstrip("/")
-        self.COINGECKO_BASE_URL = base_url or "https://api.coingecko.com/api/v3"
-        api_key = os.environ.get("COINGECKO_API_KEY", "").strip()
-        self.COINGECKO_API_KEY = api_key
-        api_key_header_raw = os.environ.get("COINGECKO_API_KEY_HEADER", "").strip()
-        api_key_header = api_key_header_raw.lower().replace("_", "-")
-        if api_key_header:
-            self.COINGECKO_API_KEY_HEADER = api_key_header
-        elif "pro-api.coingecko.com" in self.COINGECKO_BASE_URL:
-            self.COINGECKO_API_KEY_HEADER = "x-cg-pro-api-key"
+    SECRET_KEY: str
+    DATABASE_URL: str
+    COINGECKO_BASE_URL: str
+    COINGECKO_API_KEY: str
+    COINGECKO_API_KEY_HEADER: str
+    COINGECKO_VS_CURRENCY: str
+    MAX_HISTORY_DAYS: int
+    COINGECKO_REQUEST_DELAY: float
+    COINGECKO_RETRY_COUNT: int
+    COINGECKO_RETRY_DELAY: float
+    COINCAP_BASE_URL: str
+    COINCAP_API_KEY: str
+    COINCAP_REQUEST_DELAY: float
+    COINCAP_RETRY_COUNT: int
+    COINCAP_RETRY_DELAY: float
+    PROPHET_FUTURE_DAYS: int
+    RNN_FUTURE_DAYS: int
+    DARTS_WORK_DIR: str
+    LOG_LEVEL: str
+    DB_POOL_SIZE: int
+    DB_MAX_OVERFLOW: int
+    DB_POOL_RECYCLE: int
+    DB_POOL_CLASS: str
+    PASSWORD_HASH_METHOD: str
+    AUTH_CACHE_TTL: float
+    CELERY_BROKER_URL: str = ""
+    CELERY_RESULT_BACKEND: str = ""
+    WTF_CSRF_TIME_LIMIT: int = 3600
+    SESSION_COOKIE_HTTPONLY: bool = True
+    SESSION_COOKIE_SAMESITE: str = "Lax"
+    # None leaves Flask's default (reload only in debug); set it to false to
+    # stop Jinja from stat-ing template files on every render.
+    TEMPLATES_AUTO_RELOAD: bool | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ChartConfig:
+    # Settings read by the chart, dashboard and API views, resolved once per
+    # app instead of a config lookup per request.
+    max_history_days: int
+    vs_currency: str
+    currency_label: str
+    prophet_future_days: int
+    rnn_future_days: int
+
+
+def load_chart_config(app_config) -> ChartConfig:
+    vs_currency = app_config["COINGECKO_VS_CURRENCY"]
+    return ChartConfig(
+        max_history_days=app_config["MAX_HISTORY_DAYS"],
+        vs_currency=vs_currency,
+        currency_label=vs_currency.upper(),
+        prophet_future_days=app_config.get("PROPHET_FUTURE_DAYS", 30),
+        rnn_future_days=app_config.get("RNN_FUTURE_DAYS", 30),
+    )
+
+
+_CONFIG: Config | None = None
+
+_ENV_INTS = (
+    ("MAX_HISTORY_DAYS", 3650),
+    ("COINGECKO_RETRY_COUNT", 2),
+    ("COINCAP_RETRY_COUNT", 2),
+    ("PROPHET_FUTURE_DAYS", 30),
+    ("RNN_FUTURE_DAYS", 30),
+    ("DB_POOL_SIZE", 5),
+    ("DB_MAX_OVERFLOW", 10),
+    ("DB_POOL_RECYCLE", 1800),
+)
+_ENV_FLOATS = (
+    ("COINGECKO_REQUEST_DELAY", 1.1),
+    ("COINGECKO_RETRY_DELAY", 1.0),
+    ("COINCAP_REQUEST_DELAY", 1.1),
+    ("COINCAP_RETRY_DELAY", 1.0),
+    ("AUTH_CACHE_TTL", 5.0),
+)
+
+
+def _coerce_int(raw: str, default: int) -> int:
+    return int(raw) if raw.isdigit() else default
+
+
+def _coerce_float(raw: str, default: float) -> float:
+    if not raw:
+        return default
+    # Plain decimals skip the exception path; anything else (exponents,
+    # "inf", garbage) still goes through float() for identical results.
+    unsigned = raw[1:] if raw.startswith("-") else raw
+    if unsigned.replace(".", "", 1).isdecimal():
+        return float(raw)
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def _optional_bool(raw: str | None) -> bool | None:
+    if raw is None or not raw.strip():
+        return None
+    return raw.strip().lower() in {"1", "true", "yes"}
+
+
+def _clean_base_url(raw: str) -> str:
+    # Drops the query string, fragment and trailing slashes with one slice.
+    raw = raw.strip()
+    end = len(raw)
+    for marker in ("?", "#"):
+        index = raw.find(marker, 0, end)
+        if index >= 0:
+            end = index
+    while end > 0 and raw[end - 1] == "/":
+        end -= 1
+    return raw[:end]
+
+
+def _load_from_env() -> Config:
+    base_url_raw = os.environ.get("COINGECKO_BASE_URL", "").strip()
+    if not base_url_raw:
+        base_url_raw = "https://api.coingecko.com/api/v3"
+    base_url = _clean_base_url(base_url_raw)
+    coingecko_base_url = base_url or "https://api.coingecko.com/api/v3"
+    api_key_header_raw = os.environ.get("COINGECKO_API_KEY_HEADER", "").strip()
+    api_key_header = api_key_header_raw.lower().replace("_", "-")
+    if not api_key_header:
+        if "pro-api.coingecko.com" in coingecko_base_url:
+            api_key_header = "x-cg-pro-api-key"
         else:
-            self.COINGECKO_API_KEY_HEADER = "x-cg-demo-api-key"
-        vs_currency = os.environ.get("COINGECKO_VS_CURRENCY", "").strip()
-        self.COINGECKO_VS_CURRENCY = (vs_currency or "usd").lower()
-        max_days_raw = os.environ.get("MAX_HISTORY_DAYS", "")
-        self.MAX_HISTORY_DAYS = (
-            int(max_days_raw) if max_days_raw.isdigit() else 3650
-        )
-        delay_raw = os.environ.get("COINGECKO_REQUEST_DELAY", "1.1").strip()
-        try:
-            self.COINGECKO_REQUEST_DELAY = float(delay_raw)
-        except ValueError:
-            self.COINGECKO_REQUEST_DELAY = 1.1
-        retry_count_raw = os.environ.get("COINGECKO_RETRY_COUNT", "2").strip()
-        self.COINGECKO_RETRY_COUNT = (
-            int(retry_count_raw) if retry_count_raw.isdigit() else 2
-        )
-        retry_delay_raw = os.environ.get("COINGECKO_RETRY_DELAY", "1.0").strip()
-        try:
-            self.COINGECKO_RETRY_DELAY = float(retry_delay_raw)
-        except ValueError:
-            self.COINGECKO_RETRY_DELAY = 1.0
-        coincap_base_url_raw = os.environ.get("COINCAP_BASE_URL", "").strip()
-        coincap_base_url = (
-            coincap_base_url_raw.split("?", 1)[0]
-            .split("#", 1)[0]
-            .rstrip("/")
-        )
-        self.COINCAP_BASE_URL = coincap_base_url
-        self.COINCAP_API_KEY = os.environ.get("COINCAP_API_KEY", "").strip()
-        coincap_delay_raw = os.environ.get("COINCAP_REQUEST_DELAY", "1.1").strip()
-        try:
-            self.COINCAP_REQUEST_DELAY = float(coincap_delay_raw)
-        except ValueError:
-            self.COINCAP_REQUEST_DELAY = 1.1
-        coincap_retry_raw = os.environ.get("COINCAP_RETRY_COUNT", "2").strip()
-        self.COINCAP_RETRY_COUNT = (
-            int(coincap_retry_raw) if coincap_retry_raw.isdigit() else 2
-        )
-        coincap_retry_delay_raw = os.environ.get("COINCAP_RETRY_DELAY", "1.0").strip()
-        try:
-            self.COINCAP_RETRY_DELAY = float(coincap_retry_delay_raw)
-        except ValueError:
-            self.COINCAP_RETRY_DELAY = 1.0
-        prophet_days_raw = os.environ.get("PROPHET_FUTURE_DAYS", "30").strip()
-        self.PROPHET_FUTURE_DAYS = (
-            int(prophet_days_raw) if prophet_days_raw.isdigit() else 30
-        )
-        rnn_days_raw = os.environ.get("RNN_FUTURE_DAYS", "30").strip()
-        self.RNN_FUTURE_DAYS = int(rnn_days_raw) if rnn_days_raw.isdigit() else 30
-        darts_work_dir = os.environ.get("DARTS_WORK_DIR", "").strip()
-        self.DARTS_WORK_DIR = darts_work_dir or "/var/lib/app/darts"
-        self.LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
-        self.WTF_CSRF_TIME_LIMIT = 3600
-        self.SESSION_COOKIE_HTTPONLY = True
-        self.SESSION_COOKIE_SAMESITE = "Lax"
+            api_key_header = "x-cg-demo-api-key"
+    vs_currency = os.environ.get("COINGECKO_VS_CURRENCY", "").strip()
+    coincap_base_url = _clean_base_url(os.environ.get("COINCAP_BASE_URL", ""))
+    darts_work_dir = os.environ.get("DARTS_WORK_DIR", "").strip()
+    password_hash_method = os.environ.get("PASSWORD_HASH_METHOD", "").strip()
+    numbers: dict[str, int | float] = {
+        name: _coerce_int(os.environ.get(name, "").strip(), default)
+        for name, default in _ENV_INTS
+    }
+    for name, default in _ENV_FLOATS:
+        numbers[name] = _coerce_float(os.environ.get(name, "").strip(), default)
+    return Config(
+        SECRET_KEY=os.environ.get("FLASK_SECRET_KEY", "dev-secret"),
+        DATABASE_URL=os.environ.get("DATABASE_URL", ""),
+        COINGECKO_BASE_URL=coingecko_base_url,
+        COINGECKO_API_KEY=os.environ.get("COINGECKO_API_KEY", "").strip(),
+        COINGECKO_API_KEY_HEADER=api_key_header,
+        COINGECKO_VS_CURRENCY=(vs_currency or "usd").lower(),
+        COINCAP_BASE_URL=coincap_base_url,
+        COINCAP_API_KEY=os.environ.get("COINCAP_API_KEY", "").strip(),
+        DARTS_WORK_DIR=darts_work_dir or "/var/lib/app/darts",
+        LOG_LEVEL=os.environ.get("LOG_LEVEL", "INFO"),
+        DB_POOL_CLASS=os.environ.get("DB_POOL_CLASS", "").strip().lower(),
+        PASSWORD_HASH_METHOD=password_hash_method or "scrypt:32768:8:1",
+        CELERY_BROKER_URL=os.environ.get("CELERY_BROKER_URL", "").strip(),
+        CELERY_RESULT_BACKEND=os.environ.get("CELERY_RESULT_BACKEND", "").strip(),
+        TEMPLATES_AUTO_RELOAD=_optional_bool(os.environ.get("TEMPLATES_AUTO_RELOAD")),
+        **numbers,
+    )
+
+
+def get_config(reload: bool = False) -> Config:
+    # The environment is fixed for the life of the process; tests that change
+    # it ask for a reload.
+    global _CONFIG
+    if _CONFIG is None or reload:
+        _CONFIG = _load_from_env()
+    return _CONFIG
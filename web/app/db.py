@@ -1,8 +1,12 @@
+from contextlib import contextmanager
 import time
 
-from sqlalchemy import create_engine, inspect, text
+from flask import g, has_app_context
+from sqlalchemy import bindparam, create_engine, insert, inspect, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
 
 Base = declarative_base()
 SessionLocal: scoped_session | None = None
@@ -14,7 +18,22 @@ def init_db(app) -> None:
     if not database_url:
         raise RuntimeError("DATABASE_URL is not set")
 
-    engine = create_engine(database_url, pool_pre_ping=True)
+    engine_options = {"pool_pre_ping": True}
+    if app.config.get("DB_POOL_CLASS") == "null":
+        engine_options["poolclass"] = NullPool
+    else:
+        engine_options.update(
+            pool_size=app.config.get("DB_POOL_SIZE", 5),
+            max_overflow=app.config.get("DB_MAX_OVERFLOW", 10),
+            pool_recycle=app.config.get("DB_POOL_RECYCLE", 1800),
+        )
+    if _is_sqlite_memory(database_url):
+        # Every pooled connection would otherwise open its own empty database.
+        engine_options = {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        }
+    engine = create_engine(database_url, **engine_options)
     global SessionLocal, Engine
     SessionLocal = scoped_session(
         sessionmaker(bind=engine, autocommit=False, autoflush=False)
@@ -34,17 +53,40 @@ def init_db(app) -> None:
 
     Base.metadata.create_all(bind=engine)
     _ensure_forecast_model_run_columns(engine)
+    _ensure_crypto_prices_version_column(engine)
+    _ensure_price_covering_index(engine)
+    _ensure_forecast_created_indexes(engine)
 
     @app.teardown_appcontext
     def remove_session(exception=None) -> None:
+        g.pop("_db_session", None)
         if SessionLocal is not None:
             SessionLocal.remove()
 
 
 def get_session():
+    # Hooks and views share one session per app context; background job
+    # threads have no context and fall back to the thread-local registry.
+    if has_app_context():
+        session = g.get("_db_session")
+        if session is not None:
+            return session
     if SessionLocal is None:
         raise RuntimeError("Database not initialized")
-    return SessionLocal()
+    session = SessionLocal()
+    if has_app_context():
+        g._db_session = session
+    return session
+
+
+@contextmanager
+def session_scope():
+    # Job entry points own their session for the whole run and always close it.
+    session = get_session()
+    try:
+        yield session
+    finally:
+        session.close()
 
 
 def get_engine():
@@ -53,16 +95,129 @@ def get_engine():
     return Engine
 
 
+def bulk_upsert_prices(session, rows: list[dict]) -> int:
+    # Insert-only path for gaps: rows that already exist are skipped by the
+    # database instead of being probed one by one beforehand.
+    if not rows:
+        return 0
+    from .models import Price
+
+    if session.get_bind().dialect.name == "postgresql":
+        stmt = (
+            pg_insert(Price)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["crypto_id", "date"])
+        )
+    else:
+        stmt = insert(Price).values(rows).prefix_with("OR IGNORE")
+    inserted = session.execute(stmt).rowcount
+    if inserted:
+        bump_prices_version(session, {row["crypto_id"] for row in rows})
+    return inserted
+
+
+def bump_prices_version(session, crypto_ids) -> None:
+    # Runs inside the caller's write transaction so readers never see new
+    # prices under the old version.
+    from .models import Cryptocurrency
+
+    session.execute(
+        update(Cryptocurrency)
+        .where(Cryptocurrency.id.in_(list(crypto_ids)))
+        .values(prices_version=Cryptocurrency.prices_version + 1)
+    )
+
+
+def _is_sqlite_memory(database_url: str) -> bool:
+    return database_url in ("sqlite://", "sqlite:///:memory:")
+
+
+def _table_columns(conn, tables: tuple[str, ...]) -> dict[str, set[str]]:
+    if conn.dialect.name == "postgresql":
+        # One catalog round-trip instead of the inspector's query per table.
+        rows = conn.execute(
+            text(
+                "SELECT table_name, column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name IN :tables"
+            ).bindparams(bindparam("tables", expanding=True)),
+            {"tables": list(tables)},
+        )
+        columns: dict[str, set[str]] = {}
+        for table_name, column_name in rows:
+            columns.setdefault(table_name, set()).add(column_name)
+        return columns
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    return {
+        table: {col["name"] for col in inspector.get_columns(table)}
+        for table in tables
+        if table in existing
+    }
+
+
 def _ensure_forecast_model_run_columns(engine) -> None:
-    inspector = inspect(engine)
-    tables = set(inspector.get_table_names())
-    for table in ("lstm_forecasts", "gru_forecasts"):
-        if table not in tables:
-            continue
-        columns = {col["name"] for col in inspector.get_columns(table)}
-        if "model_run_id" in columns:
-            continue
-        with engine.begin() as conn:
+    tables = ("lstm_forecasts", "gru_forecasts")
+    with engine.begin() as conn:
+        columns = _table_columns(conn, tables)
+        for table in tables:
+            if table not in columns or "model_run_id" in columns[table]:
+                continue
             conn.execute(
                 text(f"ALTER TABLE {table} ADD COLUMN model_run_id INTEGER")
             )
+
+
+def _ensure_crypto_prices_version_column(engine) -> None:
+    with engine.begin() as conn:
+        columns = _table_columns(conn, ("cryptocurrencies",))
+        existing = columns.get("cryptocurrencies")
+        if existing is None or "prices_version" in existing:
+            return
+        conn.execute(
+            text(
+                "ALTER TABLE cryptocurrencies "
+                "ADD COLUMN prices_version INTEGER NOT NULL DEFAULT 0"
+            )
+        )
+
+
+def _ensure_price_covering_index(engine) -> None:
+    inspector = inspect(engine)
+    if "prices" not in inspector.get_table_names():
+        return
+    names = {index["name"] for index in inspector.get_indexes("prices")}
+    if "ix_prices_crypto_date_price" in names:
+        return
+    if engine.dialect.name == "postgresql":
+        columns = "(crypto_id, date) INCLUDE (price)"
+    else:
+        columns = "(crypto_id, date, price)"
+    # Web, scheduler and workers all run this at start-up; IF NOT EXISTS keeps
+    # a concurrent creation from failing.
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_prices_crypto_date_price "
+                f"ON prices {columns}"
+            )
+        )
+
+
+_FORECAST_CREATED_INDEXES = (
+    ("ix_prophet_crypto_created", "prophet_forecasts"),
+    ("ix_lstm_crypto_created", "lstm_forecasts"),
+    ("ix_gru_crypto_created", "gru_forecasts"),
+)
+
+
+def _ensure_forecast_created_indexes(engine) -> None:
+    # Serves the latest cutoff/horizon probe (ORDER BY created_at DESC LIMIT 1)
+    # on databases created before the index was declared.
+    with engine.begin() as conn:
+        for name, table in _FORECAST_CREATED_INDEXES:
+            conn.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS {name} "
+                    f"ON {table} (crypto_id, created_at)"
+                )
+            )
@@ -8,6 +8,7 @@ from sqlalchemy import (
     JSON,
     Numeric,
     String,
+    Text,
     UniqueConstraint,
     Boolean,
     func,
@@ -25,6 +26,9 @@ class Cryptocurrency(Base):
     symbol = Column(String(20))
     coingecko_id = Column(String(100), nullable=False, unique=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    # Bumped in the same transaction as every price write; the chart and
+    # dashboard caches key on it instead of aggregating the price history.
+    prices_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     prices = relationship("Price", back_populates="crypto", cascade="all, delete-orphan")
     prophet_forecasts = relationship(
@@ -65,15 +69,30 @@ class Price(Base):
     id = Column(Integer, primary_key=True)
     crypto_id = Column(Integer, ForeignKey("cryptocurrencies.id"), nullable=False)
     date = Column(Date, nullable=False)
-    price = Column(Numeric(18, 8), nullable=False)
+    price = Column(Numeric(18, 8, asdecimal=False), nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     crypto = relationship("Cryptocurrency", back_populates="prices")
 
     __table_args__ = (
         UniqueConstraint("crypto_id", "date", name="uq_price_crypto_date"),
-        Index("ix_prices_crypto_date", "crypto_id", "date"),
+        # Covers the (crypto_id, date) lookups and returns price without a heap
+        # fetch; Postgres keeps price out of the key via INCLUDE.
+        Index(
+            "ix_prices_crypto_date_price",
+            "crypto_id",
+            "date",
+            postgresql_include=["price"],
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_prices_crypto_date_price",
+            "crypto_id",
+            "date",
+            "price",
+        ).ddl_if(dialect="sqlite"),
     )
+    # created_at is never read back after a flush; skip the extra fetch.
+    __mapper_args__ = {"eager_defaults": False}
 
 
 class ProphetForecast(Base):
@@ -82,9 +101,9 @@ class ProphetForecast(Base):
     id = Column(Integer, primary_key=True)
     crypto_id = Column(Integer, ForeignKey("cryptocurrencies.id"), nullable=False)
     date = Column(Date, nullable=False)
-    yhat = Column(Numeric(18, 8))
-    yhat_lower = Column(Numeric(18, 8))
-    yhat_upper = Column(Numeric(18, 8))
+    yhat = Column(Numeric(18, 8, asdecimal=False))
+    yhat_lower = Column(Numeric(18, 8, asdecimal=False))
+    yhat_upper = Column(Numeric(18, 8, asdecimal=False))
     cutoff_date = Column(Date, nullable=False)
     horizon_days = Column(Integer, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -94,6 +113,7 @@ class ProphetForecast(Base):
     __table_args__ = (
         UniqueConstraint("crypto_id", "date", name="uq_prophet_crypto_date"),
         Index("ix_prophet_crypto_date", "crypto_id", "date"),
+        Index("ix_prophet_crypto_created", "crypto_id", "created_at"),
     )
 
 
@@ -127,9 +147,9 @@ class LstmForecast(Base):
     crypto_id = Column(Integer, ForeignKey("cryptocurrencies.id"), nullable=False)
     model_run_id = Column(Integer, ForeignKey("forecast_model_runs.id"))
     date = Column(Date, nullable=False)
-    yhat = Column(Numeric(18, 8))
-    yhat_lower = Column(Numeric(18, 8))
-    yhat_upper = Column(Numeric(18, 8))
+    yhat = Column(Numeric(18, 8, asdecimal=False))
+    yhat_lower = Column(Numeric(18, 8, asdecimal=False))
+    yhat_upper = Column(Numeric(18, 8, asdecimal=False))
     cutoff_date = Column(Date, nullable=False)
     horizon_days = Column(Integer, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -140,6 +160,7 @@ class LstmForecast(Base):
     __table_args__ = (
         UniqueConstraint("crypto_id", "date", name="uq_lstm_crypto_date"),
         Index("ix_lstm_crypto_date", "crypto_id", "date"),
+        Index("ix_lstm_crypto_created", "crypto_id", "created_at"),
     )
 
 
@@ -150,9 +171,9 @@ class GruForecast(Base):
     crypto_id = Column(Integer, ForeignKey("cryptocurrencies.id"), nullable=False)
     model_run_id = Column(Integer, ForeignKey("forecast_model_runs.id"))
     date = Column(Date, nullable=False)
-    yhat = Column(Numeric(18, 8))
-    yhat_lower = Column(Numeric(18, 8))
-    yhat_upper = Column(Numeric(18, 8))
+    yhat = Column(Numeric(18, 8, asdecimal=False))
+    yhat_lower = Column(Numeric(18, 8, asdecimal=False))
+    yhat_upper = Column(Numeric(18, 8, asdecimal=False))
     cutoff_date = Column(Date, nullable=False)
     horizon_days = Column(Integer, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -163,6 +184,7 @@ class GruForecast(Base):
     __table_args__ = (
         UniqueConstraint("crypto_id", "date", name="uq_gru_crypto_date"),
         Index("ix_gru_crypto_date", "crypto_id", "date"),
+        Index("ix_gru_crypto_created", "crypto_id", "created_at"),
     )
 
 
@@ -177,3 +199,23 @@ class User(Base):
     user_cryptos = relationship(
         "UserCrypto", back_populates="user", cascade="all, delete-orphan"
     )
+
+
+class JobRun(Base):
+    # Latest Celery run per job key, shared by every web process; thread-mode
+    # jobs stay in memory.
+    __tablename__ = "job_runs"
+
+    job_key = Column(String(128), primary_key=True)
+    job_type = Column(String(32), nullable=False)
+    label = Column(String(64), nullable=False)
+    task_id = Column(String(36), nullable=False)
+    state = Column(String(16), nullable=False)
+    message = Column(Text, nullable=False)
+    result = Column(JSON)
+    error = Column(Text)
+    # Naive UTC, like the other DateTime columns.
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (Index("ix_job_runs_state", "state"),)
@@ -1,15 +1,65 @@
-from flask import Blueprint, current_app, g, jsonify, request
-from sqlalchemy import and_, func, select
+from flask import Blueprint, Response, current_app, g, jsonify, request
+from sqlalchemy import lambda_stmt, select
 
-from ..auth_utils import require_user_crypto
+from ..auth_utils import fetch_user_crypto, user_crypto_exists
 from ..db import get_session
 from ..models import Cryptocurrency, Price, UserCrypto
-from ..services.analytics import compute_indicators
-from ..services.series import clamp_days, fetch_price_series
+from ..services.series import clamp_days, fetch_price_arrays, fetch_price_series
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency fallback
+    orjson = None
 
 bp = Blueprint("api", __name__, url_prefix="/api")
 
 
+# lambda_stmt caches the constructed and compiled statement by code location;
+# the closure variables become bound parameters.
+def _list_cryptos_stmt(user_id: int):
+    def build():
+        # Correlated probe: one backwards scan of the (crypto_id, date) index
+        # per crypto instead of aggregating every price row and joining back.
+        latest_price_id = (
+            select(Price.id)
+            .where(Price.crypto_id == Cryptocurrency.id)
+            .order_by(Price.date.desc())
+            .limit(1)
+            .correlate(Cryptocurrency)
+            .scalar_subquery()
+        )
+        return (
+            select(
+                Cryptocurrency.id,
+                Cryptocurrency.coingecko_id,
+                Cryptocurrency.name,
+                Cryptocurrency.symbol,
+                Price.price,
+                Price.date,
+            )
+            .join(UserCrypto, UserCrypto.crypto_id == Cryptocurrency.id)
+            .outerjoin(Price, Price.id == latest_price_id)
+            .where(UserCrypto.user_id == user_id)
+            .order_by(Cryptocurrency.name)
+        )
+
+    return lambda_stmt(build)
+
+
+def _prices_stmt(crypto_id: int):
+    return lambda_stmt(
+        lambda: select(Price.date, Price.price)
+        .where(Price.crypto_id == crypto_id)
+        .order_by(Price.date.asc())
+    )
+
+
+def _json_response(payload):
+    if orjson is None:
+        return jsonify(payload)
+    return Response(orjson.dumps(payload), mimetype="application/json")
+
+
 @bp.get("/health")
 def health():
     return jsonify({"status": "ok"})
@@ -18,91 +68,64 @@ def health():
 @bp.get("/cryptos")
 def list_cryptos():
     session = get_session()
-    latest = (
-        select(Price.crypto_id, func.max(Price.date).label("max_date"))
-        .group_by(Price.crypto_id)
-        .subquery()
-    )
-    stmt = (
-        select(Cryptocurrency, Price)
-        .join(UserCrypto, UserCrypto.crypto_id == Cryptocurrency.id)
-        .outerjoin(latest, latest.c.crypto_id == Cryptocurrency.id)
-        .outerjoin(
-            Price,
-            and_(
-                Price.crypto_id == Cryptocurrency.id,
-                Price.date == latest.c.max_date,
-            ),
-        )
-        .where(UserCrypto.user_id == g.user.id)
-        .order_by(Cryptocurrency.name)
-    )
-    rows = session.execute(stmt).all()
-    payload = []
-    for crypto, price in rows:
-        payload.append(
-            {
-                "id": crypto.id,
-                "coingecko_id": crypto.coingecko_id,
-                "name": crypto.name,
-                "symbol": crypto.symbol,
-                "latest_price": float(price.price) if price else None,
-                "latest_date": price.date.isoformat() if price else None,
-            }
-        )
+    # Column tuples only; no Cryptocurrency/Price instances are hydrated.
+    rows = session.execute(_list_cryptos_stmt(g.user.id))
+    payload = [
+        {
+            "id": crypto_id,
+            "coingecko_id": coingecko_id,
+            "name": name,
+            "symbol": symbol,
+            "latest_price": float(price) if price is not None else None,
+            "latest_date": price_date.isoformat() if price_date else None,
+        }
+        for crypto_id, coingecko_id, name, symbol, price, price_date in rows
+    ]
     return jsonify(payload)
 
 
 @bp.get("/cryptos/<int:crypto_id>/prices")
 def prices(crypto_id: int):
     session = get_session()
-    if not require_user_crypto(session, g.user.id, crypto_id):
+    if not user_crypto_exists(session, g.user.id, crypto_id):
         return jsonify({"error": "not found"}), 404
-    prices = (
-        session.execute(
-            select(Price)
-            .where(Price.crypto_id == crypto_id)
-            .order_by(Price.date.asc())
-        )
-        .scalars()
-        .all()
-    )
+    # Plain column tuples: no ORM instances to hydrate per row.
     payload = [
-        {"date": price.date.isoformat(), "price": float(price.price)}
-        for price in prices
+        {"date": price_date.isoformat(), "price": float(price)}
+        for price_date, price in session.execute(_prices_stmt(crypto_id))
     ]
-    return jsonify(payload)
+    return _json_response(payload)
 
 
 @bp.get("/cryptos/<int:crypto_id>/series")
 def series(crypto_id: int):
     session = get_session()
-    if not require_user_crypto(session, g.user.id, crypto_id):
-        return jsonify({"error": "not found"}), 404
-    crypto = session.execute(
-        select(Cryptocurrency).where(Cryptocurrency.id == crypto_id)
-    ).scalar_one_or_none()
+    crypto = fetch_user_crypto(session, g.user.id, crypto_id)
     if not crypto:
         return jsonify({"error": "not found"}), 404
 
-    max_days = current_app.config["MAX_HISTORY_DAYS"]
+    chart_config = current_app.extensions["chart_config"]
+    max_days = chart_config.max_history_days
     days = clamp_days(request.args.get("days", "").strip(), max_days)
     indicators_raw = request.args.get("indicators", "1").strip().lower()
     include_indicators = indicators_raw not in {"0", "false", "no"}
 
-    rows = fetch_price_series(session, crypto_id, days)
     if include_indicators:
-        series_data = compute_indicators(rows)
+        from ..services.analytics import compute_indicator_columns, indicator_rows
+
+        dates, prices = fetch_price_arrays(session, crypto_id, days)
+        series_data = indicator_rows(compute_indicator_columns(dates, prices))
     else:
         series_data = [
-            {"date": row["date"].isoformat(), "price": row["price"]} for row in rows
+            {"date": row["date"].isoformat(), "price": row["price"]}
+            for row in fetch_price_series(session, crypto_id, days)
         ]
 
     return jsonify(
         {
             "crypto_id": crypto_id,
             "coingecko_id": crypto.coingecko_id,
-            "currency": current_app.config["COINGECKO_VS_CURRENCY"],
+            "currency": chart_config.vs_currency,
             "days": days,
             "count": len(series_data),
             "series": series_data,
@@ -1,7 +1,22 @@
-from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    session,
+    url_for,
+)
+from sqlalchemy import select
 from werkzeug.security import check_password_hash, generate_password_hash
 
-from ..auth_utils import is_safe_next_url, validate_email, validate_password
+from ..auth_utils import (
+    invalidate_user_cache,
+    is_safe_next_url,
+    validate_email,
+    validate_password,
+)
 from ..db import get_session
 from ..models import User
 
@@ -26,13 +41,16 @@ def login_post():
         return redirect(url_for("auth.login", next=next_url))
 
     session_db = get_session()
-    user = session_db.query(User).filter(User.email == email).first()
+    user = session_db.execute(
+        select(User).where(User.email == email)
+    ).scalar_one_or_none()
     if not user or not user.is_active or not check_password_hash(
         user.password_hash, password
     ):
         flash("Invalid credentials", "error")
         return redirect(url_for("auth.login", next=next_url))
 
+    invalidate_user_cache(user.id)
     session.clear()
     session["user_id"] = user.id
     if is_safe_next_url(next_url):
@@ -68,12 +86,18 @@ def register_post():
         return redirect(url_for("auth.register"))
 
     session_db = get_session()
-    existing = session_db.query(User).filter(User.email == email).first()
+    existing = session_db.execute(
+        select(User.id).where(User.email == email)
+    ).scalar_one_or_none()
     if existing:
         flash("Email is already registered", "error")
         return redirect(url_for("auth.register"))
 
-    user = User(email=email, password_hash=generate_password_hash(password))
+    # hashlib's KDFs release the GIL, so other requests keep running meanwhile.
+    password_hash = generate_password_hash(
+        password, method=current_app.config["PASSWORD_HASH_METHOD"]
+    )
+    user = User(email=email, password_hash=password_hash)
     session_db.add(user)
     session_db.commit()
     session.clear()
@@ -89,6 +113,9 @@ def logout():
 
 @bp.post("/logout")
 def logout_post():
+    user_id = session.get("user_id")
+    if user_id:
+        invalidate_user_cache(user_id)
     session.clear()
     flash("Logged out", "success")
     return redirect(url_for("auth.login"))
@@ -1,7 +1,12 @@
-from datetime import date, timedelta
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
 import os
 import shutil
+import threading
+import time
 
+import numpy as np
 from flask import (
     Blueprint,
     abort,
@@ -12,19 +17,22 @@ from flask import (
     redirect,
     render_template,
     request,
+    session as user_session,
     url_for,
 )
-from sqlalchemy import delete, select
+from flask_wtf.csrf import generate_csrf
+from sqlalchemy import delete, func, literal, select, true
 
-from ..auth_utils import require_user_crypto
+from ..auth_utils import fetch_user_crypto, user_crypto_exists
 from ..db import get_session
-from ..models import Cryptocurrency, ForecastModelRun, GruForecast, LstmForecast
-from ..services.analytics import compute_indicators
-from ..services.prophet import (
-    fetch_prophet_forecast,
-    fetch_prophet_meta,
-    store_prophet_forecast,
+from ..models import (
+    Cryptocurrency,
+    ForecastModelRun,
+    GruForecast,
+    LstmForecast,
+    Price,
 )
+from ..services.analytics import compute_indicator_columns, indicator_rows
 from ..services.prophet_defaults import (
     PROPHET_DEFAULT_CHANGEPOINT,
     PROPHET_DEFAULT_CHANGEPOINT_RANGE,
@@ -32,74 +40,109 @@ from ..services.prophet_defaults import (
     PROPHET_DEFAULT_YEARLY,
     resolve_prophet_defaults,
 )
-from ..services.rnn import (
-    fetch_gru_forecast,
-    fetch_gru_meta,
-    fetch_lstm_forecast,
-    fetch_lstm_meta,
-    store_gru_forecast,
-    store_lstm_forecast,
+from ..services.forecast_jobs import run_prophet_forecast, run_rnn_forecast
+from ..services.forecasts import FORECAST_TABLES, fetch_forecast_bundles
+from ..services.jobs import (
+    JOB_FLASH_CATEGORIES,
+    JOB_STATUS_CODES,
+    JOB_WAIT_MAX_SECONDS,
+    get_job_status,
+    start_job,
+    wait_for_job,
+)
+from ..services.series import (
+    clamp_days,
+    current_date,
+    fetch_price_arrays,
+    window_start,
 )
-from ..services.global_inference import predict_with_global_model
-from ..services.global_training import train_global_model
-from ..services.jobs import get_job_status, start_job
-from ..services.series import clamp_days, fetch_price_series
 
 bp = Blueprint("charts", __name__)
 
+DETAIL_TEMPLATE = "crypto_detail.html"
+DETAIL_CACHE_TTL = 60.0
+DETAIL_CACHE_MAX_ENTRIES = 256
+
+_DETAIL_LOCK = threading.Lock()
+# Per-(crypto, days) series and forecasts; the page itself carries the user's
+# flashes and CSRF token, so it is only revalidated per user (see
+# _detail_page_state).
+# Kept in LRU order and bounded, since `days` is any value up to the history
+# limit.
+_DETAIL_DATA: OrderedDict[
+    tuple[int, int], tuple[float, tuple, dict[str, object]]
+] = OrderedDict()
+
 JOB_LABELS = {
     "prophet": "Prophet",
     "lstm": "LSTM",
     "gru": "GRU",
 }
 
+_DISABLED_JOBS = {
+    job_type: {
+        "job_type": job_type,
+        "label": label,
+        "state": "error",
+        "message": f"{label} forecast disabled",
+    }
+    for job_type, label in JOB_LABELS.items()
+}
+
+
+def _detail_path(crypto_id: int) -> str:
+    # Same result as url_for("charts.crypto_detail", ...) for this fixed rule,
+    # without binding a URL adapter on every POST redirect.
+    return f"{request.script_root}/cryptos/{crypto_id}"
+
 
 def _redirect_with_days(crypto_id: int):
     days_raw = request.form.get("range_days", "").strip()
     if not days_raw:
         days_raw = request.args.get("days", "").strip()
-    if days_raw.isdigit():
-        return redirect(
-            url_for("charts.crypto_detail", crypto_id=crypto_id, days=days_raw)
-        )
-    return redirect(url_for("charts.crypto_detail", crypto_id=crypto_id))
+    if days_raw.isascii() and days_raw.isdigit():
+        return redirect(f"{_detail_path(crypto_id)}?days={days_raw}")
+    return redirect(_detail_path(crypto_id))
 
 
+# Polls and POSTs for the same job reuse one key string.
+@lru_cache(maxsize=4096)
 def _job_key(job_type: str, crypto_id: int) -> str:
     return f"{job_type}:{crypto_id}"
 
 
 def _job_response(crypto_id: int, job: dict[str, object]):
-    accept_header = request.headers.get("Accept", "")
-    if "application/json" in accept_header:
-        status_code = 202 if job.get("state") == "running" else 200
-        return jsonify(job), status_code
-
     state = job.get("state")
-    message = job.get("message") or "Update queued."
-    if state == "done":
-        flash(message, "success")
-    elif state in {"error"}:
-        flash(message, "error")
-    elif state == "busy":
-        flash(message, "warning")
-    else:
-        flash(message, "info")
+    if "application/json" in request.headers.get("Accept", ""):
+        response = jsonify(job)
+        response.status_code = JOB_STATUS_CODES.get(state, 200)
+        if state == "running":
+            # 202 Accepted points the client at the job's status endpoint.
+            response.headers["Location"] = url_for(
+                "charts.job_status", crypto_id=crypto_id, job_type=job["job_type"]
+            )
+        return response
+
+    flash(
+        job.get("message") or "Update queued.",
+        JOB_FLASH_CATEGORIES.get(state, "info"),
+    )
     return _redirect_with_days(crypto_id)
 
 
-def _parse_int(
-    value: str | None, default: int, allowed: set[int] | None = None
-) -> int:
-    if not value:
-        return default
+def _to_int(value: str) -> int | None:
+    # Plain (optionally signed) decimals go straight to int(); only tokens
+    # int() might still accept, such as "1_000", pay for the exception path.
+    token = value.strip()
+    digits = token[1:] if token[:1] in ("-", "+") else token
+    if digits.isdecimal():
+        return int(token)
+    if "_" not in digits:
+        return None
     try:
-        parsed = int(value)
+        return int(token)
     except ValueError:
-        return default
-    if allowed is not None and parsed not in allowed:
-        return default
-    return parsed
+        return None
 
 
 def _parse_int_range(
@@ -107,15 +150,11 @@ def _parse_int_range(
 ) -> int:
     if not value:
         return default
-    try:
-        parsed = int(value)
-    except ValueError:
+    parsed = _to_int(value)
+    if parsed is None:
         return default
-    if parsed < min_value:
-        return min_value
-    if max_value is not None and parsed > max_value:
-        return max_value
-    return parsed
+    parsed = max(parsed, min_value)
+    return parsed if max_value is None else min(parsed, max_value)
 
 
 def _parse_choice(value: str | None, allowed: set[str], default: str) -> str:
@@ -137,15 +176,16 @@ def _parse_float_range(
 ) -> float:
     if not value:
         return default
-    try:
-        parsed = float(value)
-    except ValueError:
-        return default
-    if parsed < min_value:
-        return min_value
-    if parsed > max_value:
-        return max_value
-    return parsed
+    token = value.strip()
+    unsigned = token[1:] if token[:1] in ("-", "+") else token
+    if unsigned.replace(".", "", 1).isdecimal():
+        parsed = float(token)
+    else:
+        try:
+            parsed = float(token)
+        except ValueError:
+            return default
+    return min(max(parsed, min_value), max_value)
 
 
 def _parse_int_list(
@@ -158,29 +198,18 @@ def _parse_int_list(
         return list(default)
     items = []
     for part in value.split(","):
-        token = part.strip()
-        if not token:
-            continue
-        try:
-            parsed = int(token)
-        except ValueError:
+        parsed = _to_int(part)
+        if parsed is None:
             continue
-        if parsed < min_value:
-            parsed = min_value
-        if parsed > max_value:
-            parsed = max_value
-        items.append(parsed)
+        items.append(min(max(parsed, min_value), max_value))
     return items or list(default)
 
 
 def _parse_optional_int(value: str | None) -> int | None:
     if not value:
         return None
-    try:
-        parsed = int(value)
-    except ValueError:
-        return None
-    if parsed <= 0:
+    parsed = _to_int(value)
+    if parsed is None or parsed <= 0:
         return None
     return parsed
 
@@ -200,128 +229,297 @@ def _parse_id_list(values: list[str]) -> list[int]:
     return parsed
 
 
-def _filter_existing_crypto_ids(
-    session, crypto_ids: list[int]
-) -> list[int]:
-    if not crypto_ids:
-        return []
-    existing_ids = set(
-        session.execute(
-            select(Cryptocurrency.id).where(
-                Cryptocurrency.id.in_(crypto_ids)
-            )
-        ).scalars()
+def _state_aggregates(crypto_id: int) -> list:
+    # Index probes only: the version counter moves with every price write, the
+    # latest date with rows loaded outside the updater, and each forecast
+    # table's newest created_at with finished jobs (thread or worker).
+    aggregates = [
+        select(Cryptocurrency.prices_version)
+        .where(Cryptocurrency.id == crypto_id)
+        .scalar_subquery(),
+        select(func.max(Price.date))
+        .where(Price.crypto_id == crypto_id)
+        .scalar_subquery(),
+    ]
+    for _name, table in FORECAST_TABLES:
+        aggregates.append(
+            select(func.max(table.created_at))
+            .where(table.crypto_id == crypto_id)
+            .scalar_subquery()
+        )
+    return aggregates
+
+
+def _detail_state(session, crypto_id: int) -> tuple:
+    # The date covers the sliding window start.
+    aggregates = _state_aggregates(crypto_id)
+    return (current_date(), *session.execute(select(*aggregates)).one())
+
+
+def _detail_page_state(
+    session, crypto_id: int, days: int
+) -> tuple[str, list[dict[str, object]]]:
+    # One round-trip for the page: the header's last two closes of the window,
+    # each row carrying the aggregates behind the ETag (the chart state and
+    # the cryptos and shared global runs listed in the forecast forms).
+    global_runs = ForecastModelRun.scope == "global_shared"
+    aggregates = _state_aggregates(crypto_id) + [
+        select(func.count(Cryptocurrency.id)).scalar_subquery(),
+        select(func.max(Cryptocurrency.id)).scalar_subquery(),
+        select(func.count(ForecastModelRun.id)).where(global_runs).scalar_subquery(),
+        select(func.max(ForecastModelRun.cutoff_date))
+        .where(global_runs)
+        .scalar_subquery(),
+    ]
+    latest_query = select(Price.date, Price.price).where(
+        Price.crypto_id == crypto_id
     )
-    return [cid for cid in crypto_ids if cid in existing_ids]
+    start_date = window_start(days)
+    if start_date is not None:
+        latest_query = latest_query.where(Price.date >= start_date)
+    latest = latest_query.order_by(Price.date.desc()).limit(2).subquery()
+    # Outer join from a one-row anchor so the aggregates come back even when
+    # the window has no prices.
+    anchor = select(literal(1).label("anchor")).subquery()
+    rows = session.execute(
+        select(latest.c.date, latest.c.price, *aggregates)
+        .select_from(anchor)
+        .outerjoin(latest, true())
+        .order_by(latest.c.date.asc())
+    ).all()
+    latest_points = [
+        {"date": price_date.isoformat(), "price": float(price)}
+        for price_date, price, *_state in rows
+        if price_date is not None
+    ]
+    state = tuple(rows[0][2:])
+    config = current_app.config
+    # The page embeds signed CSRF tokens; rotating the tag every half time
+    # limit keeps a revalidated copy from serving expired tokens.
+    time_limit = config.get("WTF_CSRF_TIME_LIMIT")
+    token_window = int(time.time() // max(time_limit // 2, 1)) if time_limit else 0
+    # Creates the session's raw token up front, as the render would.
+    generate_csrf()
+    csrf_raw = user_session.get(config.get("WTF_CSRF_FIELD_NAME", "csrf_token"))
+    key = repr(
+        (
+            _page_version(),
+            g.user.id,
+            days,
+            current_date(),
+            state,
+            token_window,
+            csrf_raw,
+        )
+    ).encode()
+    return hashlib.blake2b(key, digest_size=16).hexdigest(), latest_points
+
+
+def _page_version() -> str:
+    # Digest of the template sources: a release that changes the markup must
+    # not revalidate pages rendered by the previous one. Identical across
+    # workers and replicas, unlike file mtimes.
+    env = current_app.jinja_env
+    version = current_app.extensions.get("charts.page_version")
+    if version is None or env.auto_reload:
+        digest = hashlib.blake2b(digest_size=8)
+        for name in sorted(env.list_templates()):
+            source, _filename, _uptodate = env.loader.get_source(env, name)
+            digest.update(name.encode())
+            digest.update(source.encode())
+        version = digest.hexdigest()
+        current_app.extensions["charts.page_version"] = version
+    return version
+
+
+def invalidate_detail_data(crypto_id: int | None = None) -> None:
+    with _DETAIL_LOCK:
+        if crypto_id is None:
+            _DETAIL_DATA.clear()
+            return
+        for key in [key for key in _DETAIL_DATA if key[0] == crypto_id]:
+            del _DETAIL_DATA[key]
+
+
+def _cached_detail_data(crypto_id: int, days: int, state: tuple):
+    now = time.monotonic()
+    key = (crypto_id, days)
+    with _DETAIL_LOCK:
+        cached = _DETAIL_DATA.get(key)
+        if cached is None:
+            return None
+        stored_at, cached_state, data = cached
+        if cached_state != state or now - stored_at > DETAIL_CACHE_TTL:
+            del _DETAIL_DATA[key]
+            return None
+        _DETAIL_DATA.move_to_end(key)
+        return data
+
+
+def _store_detail_data(crypto_id: int, days: int, state: tuple, data) -> None:
+    now = time.monotonic()
+    with _DETAIL_LOCK:
+        expired = [
+            key
+            for key, (stored_at, _state, _data) in _DETAIL_DATA.items()
+            if now - stored_at > DETAIL_CACHE_TTL
+        ]
+        for key in expired:
+            del _DETAIL_DATA[key]
+        _DETAIL_DATA[(crypto_id, days)] = (now, state, data)
+        _DETAIL_DATA.move_to_end((crypto_id, days))
+        while len(_DETAIL_DATA) > DETAIL_CACHE_MAX_ENTRIES:
+            _DETAIL_DATA.popitem(last=False)
+
+
+def _build_detail_data(
+    session, crypto_id: int, days: int, max_days: int
+) -> dict[str, object]:
+    start_date = window_start(days)
+    indicator_padding = 49
+    fetch_days = days
+    if days > 0:
+        fetch_days = min(days + indicator_padding, max_days)
+    dates, prices = fetch_price_arrays(session, crypto_id, fetch_days)
+    columns = compute_indicator_columns(dates, prices)
+    series_padding = []
+    series_start = 0
+    if start_date is not None:
+        series_start = int(
+            np.searchsorted(dates, np.datetime64(start_date, "D"))
+        )
+        padding_start = max(series_start - indicator_padding, 0)
+        series_padding = [
+            {"date": iso_date, "price": price}
+            for iso_date, price in zip(
+                dates[padding_start:series_start].astype("U10").tolist(),
+                prices[padding_start:series_start].tolist(),
+            )
+        ]
+    payload: dict[str, object] = {
+        "series": indicator_rows(columns, series_start),
+        "series_padding": series_padding,
+    }
+    bundles = fetch_forecast_bundles(session, crypto_id, start_date)
+    for name, bundle in bundles.items():
+        cutoff_date = bundle["cutoff_date"]
+        payload[name] = {
+            "forecast": bundle["forecast"],
+            "cutoff": cutoff_date.isoformat() if cutoff_date else None,
+        }
+    # Serialized and hashed once per cache entry; a hit can answer a
+    # revalidation with 304 without touching the payload.
+    body = current_app.json.dumps(payload).encode()
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return {"body": body, "etag": etag}
+
+
+def _detail_days(max_days: int) -> int:
+    days_raw = request.args.get("days", "").strip()
+    if not days_raw:
+        days_raw = str(min(365, max_days))
+    return clamp_days(days_raw, max_days)
+
+
+def _detail_template():
+    # Resolved once per app instead of a loader lookup per request;
+    # render_template still applies the context processors.
+    env = current_app.jinja_env
+    if env.auto_reload:
+        return DETAIL_TEMPLATE
+    template = current_app.extensions.get("charts.detail_template")
+    if template is None:
+        template = env.get_template(DETAIL_TEMPLATE)
+        current_app.extensions["charts.detail_template"] = template
+    return template
 
 
 @bp.get("/cryptos/<int:crypto_id>")
 def crypto_detail(crypto_id: int):
     session = get_session()
-    if not require_user_crypto(session, g.user.id, crypto_id):
-        abort(404)
-    crypto = session.execute(
-        select(Cryptocurrency).where(Cryptocurrency.id == crypto_id)
-    ).scalar_one_or_none()
+    crypto = fetch_user_crypto(session, g.user.id, crypto_id)
     if not crypto:
         abort(404)
-    all_cryptos = session.execute(
-        select(Cryptocurrency).order_by(Cryptocurrency.name)
-    ).scalars().all()
 
-    max_days = current_app.config["MAX_HISTORY_DAYS"]
+    chart_config = current_app.extensions["chart_config"]
+    max_days = chart_config.max_history_days
     backfill_max_days = min(365, max_days)
-    days_raw = request.args.get("days", "").strip()
-    if not days_raw:
-        days_raw = str(min(365, max_days))
-    days = clamp_days(days_raw, max_days)
+    days = _detail_days(max_days)
+    etag, latest_points = _detail_page_state(session, crypto_id, days)
+    # Pending flashes are consumed by the render, so those requests skip the
+    # conditional path.
+    if user_session.get("_flashes"):
+        etag = None
+    elif request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
 
-    start_date = date.today() - timedelta(days=days) if days > 0 else None
-    indicator_padding = 49
-    fetch_days = days
-    if days > 0:
-        fetch_days = min(days + indicator_padding, max_days)
-    rows = fetch_price_series(session, crypto_id, fetch_days)
-    series_full = compute_indicators(rows)
-    series_padding = []
-    series = series_full
-    if start_date is not None:
-        start_iso = start_date.isoformat()
-        series_padding = [row for row in series_full if row["date"] < start_iso]
-        if series_padding:
-            series_padding = [
-                {"date": row["date"], "price": row["price"]}
-                for row in series_padding[-indicator_padding:]
-            ]
-        series = [row for row in series_full if row["date"] >= start_iso]
-
-    prophet_forecast = fetch_prophet_forecast(session, crypto_id, start_date)
-    prophet_cutoff_date, _prophet_horizon_days = fetch_prophet_meta(
-        session, crypto_id
-    )
-    prophet_line_date = (
-        prophet_cutoff_date.isoformat() if prophet_cutoff_date else None
+    all_cryptos = session.execute(
+        select(Cryptocurrency).order_by(Cryptocurrency.name)
+    ).scalars().all()
+    global_runs = session.execute(
+        select(ForecastModelRun)
+        .where(ForecastModelRun.scope == "global_shared")
+        .where(ForecastModelRun.cell_type.in_(("LSTM", "GRU")))
+        .order_by(ForecastModelRun.created_at.desc())
+    ).scalars()
+    lstm_global_runs = []
+    gru_global_runs = []
+    for run in global_runs:
+        if run.cell_type == "LSTM":
+            lstm_global_runs.append(run)
+        else:
+            gru_global_runs.append(run)
+    prophet_defaults = resolve_prophet_defaults(days, max_days)
+    response = current_app.make_response(
+        render_template(
+            _detail_template(),
+            crypto=crypto,
+            latest_points=latest_points,
+            chart_data_url=f"{_detail_path(crypto_id)}/data?days={days}",
+            currency=chart_config.currency_label,
+            days=days,
+            max_days=max_days,
+            backfill_max_days=backfill_max_days,
+            prophet_defaults=prophet_defaults,
+            lstm_global_runs=lstm_global_runs,
+            gru_global_runs=gru_global_runs,
+            all_cryptos=all_cryptos,
+        )
     )
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
 
-    lstm_forecast = fetch_lstm_forecast(session, crypto_id, start_date)
-    lstm_cutoff_date, _lstm_horizon_days = fetch_lstm_meta(
-        session, crypto_id
-    )
-    lstm_line_date = (
-        lstm_cutoff_date.isoformat() if lstm_cutoff_date else None
-    )
 
-    gru_forecast = fetch_gru_forecast(session, crypto_id, start_date)
-    gru_cutoff_date, _gru_horizon_days = fetch_gru_meta(
-        session, crypto_id
-    )
-    gru_line_date = gru_cutoff_date.isoformat() if gru_cutoff_date else None
-    lstm_global_runs = (
-        session.execute(
-            select(ForecastModelRun)
-            .where(ForecastModelRun.scope == "global_shared")
-            .where(ForecastModelRun.cell_type == "LSTM")
-            .order_by(ForecastModelRun.created_at.desc())
-        )
-        .scalars()
-        .all()
-    )
-    gru_global_runs = (
-        session.execute(
-            select(ForecastModelRun)
-            .where(ForecastModelRun.scope == "global_shared")
-            .where(ForecastModelRun.cell_type == "GRU")
-            .order_by(ForecastModelRun.created_at.desc())
+@bp.get("/cryptos/<int:crypto_id>/data")
+def crypto_detail_data(crypto_id: int):
+    # Chart series and forecasts, fetched by the page script. Private to the
+    # user and revalidated on every load through the ETag.
+    session = get_session()
+    if not user_crypto_exists(session, g.user.id, crypto_id):
+        return jsonify({"error": "not found"}), 404
+    max_days = current_app.extensions["chart_config"].max_history_days
+    days = _detail_days(max_days)
+
+    state = _detail_state(session, crypto_id)
+    data = _cached_detail_data(crypto_id, days, state)
+    if data is None:
+        data = _build_detail_data(session, crypto_id, days, max_days)
+        _store_detail_data(crypto_id, days, state, data)
+
+    if request.if_none_match.contains(data["etag"]):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(
+            data["body"], mimetype="application/json"
         )
-        .scalars()
-        .all()
-    )
-    prophet_defaults = resolve_prophet_defaults(days, max_days)
-    return render_template(
-        "crypto_detail.html",
-        crypto=crypto,
-        series=series,
-        series_padding=series_padding,
-        prophet_forecast=prophet_forecast,
-        prophet_cutoff=prophet_cutoff_date.isoformat()
-        if prophet_cutoff_date
-        else None,
-        prophet_line_date=prophet_line_date,
-        lstm_forecast=lstm_forecast,
-        lstm_cutoff=lstm_cutoff_date.isoformat() if lstm_cutoff_date else None,
-        lstm_line_date=lstm_line_date,
-        gru_forecast=gru_forecast,
-        gru_cutoff=gru_cutoff_date.isoformat() if gru_cutoff_date else None,
-        gru_line_date=gru_line_date,
-        currency=current_app.config["COINGECKO_VS_CURRENCY"].upper(),
-        days=days,
-        max_days=max_days,
-        backfill_max_days=backfill_max_days,
-        prophet_defaults=prophet_defaults,
-        lstm_global_runs=lstm_global_runs,
-        gru_global_runs=gru_global_runs,
-        all_cryptos=all_cryptos,
-    )
+    response.set_etag(data["etag"])
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
 
 
 def _remove_artifact_path(path: str | None) -> None:
@@ -347,34 +545,10 @@ def _delete_global_model_files(run: ForecastModelRun) -> None:
         _remove_artifact_path(logs_dir)
 
 
-def _global_model_has_artifacts(run: ForecastModelRun) -> bool:
-    if run.artifact_path_pt and os.path.isfile(run.artifact_path_pt):
-        return os.path.isfile(f"{run.artifact_path_pt}.ckpt")
-    if not run.work_dir or not run.model_name:
-        return False
-    base_path = os.path.join(run.work_dir, run.model_name, "_model.pth.tar")
-    if not os.path.isfile(base_path):
-        return False
-    checkpoints_dirs = [
-        os.path.join(run.work_dir, run.model_name, "checkpoints"),
-        os.path.join(run.work_dir, "darts_logs", run.model_name, "checkpoints"),
-    ]
-    for checkpoints_dir in checkpoints_dirs:
-        try:
-            if any(
-                name.startswith("best-")
-                for name in os.listdir(checkpoints_dir)
-            ):
-                return True
-        except FileNotFoundError:
-            continue
-    return False
-
-
 @bp.post("/cryptos/<int:crypto_id>/global-models/delete")
 def delete_global_model_run(crypto_id: int):
     session = get_session()
-    if not require_user_crypto(session, g.user.id, crypto_id):
+    if not user_crypto_exists(session, g.user.id, crypto_id):
         abort(404)
     run_id_raw = request.form.get("model_run_id", "").strip()
     run_id = int(run_id_raw) if run_id_raw.isdigit() else None
@@ -416,33 +590,17 @@ def delete_global_model_run(crypto_id: int):
     return _redirect_with_days(crypto_id)
 
 
-@bp.post("/cryptos/<int:crypto_id>/prophet")
-def recalculate_prophet(crypto_id: int):
-    session = get_session()
-    if not require_user_crypto(session, g.user.id, crypto_id):
-        abort(404)
-    crypto = session.execute(
-        select(Cryptocurrency).where(Cryptocurrency.id == crypto_id)
-    ).scalar_one_or_none()
-    if not crypto:
-        abort(404)
-
+def _start_prophet_job(crypto_id: int, form) -> dict[str, object]:
     job_type = "prophet"
-    horizon_days = current_app.config.get("PROPHET_FUTURE_DAYS", 30)
+    chart_config = current_app.extensions["chart_config"]
+    horizon_days = chart_config.prophet_future_days
     if horizon_days <= 0:
-        job = {
-            "job_key": _job_key(job_type, crypto_id),
-            "job_type": job_type,
-            "label": JOB_LABELS[job_type],
-            "state": "error",
-            "message": "Prophet forecast disabled",
-        }
-        return _job_response(crypto_id, job)
-    max_days = current_app.config["MAX_HISTORY_DAYS"]
-    prophet_days_raw = request.form.get("prophet_days", "").strip()
+        return {"job_key": _job_key(job_type, crypto_id), **_DISABLED_JOBS[job_type]}
+    max_days = chart_config.max_history_days
+    prophet_days_raw = form.get("prophet_days", "").strip()
     prophet_days = clamp_days(prophet_days_raw, max_days)
     yearly_raw = (
-        request.form.get("prophet_yearly", PROPHET_DEFAULT_YEARLY)
+        form.get("prophet_yearly", PROPHET_DEFAULT_YEARLY)
         .strip()
         .lower()
     )
@@ -453,7 +611,7 @@ def recalculate_prophet(crypto_id: int):
     else:
         yearly_seasonality = True
     changepoint_scale = _parse_float_choice(
-        request.form.get("prophet_changepoint"),
+        form.get("prophet_changepoint"),
         {
             "0.001": 0.001,
             "0.005": 0.005,
@@ -465,7 +623,7 @@ def recalculate_prophet(crypto_id: int):
         PROPHET_DEFAULT_CHANGEPOINT,
     )
     seasonality_scale = _parse_float_choice(
-        request.form.get("prophet_seasonality"),
+        form.get("prophet_seasonality"),
         {
             "0.01": 0.01,
             "0.1": 0.1,
@@ -475,491 +633,163 @@ def recalculate_prophet(crypto_id: int):
         PROPHET_DEFAULT_SEASONALITY,
     )
     changepoint_range = _parse_float_range(
-        request.form.get("prophet_changepoint_range"),
+        form.get("prophet_changepoint_range"),
         PROPHET_DEFAULT_CHANGEPOINT_RANGE,
         0.8,
         0.95,
     )
-    job_key = _job_key(job_type, crypto_id)
-
-    def run_prophet():
-        job_session = get_session()
-        try:
-            rows = fetch_price_series(job_session, crypto_id, prophet_days)
-            if len(rows) < 2:
-                raise ValueError("Not enough price history for Prophet")
-            stored = store_prophet_forecast(
-                job_session,
-                crypto_id,
-                rows,
-                horizon_days,
-                yearly_seasonality=yearly_seasonality,
-                changepoint_prior_scale=changepoint_scale,
-                seasonality_prior_scale=seasonality_scale,
-                changepoint_range=changepoint_range,
-            )
-            if not stored:
-                raise RuntimeError("Prophet forecast not available")
-            return stored
-        finally:
-            # Avoid holding ProphetForecast objects on the session.
-            job_session.expunge_all()
-            job_session.close()
-
-    job = start_job(job_key, job_type, JOB_LABELS[job_type], run_prophet)
-    return _job_response(crypto_id, job)
+    return start_job(
+        _job_key(job_type, crypto_id),
+        job_type,
+        JOB_LABELS[job_type],
+        run_prophet_forecast,
+        {
+            "crypto_id": crypto_id,
+            "horizon_days": horizon_days,
+            "days": prophet_days,
+            "yearly_seasonality": yearly_seasonality,
+            "changepoint_prior_scale": changepoint_scale,
+            "seasonality_prior_scale": seasonality_scale,
+            "changepoint_range": changepoint_range,
+        },
+    )
 
 
-@bp.post("/cryptos/<int:crypto_id>/lstm")
-def recalculate_lstm(crypto_id: int):
+@bp.post("/cryptos/<int:crypto_id>/prophet")
+def recalculate_prophet(crypto_id: int):
     session = get_session()
-    if not require_user_crypto(session, g.user.id, crypto_id):
-        abort(404)
-    crypto = session.execute(
-        select(Cryptocurrency).where(Cryptocurrency.id == crypto_id)
-    ).scalar_one_or_none()
-    if not crypto:
+    if not user_crypto_exists(session, g.user.id, crypto_id):
         abort(404)
+    return _job_response(crypto_id, _start_prophet_job(crypto_id, request.form))
+
 
-    job_type = "lstm"
-    horizon_days = current_app.config.get("RNN_FUTURE_DAYS", 30)
+def _start_rnn_job(
+    crypto_id: int, form, job_type: str, cell_type: str
+) -> dict[str, object]:
+    # LSTM and GRU share one form layout; fields are prefixed by job type.
+    chart_config = current_app.extensions["chart_config"]
+    horizon_days = chart_config.rnn_future_days
     if horizon_days <= 0:
-        job = {
-            "job_key": _job_key(job_type, crypto_id),
-            "job_type": job_type,
-            "label": JOB_LABELS[job_type],
-            "state": "error",
-            "message": "LSTM forecast disabled",
-        }
-        return _job_response(crypto_id, job)
+        return {"job_key": _job_key(job_type, crypto_id), **_DISABLED_JOBS[job_type]}
 
-    max_days = current_app.config["MAX_HISTORY_DAYS"]
-    lstm_days_raw = request.form.get("lstm_days", "").strip()
-    lstm_days = clamp_days(lstm_days_raw, max_days)
-    lstm_model_kind = _parse_choice(
-        request.form.get("lstm_model"), {"rnn", "block"}, "rnn"
+    max_days = chart_config.max_history_days
+    days = clamp_days(form.get(f"{job_type}_days", "").strip(), max_days)
+    model_kind = _parse_choice(
+        form.get(f"{job_type}_model"), {"rnn", "block"}, "rnn"
     )
-    lstm_scope = _parse_choice(
-        request.form.get("lstm_scope"),
+    scope = _parse_choice(
+        form.get(f"{job_type}_scope"),
         {"per_crypto", "global_shared"},
         "per_crypto",
     )
-    lstm_run_id = _parse_optional_int(
-        request.form.get("lstm_global_model_run_id")
-    )
-    lstm_crypto_ids = _filter_existing_crypto_ids(
-        session, _parse_id_list(request.form.getlist("lstm_crypto_ids"))
-    )
-    lstm_retrain = request.form.get("lstm_retrain") is not None
-    lstm_input_default = 180
-    lstm_input_chunk = _parse_int_range(
-        request.form.get("lstm_input_chunk"),
-        lstm_input_default,
+    run_id = _parse_optional_int(form.get(f"{job_type}_global_model_run_id"))
+    # Unknown ids are dropped by the job itself before training.
+    crypto_ids = _parse_id_list(form.getlist(f"{job_type}_crypto_ids"))
+    retrain = form.get(f"{job_type}_retrain") is not None
+    input_chunk = _parse_int_range(
+        form.get(f"{job_type}_input_chunk"),
+        180,
         min_value=5,
         max_value=max_days,
     )
-    lstm_layers_default = 2
-    lstm_layers = _parse_int_range(
-        request.form.get("lstm_layers"),
-        lstm_layers_default,
+    layers = _parse_int_range(
+        form.get(f"{job_type}_layers"),
+        2,
         min_value=1,
         max_value=4,
     )
-    lstm_training_default = lstm_input_chunk + horizon_days
-    lstm_training_length = _parse_int_range(
-        request.form.get("lstm_training_length"),
-        lstm_training_default,
+    training_length = _parse_int_range(
+        form.get(f"{job_type}_training_length"),
+        input_chunk + horizon_days,
         min_value=10,
         max_value=max_days,
     )
-    if lstm_model_kind == "rnn" and lstm_training_length <= lstm_input_chunk:
-        lstm_training_length = min(
-            max_days, lstm_input_chunk + max(1, horizon_days)
-        )
-    lstm_output_default = 1 if lstm_model_kind == "rnn" else 30
-    lstm_output_chunk = _parse_int_range(
-        request.form.get("lstm_output_chunk"),
-        lstm_output_default,
+    if model_kind == "rnn" and training_length <= input_chunk:
+        training_length = min(max_days, input_chunk + max(1, horizon_days))
+    output_chunk = _parse_int_range(
+        form.get(f"{job_type}_output_chunk"),
+        1 if model_kind == "rnn" else 30,
         min_value=1,
         max_value=max_days,
     )
-    lstm_hidden_dim = _parse_int_range(
-        request.form.get("lstm_hidden_dim"),
+    hidden_dim = _parse_int_range(
+        form.get(f"{job_type}_hidden_dim"),
         64,
         min_value=8,
         max_value=512,
     )
-    lstm_hidden_fc_sizes = _parse_int_list(
-        request.form.get("lstm_hidden_fc_sizes"),
+    hidden_fc_sizes = _parse_int_list(
+        form.get(f"{job_type}_hidden_fc_sizes"),
         [64, 32],
     )
-    job_key = _job_key(job_type, crypto_id)
 
-    def run_lstm():
-        job_session = get_session()
-        try:
-            if lstm_scope == "global_shared":
-                selected_run = None
-                if lstm_run_id:
-                    selected_run = job_session.get(
-                        ForecastModelRun, lstm_run_id
-                    )
-                training_crypto_ids = lstm_crypto_ids or [crypto_id]
-                if selected_run is not None:
-                    stored_ids = _parse_id_list(
-                        [
-                            str(value)
-                            for value in (
-                                selected_run.training_crypto_ids or []
-                            )
-                        ]
-                    )
-                    training_crypto_ids = stored_ids or [crypto_id]
-                training_crypto_ids = _filter_existing_crypto_ids(
-                    job_session, training_crypto_ids
-                ) or [crypto_id]
-                model_family = (
-                    selected_run.model_family
-                    if selected_run is not None
-                    else (
-                        "BlockRNNModel"
-                        if lstm_model_kind == "block"
-                        else "RNNModel"
-                    )
-                )
-                hyperparams = {
-                    "input_chunk_length": lstm_input_chunk,
-                    "output_chunk_length": lstm_output_chunk,
-                    "training_length": lstm_training_length,
-                    "n_rnn_layers": lstm_layers,
-                    "hidden_dim": lstm_hidden_dim,
-                    "hidden_fc_sizes": lstm_hidden_fc_sizes,
-                    "n_epochs": 200,
-                    "batch_size": 64,
-                    "random_state": 42,
-                    "val_split": 0.2,
-                }
-                run = None
-                selected_hyperparams = (
-                    dict(selected_run.hyperparams_json or {})
-                    if selected_run is not None
-                    else None
-                )
-                if selected_run is not None and lstm_retrain:
-                    retrain_hyperparams = selected_hyperparams or hyperparams
-                    run = train_global_model(
-                        job_session,
-                        model_family=selected_run.model_family,
-                        cell_type="LSTM",
-                        hyperparams=retrain_hyperparams,
-                        crypto_ids=training_crypto_ids,
-                        training_days=lstm_days,
-                        horizon_days=horizon_days,
-                        transform=selected_run.transform,
-                        warm_start_run=selected_run,
-                        warm_start_mode="weights",
-                        update_run=selected_run,
-                    )
-                elif selected_run is not None:
-                    run = selected_run
-                if run is None:
-                    run = train_global_model(
-                        job_session,
-                        model_family=model_family,
-                        cell_type="LSTM",
-                        hyperparams=hyperparams,
-                        crypto_ids=training_crypto_ids,
-                        training_days=lstm_days,
-                        horizon_days=horizon_days,
-                        transform="log_return",
-                    )
-                if not _global_model_has_artifacts(run):
-                    current_app.logger.warning(
-                        "Global model run %s missing artifacts; retraining.",
-                        run.id if run else "unknown",
-                    )
-                    fallback_params = selected_hyperparams or hyperparams
-                    fallback_family = (
-                        selected_run.model_family
-                        if selected_run is not None
-                        else model_family
-                    )
-                    fallback_transform = (
-                        selected_run.transform
-                        if selected_run is not None
-                        else "log_return"
-                    )
-                    run = train_global_model(
-                        job_session,
-                        model_family=fallback_family,
-                        cell_type="LSTM",
-                        hyperparams=fallback_params,
-                        crypto_ids=training_crypto_ids,
-                        training_days=lstm_days,
-                        horizon_days=horizon_days,
-                        transform=fallback_transform,
-                    )
-                forecast_rows = predict_with_global_model(
-                    job_session,
-                    run.id,
-                    crypto_id,
-                    horizon_days=horizon_days,
-                    allow_unseen=True,
-                )
-                if not forecast_rows:
-                    raise RuntimeError("LSTM forecast not available")
-                return len(forecast_rows)
-
-            rows = fetch_price_series(job_session, crypto_id, lstm_days)
-            if len(rows) < 5:
-                raise ValueError("Not enough price history for LSTM")
-            stored = store_lstm_forecast(
-                job_session,
-                crypto_id,
-                rows,
-                horizon_days,
-                model_kind=lstm_model_kind,
-                input_chunk_length=lstm_input_chunk,
-                training_length=lstm_training_length,
-                n_rnn_layers=lstm_layers,
-                output_chunk_length=lstm_output_chunk,
-                hidden_dim=lstm_hidden_dim,
-                hidden_fc_sizes=lstm_hidden_fc_sizes,
-            )
-            if not stored:
-                raise RuntimeError("LSTM forecast not available")
-            return stored
-        finally:
-            job_session.close()
+    return start_job(
+        _job_key(job_type, crypto_id),
+        job_type,
+        JOB_LABELS[job_type],
+        run_rnn_forecast,
+        {
+            "cell_type": cell_type,
+            "crypto_id": crypto_id,
+            "horizon_days": horizon_days,
+            "days": days,
+            "model_kind": model_kind,
+            "scope": scope,
+            "run_id": run_id,
+            "crypto_ids": crypto_ids,
+            "retrain": retrain,
+            "input_chunk_length": input_chunk,
+            "output_chunk_length": output_chunk,
+            "training_length": training_length,
+            "n_rnn_layers": layers,
+            "hidden_dim": hidden_dim,
+            "hidden_fc_sizes": hidden_fc_sizes,
+        },
+    )
+
 
-    job = start_job(job_key, job_type, JOB_LABELS[job_type], run_lstm)
+def _recalculate_rnn(crypto_id: int, job_type: str, cell_type: str):
+    session = get_session()
+    if not user_crypto_exists(session, g.user.id, crypto_id):
+        abort(404)
+    job = _start_rnn_job(crypto_id, request.form, job_type, cell_type)
     return _job_response(crypto_id, job)
 
 
+@bp.post("/cryptos/<int:crypto_id>/lstm")
+def recalculate_lstm(crypto_id: int):
+    return _recalculate_rnn(crypto_id, "lstm", "LSTM")
+
+
 @bp.post("/cryptos/<int:crypto_id>/gru")
 def recalculate_gru(crypto_id: int):
-    session = get_session()
-    if not require_user_crypto(session, g.user.id, crypto_id):
-        abort(404)
-    crypto = session.execute(
-        select(Cryptocurrency).where(Cryptocurrency.id == crypto_id)
-    ).scalar_one_or_none()
-    if not crypto:
-        abort(404)
+    return _recalculate_rnn(crypto_id, "gru", "GRU")
 
-    job_type = "gru"
-    horizon_days = current_app.config.get("RNN_FUTURE_DAYS", 30)
-    if horizon_days <= 0:
-        job = {
-            "job_key": _job_key(job_type, crypto_id),
-            "job_type": job_type,
-            "label": JOB_LABELS[job_type],
-            "state": "error",
-            "message": "GRU forecast disabled",
-        }
-        return _job_response(crypto_id, job)
 
-    max_days = current_app.config["MAX_HISTORY_DAYS"]
-    gru_days_raw = request.form.get("gru_days", "").strip()
-    gru_days = clamp_days(gru_days_raw, max_days)
-    gru_model_kind = _parse_choice(
-        request.form.get("gru_model"), {"rnn", "block"}, "rnn"
-    )
-    gru_scope = _parse_choice(
-        request.form.get("gru_scope"),
-        {"per_crypto", "global_shared"},
-        "per_crypto",
-    )
-    gru_run_id = _parse_optional_int(
-        request.form.get("gru_global_model_run_id")
-    )
-    gru_crypto_ids = _filter_existing_crypto_ids(
-        session, _parse_id_list(request.form.getlist("gru_crypto_ids"))
-    )
-    gru_retrain = request.form.get("gru_retrain") is not None
-    gru_input_default = 180
-    gru_input_chunk = _parse_int_range(
-        request.form.get("gru_input_chunk"),
-        gru_input_default,
-        min_value=5,
-        max_value=max_days,
-    )
-    gru_layers_default = 2
-    gru_layers = _parse_int_range(
-        request.form.get("gru_layers"),
-        gru_layers_default,
-        min_value=1,
-        max_value=4,
-    )
-    gru_training_default = gru_input_chunk + horizon_days
-    gru_training_length = _parse_int_range(
-        request.form.get("gru_training_length"),
-        gru_training_default,
-        min_value=10,
-        max_value=max_days,
-    )
-    if gru_model_kind == "rnn" and gru_training_length <= gru_input_chunk:
-        gru_training_length = min(
-            max_days, gru_input_chunk + max(1, horizon_days)
+@bp.post("/cryptos/<int:crypto_id>/forecast/all")
+def recalculate_all(crypto_id: int):
+    # One request and one ownership check queue the three models; each still
+    # runs as its own job so the per-model status endpoints keep working.
+    session = get_session()
+    if not user_crypto_exists(session, g.user.id, crypto_id):
+        abort(404)
+    form = request.form
+    jobs = {
+        "prophet": _start_prophet_job(crypto_id, form),
+        "lstm": _start_rnn_job(crypto_id, form, "lstm", "LSTM"),
+        "gru": _start_rnn_job(crypto_id, form, "gru", "GRU"),
+    }
+    if "application/json" in request.headers.get("Accept", ""):
+        running = any(job.get("state") == "running" for job in jobs.values())
+        return jsonify(jobs), JOB_STATUS_CODES["running"] if running else 200
+
+    for job in jobs.values():
+        state = job.get("state")
+        flash(
+            job.get("message") or "Update queued.",
+            JOB_FLASH_CATEGORIES.get(state, "info"),
         )
-    gru_output_default = 1 if gru_model_kind == "rnn" else 30
-    gru_output_chunk = _parse_int_range(
-        request.form.get("gru_output_chunk"),
-        gru_output_default,
-        min_value=1,
-        max_value=max_days,
-    )
-    gru_hidden_dim = _parse_int_range(
-        request.form.get("gru_hidden_dim"),
-        64,
-        min_value=8,
-        max_value=512,
-    )
-    gru_hidden_fc_sizes = _parse_int_list(
-        request.form.get("gru_hidden_fc_sizes"),
-        [64, 32],
-    )
-    job_key = _job_key(job_type, crypto_id)
-
-    def run_gru():
-        job_session = get_session()
-        try:
-            if gru_scope == "global_shared":
-                selected_run = None
-                if gru_run_id:
-                    selected_run = job_session.get(
-                        ForecastModelRun, gru_run_id
-                    )
-                training_crypto_ids = gru_crypto_ids or [crypto_id]
-                if selected_run is not None:
-                    stored_ids = _parse_id_list(
-                        [
-                            str(value)
-                            for value in (
-                                selected_run.training_crypto_ids or []
-                            )
-                        ]
-                    )
-                    training_crypto_ids = stored_ids or [crypto_id]
-                training_crypto_ids = _filter_existing_crypto_ids(
-                    job_session, training_crypto_ids
-                ) or [crypto_id]
-                model_family = (
-                    selected_run.model_family
-                    if selected_run is not None
-                    else (
-                        "BlockRNNModel"
-                        if gru_model_kind == "block"
-                        else "RNNModel"
-                    )
-                )
-                hyperparams = {
-                    "input_chunk_length": gru_input_chunk,
-                    "output_chunk_length": gru_output_chunk,
-                    "training_length": gru_training_length,
-                    "n_rnn_layers": gru_layers,
-                    "hidden_dim": gru_hidden_dim,
-                    "hidden_fc_sizes": gru_hidden_fc_sizes,
-                    "n_epochs": 200,
-                    "batch_size": 64,
-                    "random_state": 42,
-                    "val_split": 0.2,
-                }
-                run = None
-                selected_hyperparams = (
-                    dict(selected_run.hyperparams_json or {})
-                    if selected_run is not None
-                    else None
-                )
-                if selected_run is not None and gru_retrain:
-                    retrain_hyperparams = selected_hyperparams or hyperparams
-                    run = train_global_model(
-                        job_session,
-                        model_family=selected_run.model_family,
-                        cell_type="GRU",
-                        hyperparams=retrain_hyperparams,
-                        crypto_ids=training_crypto_ids,
-                        training_days=gru_days,
-                        horizon_days=horizon_days,
-                        transform=selected_run.transform,
-                        warm_start_run=selected_run,
-                        warm_start_mode="weights",
-                        update_run=selected_run,
-                    )
-                elif selected_run is not None:
-                    run = selected_run
-                if run is None:
-                    run = train_global_model(
-                        job_session,
-                        model_family=model_family,
-                        cell_type="GRU",
-                        hyperparams=hyperparams,
-                        crypto_ids=training_crypto_ids,
-                        training_days=gru_days,
-                        horizon_days=horizon_days,
-                        transform="log_return",
-                    )
-                if not _global_model_has_artifacts(run):
-                    current_app.logger.warning(
-                        "Global model run %s missing artifacts; retraining.",
-                        run.id if run else "unknown",
-                    )
-                    fallback_params = selected_hyperparams or hyperparams
-                    fallback_family = (
-                        selected_run.model_family
-                        if selected_run is not None
-                        else model_family
-                    )
-                    fallback_transform = (
-                        selected_run.transform
-                        if selected_run is not None
-                        else "log_return"
-                    )
-                    run = train_global_model(
-                        job_session,
-                        model_family=fallback_family,
-                        cell_type="GRU",
-                        hyperparams=fallback_params,
-                        crypto_ids=training_crypto_ids,
-                        training_days=gru_days,
-                        horizon_days=horizon_days,
-                        transform=fallback_transform,
-                    )
-                forecast_rows = predict_with_global_model(
-                    job_session,
-                    run.id,
-                    crypto_id,
-                    horizon_days=horizon_days,
-                    allow_unseen=True,
-                )
-                if not forecast_rows:
-                    raise RuntimeError("GRU forecast not available")
-                return len(forecast_rows)
-
-            rows = fetch_price_series(job_session, crypto_id, gru_days)
-            if len(rows) < 5:
-                raise ValueError("Not enough price history for GRU")
-            stored = store_gru_forecast(
-                job_session,
-                crypto_id,
-                rows,
-                horizon_days,
-                model_kind=gru_model_kind,
-                input_chunk_length=gru_input_chunk,
-                training_length=gru_training_length,
-                n_rnn_layers=gru_layers,
-                output_chunk_length=gru_output_chunk,
-                hidden_dim=gru_hidden_dim,
-                hidden_fc_sizes=gru_hidden_fc_sizes,
-            )
-            if not stored:
-                raise RuntimeError("GRU forecast not available")
-            return stored
-        finally:
-            job_session.close()
-
-    job = start_job(job_key, job_type, JOB_LABELS[job_type], run_gru)
-    return _job_response(crypto_id, job)
+    return _redirect_with_days(crypto_id)
 
 
 @bp.get("/cryptos/<int:crypto_id>/jobs/<string:job_type>")
@@ -967,8 +797,16 @@ def job_status(crypto_id: int, job_type: str):
     if job_type not in JOB_LABELS:
         abort(404)
     session = get_session()
-    if not require_user_crypto(session, g.user.id, crypto_id):
+    if not user_crypto_exists(session, g.user.id, crypto_id):
         abort(404)
+    wait = _parse_int_range(
+        request.args.get("wait"), 0, 0, JOB_WAIT_MAX_SECONDS
+    )
     job_key = _job_key(job_type, crypto_id)
-    job = get_job_status(job_key, job_type, JOB_LABELS[job_type])
+    if wait:
+        # Give the pooled connection back before blocking.
+        session.close()
+        job = wait_for_job(job_key, job_type, JOB_LABELS[job_type], wait)
+    else:
+        job = get_job_status(job_key, job_type, JOB_LABELS[job_type])
     return jsonify(job)
@@ -12,7 +12,7 @@ from flask import (
 )
 from sqlalchemy import select
 
-from ..auth_utils import user_crypto_exists
+from ..auth_utils import invalidate_user_cryptos, user_crypto_exists
 from ..db import get_session
 from ..models import Cryptocurrency, UserCrypto
 from ..services.coingecko import CoinGeckoClient, CoinGeckoError
@@ -60,6 +60,7 @@ def create_crypto():
             session.rollback()
             flash("Failed to add crypto to dashboard", "error")
             return redirect(url_for("cryptos.new_crypto"))
+        invalidate_user_cryptos(g.user.id)
         flash("Crypto added to dashboard", "success")
         return redirect(url_for("dashboard.index"))
 
@@ -94,6 +95,7 @@ def create_crypto():
         session.rollback()
         flash("Failed to save crypto", "error")
         return redirect(url_for("cryptos.new_crypto"))
+    invalidate_user_cryptos(g.user.id)
 
     max_days = current_app.config["MAX_HISTORY_DAYS"]
     backfill_max_days = min(365, max_days)
@@ -143,5 +145,6 @@ def remove_crypto(crypto_id: int):
         return redirect(url_for("dashboard.index"))
     session.delete(association)
     session.commit()
+    invalidate_user_cryptos(g.user.id)
     flash("Crypto removed from dashboard", "success")
     return redirect(url_for("dashboard.index"))
@@ -1,5 +1,9 @@
+from collections import OrderedDict
 import math
+import threading
+import time
 
+import numpy as np
 from flask import (
     Blueprint,
     current_app,
@@ -11,15 +15,22 @@ from flask import (
     request,
     url_for,
 )
-from sqlalchemy import select
+from sqlalchemy import func, select
 
+from ..auth_utils import CryptoSummary
 from ..db import get_session
 from ..models import Cryptocurrency, Price, ProphetForecast, UserCrypto
-from ..services.analytics import compute_ema_series, compute_indicators
-from ..services.jobs import get_job_status, start_job
-from ..services.prophet import store_prophet_forecast
+from ..services.analytics import compute_ema_series, compute_price_indicators
+from ..services.forecast_jobs import run_prophet_bulk
+from ..services.jobs import (
+    JOB_FLASH_CATEGORIES,
+    JOB_STATUS_CODES,
+    JOB_WAIT_MAX_SECONDS,
+    get_job_status,
+    start_job,
+    wait_for_job,
+)
 from ..services.prophet_defaults import resolve_prophet_defaults
-from ..services.series import fetch_price_series
 
 bp = Blueprint("dashboard", __name__)
 
@@ -28,6 +39,14 @@ PROPHET_BULK_LABEL = "Prophet (all)"
 EMA_LOOKBACK = 120
 EMA_PERIOD = 50
 EMA_SLOPE_LAG = 20
+DASHBOARD_CACHE_TTL = 60.0
+DASHBOARD_CACHE_MAX_ENTRIES = 256
+
+_DASHBOARD_LOCK = threading.Lock()
+# Least recently used first; rows hold CryptoSummary values, never ORM objects.
+_DASHBOARD_ROWS: OrderedDict[
+    int, tuple[float, tuple, list[dict[str, object]]]
+] = OrderedDict()
 
 
 def _prophet_bulk_job_key(user_id: int) -> str:
@@ -35,63 +54,45 @@ def _prophet_bulk_job_key(user_id: int) -> str:
 
 
 def _dashboard_job_response(job: dict[str, object]):
-    accept_header = request.headers.get("Accept", "")
-    if "application/json" in accept_header:
-        status_code = 202 if job.get("state") == "running" else 200
-        return jsonify(job), status_code
-
     state = job.get("state")
-    message = job.get("message") or "Update queued."
-    if state == "done":
-        flash(message, "success")
-    elif state in {"error"}:
-        flash(message, "error")
-    elif state == "busy":
-        flash(message, "warning")
-    else:
-        flash(message, "info")
+    if "application/json" in request.headers.get("Accept", ""):
+        return jsonify(job), JOB_STATUS_CODES.get(state, 200)
+
+    flash(
+        job.get("message") or "Update queued.",
+        JOB_FLASH_CATEGORIES.get(state, "info"),
+    )
     return redirect(url_for("dashboard.index"))
 
 
-def _latest_bollinger_indicators(
-    recent_prices: list[Price], latest_price: Price | None
-):
+def _latest_bollinger_indicators(prices: np.ndarray, latest_price):
+    # prices is oldest-first; only the last value of each column is read.
     result = {"percent": None, "bandwidth": None, "sma_spread": None}
     if latest_price is None:
         return result
-    if len(recent_prices) < 20:
-        return result
-    rows = [
-        {"date": price.date, "price": float(price.price)}
-        for price in reversed(recent_prices)
-    ]
-    indicators = compute_indicators(rows)
-    if not indicators:
+    if prices.shape[0] < 20:
         return result
-    latest = indicators[-1]
-    bb_upper = latest.get("bb_upper")
-    bb_lower = latest.get("bb_lower")
-    if bb_upper is None or bb_lower is None:
+    columns = compute_price_indicators(prices)
+    bb_upper = float(columns["bb_upper"][-1])
+    bb_lower = float(columns["bb_lower"][-1])
+    if math.isnan(bb_upper) or math.isnan(bb_lower):
         return result
     band = bb_upper - bb_lower
     if not band:
         return result
-    sma_20 = latest.get("sma_20")
-    if sma_20 is None or not sma_20:
-        bandwidth = None
-    else:
-        bandwidth = band / sma_20
+    sma_20 = float(columns["sma_20"][-1])
+    bandwidth = band / sma_20 if sma_20 else None
     result["percent"] = (float(latest_price.price) - bb_lower) / band
     result["bandwidth"] = bandwidth
-    if len(recent_prices) >= 50:
-        sma_50 = latest.get("sma_50")
-        if sma_20 is not None and sma_50 is not None and sma_50:
+    if prices.shape[0] >= 50:
+        sma_50 = float(columns["sma_50"][-1])
+        if sma_50:
             result["sma_spread"] = (sma_20 - sma_50) / sma_50
     return result
 
 
 def _latest_prophet_percent(
-    session, crypto_id: int, latest_price: Price | None
+    session, crypto_id: int, latest_price
 ):
     if latest_price is None:
         return None
@@ -124,13 +125,10 @@ def _trend_class(value: float | None, positive: float, negative: float) -> str:
 
 
 def _latest_ema50_indicators(
-    recent_prices: list[Price], latest_price: Price | None
+    prices: np.ndarray, latest_price
 ) -> dict[str, float | None]:
     result = {"ema_50": None, "trend_50": None, "slope_50": None}
-    if latest_price is None or not recent_prices:
-        return result
-    prices = [float(price.price) for price in reversed(recent_prices)]
-    if not prices:
+    if latest_price is None or not prices.shape[0]:
         return result
     if len(prices) > EMA_LOOKBACK:
         prices = prices[-EMA_LOOKBACK:]
@@ -157,34 +155,103 @@ def _latest_ema50_indicators(
     return result
 
 
-@bp.get("/")
-def index():
-    session = get_session()
-    cryptos = (
+def _dashboard_state(session, user_id: int) -> tuple:
+    # Same markers as the detail view: each crypto's prices version, the
+    # latest stored date and the newest Prophet run, all index probes.
+    versions = tuple(
         session.execute(
-            select(Cryptocurrency)
+            select(Cryptocurrency.id, Cryptocurrency.prices_version)
             .join(UserCrypto, UserCrypto.crypto_id == Cryptocurrency.id)
-            .where(UserCrypto.user_id == g.user.id)
+            .where(UserCrypto.user_id == user_id)
+            .order_by(Cryptocurrency.id)
+        ).tuples()
+    )
+    if not versions:
+        return versions
+    crypto_ids = [crypto_id for crypto_id, _version in versions]
+    stats = session.execute(
+        select(
+            select(func.max(Price.date))
+            .where(Price.crypto_id.in_(crypto_ids))
+            .scalar_subquery(),
+            select(func.max(ProphetForecast.created_at))
+            .where(ProphetForecast.crypto_id.in_(crypto_ids))
+            .scalar_subquery(),
+        )
+    ).one()
+    return (versions, *stats)
+
+
+def invalidate_dashboard_rows(user_id: int | None = None) -> None:
+    with _DASHBOARD_LOCK:
+        if user_id is None:
+            _DASHBOARD_ROWS.clear()
+        else:
+            _DASHBOARD_ROWS.pop(user_id, None)
+
+
+def _cached_dashboard_rows(user_id: int, state: tuple):
+    now = time.monotonic()
+    with _DASHBOARD_LOCK:
+        cached = _DASHBOARD_ROWS.get(user_id)
+        if cached is None:
+            return None
+        stored_at, cached_state, rows = cached
+        if cached_state != state or now - stored_at > DASHBOARD_CACHE_TTL:
+            del _DASHBOARD_ROWS[user_id]
+            return None
+        _DASHBOARD_ROWS.move_to_end(user_id)
+        return rows
+
+
+def _store_dashboard_rows(user_id: int, state: tuple, rows) -> None:
+    now = time.monotonic()
+    with _DASHBOARD_LOCK:
+        expired = [
+            key
+            for key, (stored_at, _state, _rows) in _DASHBOARD_ROWS.items()
+            if now - stored_at > DASHBOARD_CACHE_TTL
+        ]
+        for key in expired:
+            del _DASHBOARD_ROWS[key]
+        _DASHBOARD_ROWS[user_id] = (now, state, rows)
+        _DASHBOARD_ROWS.move_to_end(user_id)
+        while len(_DASHBOARD_ROWS) > DASHBOARD_CACHE_MAX_ENTRIES:
+            _DASHBOARD_ROWS.popitem(last=False)
+
+
+def _build_dashboard_rows(session, user_id: int) -> list[dict[str, object]]:
+    cryptos = [
+        CryptoSummary(*row)
+        for row in session.execute(
+            select(
+                Cryptocurrency.id,
+                Cryptocurrency.coingecko_id,
+                Cryptocurrency.name,
+                Cryptocurrency.symbol,
+            )
+            .join(UserCrypto, UserCrypto.crypto_id == Cryptocurrency.id)
+            .where(UserCrypto.user_id == user_id)
             .order_by(Cryptocurrency.name)
         )
-        .scalars()
-        .all()
-    )
+    ]
     rows = []
     for crypto in cryptos:
-        recent_prices = (
-            session.execute(
-                select(Price)
-                .where(Price.crypto_id == crypto.id)
-                .order_by(Price.date.desc())
-                .limit(EMA_LOOKBACK)
-            )
-            .scalars()
-            .all()
-        )
+        # (date, price) rows, newest first; the template reads .date/.price.
+        recent_prices = session.execute(
+            select(Price.date, Price.price)
+            .where(Price.crypto_id == crypto.id)
+            .order_by(Price.date.desc())
+            .limit(EMA_LOOKBACK)
+        ).all()
         latest_price = recent_prices[0] if recent_prices else None
-        bollinger = _latest_bollinger_indicators(recent_prices, latest_price)
-        ema_indicators = _latest_ema50_indicators(recent_prices, latest_price)
+        prices = np.fromiter(
+            (row.price for row in reversed(recent_prices)),
+            dtype=np.float64,
+            count=len(recent_prices),
+        )
+        bollinger = _latest_bollinger_indicators(prices, latest_price)
+        ema_indicators = _latest_ema50_indicators(prices, latest_price)
         rows.append(
             {
                 "crypto": crypto,
@@ -206,15 +273,28 @@ def index():
                 ),
             }
         )
+    return rows
+
+
+@bp.get("/")
+def index():
+    session = get_session()
+    user_id = g.user.id
+    state = _dashboard_state(session, user_id)
+    rows = _cached_dashboard_rows(user_id, state)
+    if rows is None:
+        rows = _build_dashboard_rows(session, user_id)
+        _store_dashboard_rows(user_id, state, rows)
 
-    currency = current_app.config["COINGECKO_VS_CURRENCY"].upper()
+    currency = current_app.extensions["chart_config"].currency_label
     return render_template("dashboard.html", rows=rows, currency=currency)
 
 
 @bp.post("/prophet/bulk")
 def recalculate_prophet_bulk():
     job_type = PROPHET_BULK_JOB_TYPE
-    horizon_days = current_app.config.get("PROPHET_FUTURE_DAYS", 30)
+    chart_config = current_app.extensions["chart_config"]
+    horizon_days = chart_config.prophet_future_days
     if horizon_days <= 0:
         job = {
             "job_key": _prophet_bulk_job_key(g.user.id),
@@ -245,7 +325,7 @@ def recalculate_prophet_bulk():
         }
         return _dashboard_job_response(job)
 
-    max_days = current_app.config["MAX_HISTORY_DAYS"]
+    max_days = chart_config.max_history_days
     defaults = resolve_prophet_defaults(None, max_days)
     prophet_days = int(defaults["days"])
     yearly_raw = str(defaults["yearly"])
@@ -260,40 +340,35 @@ def recalculate_prophet_bulk():
     changepoint_range = float(defaults["changepoint_range"])
     job_key = _prophet_bulk_job_key(g.user.id)
 
-    def run_prophet_bulk():
-        job_session = get_session()
-        total_points = 0
-        try:
-            for crypto_id in crypto_ids:
-                rows = fetch_price_series(job_session, crypto_id, prophet_days)
-                if len(rows) < 2:
-                    # Drop ORM state between cryptos to keep memory flat in bulk runs.
-                    job_session.expunge_all()
-                    continue
-                stored = store_prophet_forecast(
-                    job_session,
-                    crypto_id,
-                    rows,
-                    horizon_days,
-                    yearly_seasonality=yearly_seasonality,
-                    changepoint_prior_scale=changepoint_scale,
-                    seasonality_prior_scale=seasonality_scale,
-                    changepoint_range=changepoint_range,
-                )
-                total_points += stored
-                job_session.expunge_all()
-            if total_points <= 0:
-                raise RuntimeError("Prophet forecast not available")
-            return total_points
-        finally:
-            job_session.close()
-
-    job = start_job(job_key, job_type, PROPHET_BULK_LABEL, run_prophet_bulk)
+    job = start_job(
+        job_key,
+        job_type,
+        PROPHET_BULK_LABEL,
+        run_prophet_bulk,
+        {
+            "crypto_ids": list(crypto_ids),
+            "horizon_days": horizon_days,
+            "days": prophet_days,
+            "yearly_seasonality": yearly_seasonality,
+            "changepoint_prior_scale": changepoint_scale,
+            "seasonality_prior_scale": seasonality_scale,
+            "changepoint_range": changepoint_range,
+        },
+    )
     return _dashboard_job_response(job)
 
 
 @bp.get("/jobs/prophet-bulk")
 def prophet_bulk_status():
     job_key = _prophet_bulk_job_key(g.user.id)
-    job = get_job_status(job_key, PROPHET_BULK_JOB_TYPE, PROPHET_BULK_LABEL)
+    wait_raw = request.args.get("wait", "")
+    wait = min(int(wait_raw), JOB_WAIT_MAX_SECONDS) if wait_raw.isdecimal() else 0
+    if wait:
+        # Give the pooled connection back before blocking.
+        get_session().close()
+        job = wait_for_job(
+            job_key, PROPHET_BULK_JOB_TYPE, PROPHET_BULK_LABEL, wait
+        )
+    else:
+        job = get_job_status(job_key, PROPHET_BULK_JOB_TYPE, PROPHET_BULK_LABEL)
     return jsonify(job)
@@ -3,7 +3,7 @@ from datetime import date, timedelta
 from flask import Blueprint, current_app, flash, g, redirect, request, url_for
 from sqlalchemy import select
 
-from ..auth_utils import require_user_crypto
+from ..auth_utils import user_crypto_exists
 from ..services.coingecko import CoinGeckoClient
 from ..services.coincap import CoincapClient
 from ..services.price_updater import (
@@ -15,10 +15,20 @@ from ..services.price_updater import (
 )
 from ..db import get_session
 from ..models import UserCrypto
+from .charts import invalidate_detail_data
+from .dashboard import invalidate_dashboard_rows
 
 bp = Blueprint("prices", __name__, url_prefix="/prices")
 
 
+def _invalidate_price_views(crypto_ids) -> None:
+    # Called only once a write landed. Other users' dashboards holding these
+    # cryptos notice through the bumped prices version.
+    for crypto_id in crypto_ids:
+        invalidate_detail_data(crypto_id)
+    invalidate_dashboard_rows(g.user.id)
+
+
 def _redirect_with_days(crypto_id: int):
     days_raw = request.form.get("range_days", "").strip()
     if days_raw.isdigit():
@@ -68,6 +78,8 @@ def update_prices():
         request_delay=request_delay,
         crypto_ids=crypto_ids,
     )
+    if result["inserted"]:
+        _invalidate_price_views(crypto_ids)
     if result["updated"]:
         flash(
             (
@@ -86,7 +98,7 @@ def update_prices():
 @bp.post("/update/<int:crypto_id>")
 def update_price(crypto_id: int):
     session = get_session()
-    if not require_user_crypto(session, g.user.id, crypto_id):
+    if not user_crypto_exists(session, g.user.id, crypto_id):
         flash("Crypto not in your dashboard", "error")
         return redirect(url_for("dashboard.index"))
     client = CoinGeckoClient(
@@ -103,6 +115,7 @@ def update_price(crypto_id: int):
             crypto_id, client, vs_currency=vs_currency, as_of=as_of
         )
         if updated:
+            _invalidate_price_views([crypto_id])
             flash(f"Price updated for {as_of}", "success")
         else:
             flash(f"Price already stored for {as_of}", "info")
@@ -114,7 +127,7 @@ def update_price(crypto_id: int):
 @bp.post("/backfill/<int:crypto_id>")
 def backfill_prices(crypto_id: int):
     session = get_session()
-    if not require_user_crypto(session, g.user.id, crypto_id):
+    if not user_crypto_exists(session, g.user.id, crypto_id):
         flash("Crypto not in your dashboard", "error")
         return redirect(url_for("dashboard.index"))
     days_raw = request.form.get("history_days", "").strip()
@@ -146,6 +159,7 @@ def backfill_prices(crypto_id: int):
     request_delay = current_app.config["COINGECKO_REQUEST_DELAY"]
     coincap_request_delay = current_app.config["COINCAP_REQUEST_DELAY"]
 
+    inserted = 0
     try:
         if days == 0:
             inspect_result = inspect_missing_prices(crypto_id)
@@ -178,6 +192,7 @@ def backfill_prices(crypto_id: int):
                 coincap_client=coincap_client,
                 coincap_request_delay=coincap_request_delay,
             )
+            inserted = result["inserted"]
             flash(
                 (
                     "History verified: "
@@ -200,6 +215,7 @@ def backfill_prices(crypto_id: int):
                 coincap_client=coincap_client,
                 coincap_request_delay=coincap_request_delay,
             )
+            inserted = result["inserted"]
             if result["requested"] == 0:
                 flash("History already complete for this range", "success")
             else:
@@ -209,5 +225,7 @@ def backfill_prices(crypto_id: int):
                 )
     except Exception as exc:
         flash(f"Failed to backfill history: {exc}", "error")
+    if inserted:
+        _invalidate_price_views([crypto_id])
 
     return _redirect_with_days(crypto_id)
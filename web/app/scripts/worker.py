@@ -0,0 +1,8 @@
+from app import create_app
+from app.services.jobs import make_celery
+
+# Run with: celery -A app.scripts.worker worker --concurrency=1
+app = create_app()
+celery = make_celery(app)
+if celery is None:
+    raise RuntimeError("CELERY_BROKER_URL is not set or celery is not installed")
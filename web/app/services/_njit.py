@@ -0,0 +1,13 @@
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency fallback
+
+    def njit(*args, **kwargs):
+        # Plain Python/NumPy execution when numba is not installed.
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
@@ -3,116 +3,201 @@ import math
 import logging
 import os
 from functools import lru_cache
+from operator import itemgetter
 from typing import Any
 
-import duckdb
+import numpy as np
 import pandas as pd
 
-try:
-    from prophet import Prophet
-except ImportError:  # pragma: no cover - optional dependency fallback
-    Prophet = None
+from ._njit import njit
 
-try:
-    from cmdstanpy import cmdstan_path
-except ImportError:  # pragma: no cover - optional dependency fallback
-    cmdstan_path = None
+# Prophet drags in cmdstanpy and its plotting stack; it is imported on the
+# first forecast (see _prophet_ready) so app start-up does not pay for it.
+Prophet = None
 
 logger = logging.getLogger(__name__)
 
+_EMPTY_ROW: dict[str, Any] = {
+    "price": None,
+    "sma_7": None,
+    "sma_50": None,
+    "sma_20": None,
+    "std_20": None,
+    "bb_upper": None,
+    "bb_lower": None,
+}
+
+
+# Explicit argument types make numba compile (or load from its cache) when the
+# decorator runs, instead of on the first request that reaches a kernel.
+_PRICES_SIGNATURE = "(float64[:],)"
+_WINDOW_SIGNATURE = "(float64[:], int64)"
+
+
+@lru_cache(maxsize=16)
+def _ema_kernel(period: int):
+    # One compiled kernel per period: period and alpha are frozen as
+    # compile-time constants instead of being passed on every call.
+    alpha = 2 / (period + 1)
+    decay = 1 - alpha
+
+    @njit(_PRICES_SIGNATURE)
+    def kernel(values: np.ndarray) -> np.ndarray:
+        result = np.full(values.shape[0], np.nan)
+        ema = np.nan
+        finite_run = 0
+        for index in range(values.shape[0]):
+            value = values[index]
+            if not np.isfinite(value):
+                ema = np.nan
+                finite_run = 0
+                continue
+            finite_run += 1
+            if np.isnan(ema):
+                # Seed with the SMA of the first fully finite window.
+                if finite_run < period:
+                    continue
+                total = 0.0
+                for offset in range(index - period + 1, index + 1):
+                    total += values[offset]
+                ema = total / period
+            else:
+                ema = (alpha * value) + (decay * ema)
+            result[index] = ema
+        return result
+
+    return kernel
+
 
 def compute_ema_series(
-    values: list[float], period: int
+    values: list[float] | np.ndarray, period: int
 ) -> list[float | None]:
     if period <= 0:
         raise ValueError(f"period must be positive, got {period}")
-    if not values:
+    if len(values) == 0:
         return []
 
-    result: list[float | None] = [None] * len(values)
-    alpha = 2 / (period + 1)
-    ema: float | None = None
-    for index, value in enumerate(values):
-        if not math.isfinite(value):
-            ema = None
-            result[index] = None
-            continue
-        if ema is None:
-            window_start = index - (period - 1)
-            if window_start < 0:
-                result[index] = None
-                continue
-            window = values[window_start : index + 1]
-            if not all(math.isfinite(item) for item in window):
-                result[index] = None
-                continue
-            ema = sum(window) / period
-            result[index] = ema
-            continue
-        ema = (alpha * value) + ((1 - alpha) * ema)
-        result[index] = ema
-    return result
+    result = _ema_kernel(period)(np.asarray(values, dtype=np.float64))
+    return [None if math.isnan(value) else value for value in result.tolist()]
+
+
+@njit(_WINDOW_SIGNATURE, cache=True)
+def _window_sums(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    # Leading rows use the partial window available so far.
+    sums = np.zeros(values.shape[0] + 1)
+    sums[1:] = np.cumsum(values)
+    upper = np.arange(1, values.shape[0] + 1)
+    lower = np.maximum(upper - window, 0)
+    return sums[upper] - sums[lower], upper - lower
+
+
+@njit(_WINDOW_SIGNATURE, cache=True)
+def _rolling_mean(prices: np.ndarray, window: int) -> np.ndarray:
+    sums, counts = _window_sums(prices, window)
+    return sums / counts
+
+
+@njit(_WINDOW_SIGNATURE, cache=True)
+def _rolling_mean_std(
+    prices: np.ndarray, window: int
+) -> tuple[np.ndarray, np.ndarray]:
+    if prices.shape[0] == 0:
+        return np.zeros(0), np.zeros(0)
+    # Sums are taken around the first price to limit cancellation in E[x^2] - E[x]^2.
+    shifted = prices - prices[0]
+    sums, counts = _window_sums(shifted, window)
+    sums_sq, _ = _window_sums(shifted * shifted, window)
+    mean = sums / counts
+    variance = (sums_sq / counts) - (mean * mean)
+    return mean + prices[0], np.sqrt(np.maximum(variance, 0.0))
+
+
+def compute_price_indicators(prices: np.ndarray) -> dict[str, np.ndarray]:
+    # Expects prices already ordered by date; the kernels only take float64.
+    prices = np.asarray(prices, dtype=np.float64)
+    sma_20, std_20 = _rolling_mean_std(prices, 20)
+    # Bands only once the 20-day window is full; NaN marks the warm-up rows.
+    full_window = np.arange(prices.shape[0]) >= 19
+    band = std_20 * 2
+    return {
+        "price": prices,
+        "sma_7": _rolling_mean(prices, 7),
+        "sma_50": _rolling_mean(prices, 50),
+        "sma_20": sma_20,
+        "std_20": std_20,
+        "bb_upper": np.where(full_window, sma_20 + band, np.nan),
+        "bb_lower": np.where(full_window, sma_20 - band, np.nan),
+    }
+
+
+def warm_indicator_kernels(ema_periods: tuple[int, ...] = ()) -> None:
+    # The module kernels compile at import; this builds the per-period EMA
+    # kernels and runs each path once so the first chart request is warm.
+    sample = np.linspace(1.0, 2.0, 64)
+    compute_price_indicators(sample)
+    for period in ema_periods:
+        compute_ema_series(sample, period)
+
+
+def compute_indicator_columns(
+    dates: np.ndarray, prices: np.ndarray
+) -> dict[str, np.ndarray]:
+    return {"date": dates, **compute_price_indicators(prices)}
+
+
+_INDICATOR_KEYS = (
+    "date",
+    "price",
+    "sma_7",
+    "sma_50",
+    "sma_20",
+    "std_20",
+    "bb_upper",
+    "bb_lower",
+)
+
+
+def _nullable_list(values: np.ndarray) -> list[float | None]:
+    result = values.astype(object)
+    result[np.isnan(values)] = None
+    return result.tolist()
+
+
+def indicator_rows(
+    columns: dict[str, np.ndarray], start: int = 0
+) -> list[dict[str, Any]]:
+    # Plain dicts: they go straight to the JSON encoder. Each column is
+    # converted with one C-level tolist()/astype instead of per-row work.
+    dates = np.asarray(columns["date"][start:], dtype="datetime64[D]")
+    values = (
+        dates.astype("U10").tolist(),
+        columns["price"][start:].tolist(),
+        columns["sma_7"][start:].tolist(),
+        columns["sma_50"][start:].tolist(),
+        columns["sma_20"][start:].tolist(),
+        columns["std_20"][start:].tolist(),
+        _nullable_list(columns["bb_upper"][start:]),
+        _nullable_list(columns["bb_lower"][start:]),
+    )
+    return [dict(zip(_INDICATOR_KEYS, row)) for row in zip(*values)]
 
 
 def compute_indicators(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
     if not rows:
         return []
 
-    df = pd.DataFrame(rows)
-    df["date"] = pd.to_datetime(df["date"])
-
-    con = duckdb.connect()
-    con.register("prices", df)
-    result = con.execute(
-        """
-        select
-            date,
-            price,
-            sma_7,
-            sma_50,
-            sma_20,
-            std_20,
-            case
-                when cnt_20 = 20 then sma_20 + (std_20 * 2)
-                else null
-            end as bb_upper,
-            case
-                when cnt_20 = 20 then sma_20 - (std_20 * 2)
-                else null
-            end as bb_lower
-        from (
-            select
-                date,
-                price,
-                avg(price) over (
-                    order by date rows between 6 preceding and current row
-                ) as sma_7,
-                avg(price) over (
-                    order by date rows between 49 preceding and current row
-                ) as sma_50,
-                avg(price) over (
-                    order by date rows between 19 preceding and current row
-                ) as sma_20,
-                stddev_pop(price) over (
-                    order by date rows between 19 preceding and current row
-                ) as std_20,
-                count(*) over (
-                    order by date rows between 19 preceding and current row
-                ) as cnt_20
-            from prices
-        )
-        order by date
-        """
-    ).df()
-    con.close()
-
-    result["date"] = result["date"].dt.strftime("%Y-%m-%d")
-    result = result.astype(object).where(pd.notnull(result), None)
-    return result.to_dict(orient="records")
+    ordered = sorted(rows, key=lambda row: row["date"])
+    dates = np.array([row["date"] for row in ordered], dtype="datetime64[D]")
+    prices = np.fromiter(
+        (row["price"] for row in ordered), dtype=np.float64, count=len(ordered)
+    )
+    return indicator_rows(compute_indicator_columns(dates, prices))
 
 
 def _configure_cmdstan() -> bool:
-    if cmdstan_path is None:
+    try:
+        from cmdstanpy import cmdstan_path
+    except ImportError:
         logger.warning("CmdStanPy no esta disponible; omitiendo pronostico.")
         return False
 
@@ -160,7 +245,10 @@ def _configure_cmdstan() -> bool:
 
 @lru_cache(maxsize=1)
 def _prophet_ready() -> bool:
-    if Prophet is None:
+    global Prophet
+    try:
+        from prophet import Prophet
+    except ImportError:
         logger.warning("Prophet no esta disponible; omitiendo pronostico.")
         return False
     return _configure_cmdstan()
@@ -220,19 +308,24 @@ def merge_prophet_forecast(
     if not forecast:
         return series
 
-    base_row = {}
+    template = _EMPTY_ROW
     if series:
-        base_row = {key: None for key in series[0].keys() if key != "date"}
+        template = {key: None for key in series[0] if key != "date"}
 
-    series_map = {row["date"]: row for row in series}
+    merged = list(series)
+    positions = {row["date"]: index for index, row in enumerate(merged)}
     for row in forecast:
         date_key = row["date"]
-        existing = series_map.get(date_key)
-        if existing is not None:
-            existing.update(row)
-        else:
-            merged = {"date": date_key, **base_row}
-            merged.update(row)
-            series_map[date_key] = merged
-
-    return [series_map[date_key] for date_key in sorted(series_map)]
+        position = positions.get(date_key)
+        if position is not None:
+            merged[position].update(row)
+            continue
+        new_row = {"date": date_key}
+        new_row.update(template)
+        new_row.update(row)
+        positions[date_key] = len(merged)
+        merged.append(new_row)
+
+    # Timsort is linear when the forecast only extends an ordered series.
+    merged.sort(key=itemgetter("date"))
+    return merged
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import logging
+import os
+
+from sqlalchemy import select
+
+from ..db import session_scope
+from ..models import Cryptocurrency, ForecastModelRun
+from .global_inference import predict_with_global_model
+from .global_training import train_global_model
+from .prophet import store_prophet_forecast
+from .rnn import store_gru_forecast, store_lstm_forecast
+from .series import crypto_ids_with_min_prices, fetch_price_series
+
+logger = logging.getLogger(__name__)
+
+# Job entry points take JSON-friendly primitives only, so the same call runs on
+# a local worker thread or is shipped as-is to a Celery worker.
+
+RNN_STORE_FUNCTIONS = {
+    "LSTM": store_lstm_forecast,
+    "GRU": store_gru_forecast,
+}
+
+
+def filter_existing_crypto_ids(session, crypto_ids: list[int]) -> list[int]:
+    if not crypto_ids:
+        return []
+    existing_ids = set(
+        session.execute(
+            select(Cryptocurrency.id).where(Cryptocurrency.id.in_(crypto_ids))
+        ).scalars()
+    )
+    return [cid for cid in crypto_ids if cid in existing_ids]
+
+
+def _stored_crypto_ids(run: ForecastModelRun) -> list[int]:
+    ids: list[int] = []
+    for value in run.training_crypto_ids or []:
+        token = str(value).strip()
+        if not token.isdigit():
+            continue
+        crypto_id = int(token)
+        if crypto_id > 0 and crypto_id not in ids:
+            ids.append(crypto_id)
+    return ids
+
+
+def _global_model_has_artifacts(run: ForecastModelRun) -> bool:
+    if run.artifact_path_pt and os.path.isfile(run.artifact_path_pt):
+        return os.path.isfile(f"{run.artifact_path_pt}.ckpt")
+    if not run.work_dir or not run.model_name:
+        return False
+    base_path = os.path.join(run.work_dir, run.model_name, "_model.pth.tar")
+    if not os.path.isfile(base_path):
+        return False
+    checkpoints_dirs = [
+        os.path.join(run.work_dir, run.model_name, "checkpoints"),
+        os.path.join(run.work_dir, "darts_logs", run.model_name, "checkpoints"),
+    ]
+    for checkpoints_dir in checkpoints_dirs:
+        try:
+            if any(
+                name.startswith("best-")
+                for name in os.listdir(checkpoints_dir)
+            ):
+                return True
+        except FileNotFoundError:
+            continue
+    return False
+
+
+def run_prophet_forecast(
+    crypto_id: int,
+    horizon_days: int,
+    days: int,
+    yearly_seasonality: bool | str,
+    changepoint_prior_scale: float,
+    seasonality_prior_scale: float,
+    changepoint_range: float,
+) -> int:
+    # Closing the session also expunges the ProphetForecast objects.
+    with session_scope() as job_session:
+        rows = fetch_price_series(job_session, crypto_id, days)
+        if len(rows) < 2:
+            raise ValueError("Not enough price history for Prophet")
+        stored = store_prophet_forecast(
+            job_session,
+            crypto_id,
+            rows,
+            horizon_days,
+            yearly_seasonality=yearly_seasonality,
+            changepoint_prior_scale=changepoint_prior_scale,
+            seasonality_prior_scale=seasonality_prior_scale,
+            changepoint_range=changepoint_range,
+        )
+        if not stored:
+            raise RuntimeError("Prophet forecast not available")
+        return stored
+
+
+def run_prophet_bulk(
+    crypto_ids: list[int],
+    horizon_days: int,
+    days: int,
+    yearly_seasonality: bool | str,
+    changepoint_prior_scale: float,
+    seasonality_prior_scale: float,
+    changepoint_range: float,
+) -> int:
+    total_points = 0
+    with session_scope() as job_session:
+        # Cryptos without enough history are dropped up front instead of
+        # loading each series only to discard it.
+        for crypto_id in crypto_ids_with_min_prices(
+            job_session, crypto_ids, days, 2
+        ):
+            rows = fetch_price_series(job_session, crypto_id, days)
+            stored = store_prophet_forecast(
+                job_session,
+                crypto_id,
+                rows,
+                horizon_days,
+                yearly_seasonality=yearly_seasonality,
+                changepoint_prior_scale=changepoint_prior_scale,
+                seasonality_prior_scale=seasonality_prior_scale,
+                changepoint_range=changepoint_range,
+            )
+            total_points += stored
+            job_session.expunge_all()
+        if total_points <= 0:
+            raise RuntimeError("Prophet forecast not available")
+        return total_points
+
+
+def _run_global_rnn(
+    job_session,
+    cell_type: str,
+    crypto_id: int,
+    horizon_days: int,
+    days: int,
+    model_kind: str,
+    run_id: int | None,
+    crypto_ids: list[int],
+    retrain: bool,
+    hyperparams: dict,
+) -> int:
+    selected_run = None
+    if run_id:
+        selected_run = job_session.get(ForecastModelRun, run_id)
+    training_crypto_ids = crypto_ids or [crypto_id]
+    if selected_run is not None:
+        training_crypto_ids = _stored_crypto_ids(selected_run) or [crypto_id]
+    training_crypto_ids = filter_existing_crypto_ids(
+        job_session, training_crypto_ids
+    ) or [crypto_id]
+    model_family = (
+        selected_run.model_family
+        if selected_run is not None
+        else ("BlockRNNModel" if model_kind == "block" else "RNNModel")
+    )
+    run = None
+    selected_hyperparams = (
+        dict(selected_run.hyperparams_json or {})
+        if selected_run is not None
+        else None
+    )
+    if selected_run is not None and retrain:
+        retrain_hyperparams = selected_hyperparams or hyperparams
+        run = train_global_model(
+            job_session,
+            model_family=selected_run.model_family,
+            cell_type=cell_type,
+            hyperparams=retrain_hyperparams,
+            crypto_ids=training_crypto_ids,
+            training_days=days,
+            horizon_days=horizon_days,
+            transform=selected_run.transform,
+            warm_start_run=selected_run,
+            warm_start_mode="weights",
+            update_run=selected_run,
+        )
+    elif selected_run is not None:
+        run = selected_run
+    if run is None:
+        run = train_global_model(
+            job_session,
+            model_family=model_family,
+            cell_type=cell_type,
+            hyperparams=hyperparams,
+            crypto_ids=training_crypto_ids,
+            training_days=days,
+            horizon_days=horizon_days,
+            transform="log_return",
+        )
+    if not _global_model_has_artifacts(run):
+        logger.warning(
+            "Global model run %s missing artifacts; retraining.",
+            run.id if run else "unknown",
+        )
+        fallback_params = selected_hyperparams or hyperparams
+        fallback_family = (
+            selected_run.model_family if selected_run is not None else model_family
+        )
+        fallback_transform = (
+            selected_run.transform if selected_run is not None else "log_return"
+        )
+        run = train_global_model(
+            job_session,
+            model_family=fallback_family,
+            cell_type=cell_type,
+            hyperparams=fallback_params,
+            crypto_ids=training_crypto_ids,
+            training_days=days,
+            horizon_days=horizon_days,
+            transform=fallback_transform,
+        )
+    forecast_rows = predict_with_global_model(
+        job_session,
+        run.id,
+        crypto_id,
+        horizon_days=horizon_days,
+        allow_unseen=True,
+    )
+    if not forecast_rows:
+        raise RuntimeError(f"{cell_type} forecast not available")
+    return len(forecast_rows)
+
+
+def run_rnn_forecast(
+    cell_type: str,
+    crypto_id: int,
+    horizon_days: int,
+    days: int,
+    model_kind: str,
+    scope: str,
+    run_id: int | None,
+    crypto_ids: list[int],
+    retrain: bool,
+    input_chunk_length: int,
+    output_chunk_length: int,
+    training_length: int,
+    n_rnn_layers: int,
+    hidden_dim: int,
+    hidden_fc_sizes: list[int],
+) -> int:
+    with session_scope() as job_session:
+        if scope == "global_shared":
+            hyperparams = {
+                "input_chunk_length": input_chunk_length,
+                "output_chunk_length": output_chunk_length,
+                "training_length": training_length,
+                "n_rnn_layers": n_rnn_layers,
+                "hidden_dim": hidden_dim,
+                "hidden_fc_sizes": hidden_fc_sizes,
+                "n_epochs": 200,
+                "batch_size": 64,
+                "random_state": 42,
+                "val_split": 0.2,
+            }
+            return _run_global_rnn(
+                job_session,
+                cell_type,
+                crypto_id,
+                horizon_days,
+                days,
+                model_kind,
+                run_id,
+                crypto_ids,
+                retrain,
+                hyperparams,
+            )
+
+        rows = fetch_price_series(job_session, crypto_id, days)
+        if len(rows) < 5:
+            raise ValueError(f"Not enough price history for {cell_type}")
+        stored = RNN_STORE_FUNCTIONS[cell_type](
+            job_session,
+            crypto_id,
+            rows,
+            horizon_days,
+            model_kind=model_kind,
+            input_chunk_length=input_chunk_length,
+            training_length=training_length,
+            n_rnn_layers=n_rnn_layers,
+            output_chunk_length=output_chunk_length,
+            hidden_dim=hidden_dim,
+            hidden_fc_sizes=hidden_fc_sizes,
+        )
+        if not stored:
+            raise RuntimeError(f"{cell_type} forecast not available")
+        return stored
+
+
+JOB_TARGETS = (run_prophet_forecast, run_prophet_bulk, run_rnn_forecast)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    Numeric,
+    cast,
+    literal,
+    null,
+    select,
+    union_all,
+)
+
+from ..models import GruForecast, LstmForecast, ProphetForecast
+
+FORECAST_TABLES = (
+    ("prophet", ProphetForecast),
+    ("lstm", LstmForecast),
+    ("gru", GruForecast),
+)
+_FORECAST_VALUE = Numeric(18, 8, asdecimal=False)
+
+
+def fetch_forecast_bundles(
+    session, crypto_id: int, start_date: date | None
+) -> dict[str, dict[str, Any]]:
+    # One UNION ALL round-trip for every model: forecast points carry a date,
+    # while the latest cutoff/horizon comes back as one extra dateless row.
+    bundles: dict[str, dict[str, Any]] = {
+        name: {"forecast": [], "cutoff_date": None, "horizon_days": None}
+        for name, _table in FORECAST_TABLES
+    }
+
+    branches = []
+    for name, table in FORECAST_TABLES:
+        points = select(
+            literal(name).label("model"),
+            table.date,
+            table.yhat,
+            table.yhat_lower,
+            table.yhat_upper,
+            cast(null(), Date).label("cutoff_date"),
+            cast(null(), Integer).label("horizon_days"),
+        ).where(table.crypto_id == crypto_id)
+        if start_date is not None:
+            points = points.where(table.date >= start_date)
+        branches.append(points)
+
+        latest = (
+            select(table.cutoff_date, table.horizon_days)
+            .where(table.crypto_id == crypto_id)
+            .order_by(table.created_at.desc())
+            .limit(1)
+            .subquery()
+        )
+        branches.append(
+            select(
+                literal(name).label("model"),
+                cast(null(), Date).label("date"),
+                cast(null(), _FORECAST_VALUE).label("yhat"),
+                cast(null(), _FORECAST_VALUE).label("yhat_lower"),
+                cast(null(), _FORECAST_VALUE).label("yhat_upper"),
+                latest.c.cutoff_date,
+                latest.c.horizon_days,
+            )
+        )
+
+    rows = union_all(*branches).subquery()
+    result = session.execute(select(rows).order_by(rows.c.model, rows.c.date))
+    for name, day, yhat, yhat_lower, yhat_upper, cutoff_date, horizon_days in result:
+        bundle = bundles[name]
+        if day is None:
+            bundle["cutoff_date"] = cutoff_date
+            bundle["horizon_days"] = horizon_days
+            continue
+        bundle["forecast"].append(
+            {
+                "date": day.isoformat(),
+                "yhat": float(yhat) if yhat is not None else None,
+                "yhat_lower": float(yhat_lower) if yhat_lower is not None else None,
+                "yhat_upper": float(yhat_upper) if yhat_upper is not None else None,
+            }
+        )
+    return bundles
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
 from datetime import date, timedelta
 from decimal import Decimal
 import logging
 import math
+import os
+import threading
 from typing import Any, Type
 
 import numpy as np
@@ -11,7 +14,7 @@ import pandas as pd
 from sqlalchemy import delete
 
 from ..models import ForecastModelRun, GruForecast, LstmForecast
-from ..services.series import fetch_price_series
+from ..services.series import fetch_price_series_many
 from .model_registry import load_global_model
 
 try:
@@ -19,8 +22,17 @@ try:
 except ImportError:  # pragma: no cover - optional dependency fallback
     TimeSeries = None
 
+try:
+    import torch
+except ImportError:  # pragma: no cover - optional dependency fallback
+    torch = None
+
 logger = logging.getLogger(__name__)
 
+_MODEL_CACHE_SIZE = 4
+_MODEL_LOCK = threading.Lock()
+_MODELS: dict[tuple[Any, ...], Any] = {}
+
 
 def _to_decimal(value: float | None) -> Decimal | None:
     if value is None:
@@ -139,38 +151,21 @@ def _store_forecast_rows(
     return len(records)
 
 
-def _compute_forecast(
-    model,
-    run: ForecastModelRun,
-    rows: list[dict[str, Any]],
-    horizon_days: int,
-) -> list[dict[str, Any]]:
+def _prepare_inputs(rows: list[dict[str, Any]], horizon_days: int):
     price_df = _build_price_frame(rows)
     if price_df is None or len(price_df) < 6:
-        return []
+        return None
     series = _build_return_series(price_df)
     if series is None or len(series) < 5:
-        return []
-
-    covariates = _build_covariates(rows, horizon_days)
-    covariate_payload = _covariate_kwargs(model, covariates)
-
-    input_chunk = int(getattr(model, "input_chunk_length", 1))
-    output_chunk = int(getattr(model, "output_chunk_length", 1))
-    forecast_horizon = 1 if run.model_family == "RNNModel" else max(1, output_chunk)
+        return None
+    return price_df, series, _build_covariates(rows, horizon_days)
 
-    historical = model.historical_forecasts(
-        series=series,
-        **covariate_payload,
-        start=input_chunk,
-        forecast_horizon=forecast_horizon,
-        stride=1,
-        retrain=False,
-    )
-    historical_points: list[tuple[date, float]] = []
-    for forecast in historical:
-        historical_points.extend(_extract_points(forecast))
 
+def _forecast_rows(
+    price_df: pd.DataFrame,
+    historical_points: list[tuple[date, float]],
+    future_points: list[tuple[date, float]],
+) -> list[dict[str, Any]]:
     actual_returns = {
         row["date"].date(): float(row["log_return"])
         for _, row in price_df.dropna(subset=["log_return"]).iterrows()
@@ -183,13 +178,6 @@ def _compute_forecast(
     sigma = float(np.std(residuals)) if residuals else 0.0
     ci_width = 1.96 * sigma
 
-    future = model.predict(
-        horizon_days,
-        **covariate_payload,
-        series=series,
-    )
-    future_points = _extract_points(future)
-
     price_by_date = {
         row["date"].date(): float(row["price"])
         for _, row in price_df.iterrows()
@@ -240,46 +228,185 @@ def _compute_forecast(
     return forecast_rows
 
 
-def predict_with_global_model(
+def _compute_forecasts(
+    model,
+    run: ForecastModelRun,
+    inputs: dict[int, tuple[Any, Any, Any]],
+    horizon_days: int,
+) -> dict[int, list[dict[str, Any]]]:
+    input_chunk = int(getattr(model, "input_chunk_length", 1))
+    output_chunk = int(getattr(model, "output_chunk_length", 1))
+    forecast_horizon = 1 if run.model_family == "RNNModel" else max(1, output_chunk)
+
+    crypto_ids = list(inputs)
+    historical_points: dict[int, list[tuple[date, float]]] = {}
+    for crypto_id in crypto_ids:
+        _price_df, series, covariates = inputs[crypto_id]
+        historical = model.historical_forecasts(
+            series=series,
+            **_covariate_kwargs(model, covariates),
+            start=input_chunk,
+            forecast_horizon=forecast_horizon,
+            stride=1,
+            retrain=False,
+        )
+        points: list[tuple[date, float]] = []
+        for forecast in historical:
+            points.extend(_extract_points(forecast))
+        historical_points[crypto_id] = points
+
+    # A single predict over every series lets darts batch them through the
+    # network together instead of one forward pass per crypto.
+    series_list = [inputs[crypto_id][1] for crypto_id in crypto_ids]
+    covariates_list = [inputs[crypto_id][2] for crypto_id in crypto_ids]
+    futures = model.predict(
+        horizon_days,
+        **_covariate_kwargs(
+            model, covariates_list if all(covariates_list) else None
+        ),
+        series=series_list,
+    )
+    return {
+        crypto_id: _forecast_rows(
+            inputs[crypto_id][0],
+            historical_points[crypto_id],
+            _extract_points(future),
+        )
+        for crypto_id, future in zip(crypto_ids, futures)
+    }
+
+
+def _resolve_inference_dtype(inference_dtype: str | None) -> str:
+    if inference_dtype is None:
+        inference_dtype = os.environ.get("GLOBAL_INFERENCE_DTYPE", "fp32")
+    return inference_dtype.strip().lower()
+
+
+def _inference_autocast(inference_dtype: str):
+    # Weights stay FP32 on disk and in the cache; only the forward pass runs in
+    # BF16, so the output layer and the forecast rows keep FP32 precision.
+    if inference_dtype != "bf16" or torch is None:
+        return nullcontext()
+    if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+        return torch.autocast(device_type="cuda", dtype=torch.bfloat16)
+    return torch.autocast(device_type="cpu", dtype=torch.bfloat16)
+
+
+def _file_mtime(path: str | None) -> float | None:
+    if not path:
+        return None
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _model_cache_key(run: ForecastModelRun) -> tuple[Any, ...]:
+    # Retraining in place rewrites the artifacts, which changes their mtime.
+    base_path = None
+    if run.work_dir and run.model_name:
+        base_path = os.path.join(run.work_dir, run.model_name, "_model.pth.tar")
+    return (
+        run.id,
+        run.model_name,
+        run.work_dir,
+        run.artifact_path_pt,
+        _file_mtime(run.artifact_path_pt),
+        _file_mtime(base_path),
+    )
+
+
+def _load_cached_model(run: ForecastModelRun):
+    key = _model_cache_key(run)
+    model = _MODELS.pop(key, None)
+    if model is None:
+        model = load_global_model(run, prefer="best_checkpoint", map_location="cpu")
+    _MODELS[key] = model
+    while len(_MODELS) > _MODEL_CACHE_SIZE:
+        _MODELS.pop(next(iter(_MODELS)))
+    return model
+
+
+def predict_with_global_model_batch(
     session,
     model_run_id: int,
-    crypto_id: int,
+    crypto_ids: list[int],
     horizon_days: int | None = None,
     allow_unseen: bool = True,
-) -> list[dict[str, Any]]:
+    inference_dtype: str | None = None,
+) -> dict[int, list[dict[str, Any]]]:
     run = session.get(ForecastModelRun, model_run_id)
     if run is None:
         raise ValueError("Model run not found.")
     if horizon_days is None:
         horizon_days = run.horizon_days
-    if not allow_unseen and crypto_id not in (run.training_crypto_ids or []):
-        raise ValueError("Crypto not part of the training set.")
+    if not allow_unseen:
+        trained_ids = set(run.training_crypto_ids or [])
+        if any(crypto_id not in trained_ids for crypto_id in crypto_ids):
+            raise ValueError("Crypto not part of the training set.")
 
     if TimeSeries is None:
         logger.warning("Darts no esta disponible; omitiendo forecast global.")
-        return []
+        return {}
 
-    rows = fetch_price_series(session, crypto_id, 0)
-    if len(rows) < 5:
-        return []
+    rows_by_crypto = fetch_price_series_many(session, crypto_ids, 0)
+    inputs: dict[int, tuple[Any, Any, Any]] = {}
+    cutoff_dates: dict[int, date] = {}
+    for crypto_id in crypto_ids:
+        rows = rows_by_crypto.get(crypto_id, [])
+        if len(rows) < 5:
+            continue
+        prepared = _prepare_inputs(rows, horizon_days)
+        if prepared is None:
+            continue
+        inputs[crypto_id] = prepared
+        cutoff_dates[crypto_id] = rows[-1]["date"]
+    if not inputs:
+        return {}
 
-    model = load_global_model(run, prefer="best_checkpoint", map_location="cpu")
-    forecast_rows = _compute_forecast(model, run, rows, horizon_days)
-    if not forecast_rows:
-        return []
+    # Loaded models are reused across forecasts; darts keeps per-call trainer
+    # state on the model, so predictions on a shared instance are serialized.
+    autocast = _inference_autocast(_resolve_inference_dtype(inference_dtype))
+    with _MODEL_LOCK:
+        model = _load_cached_model(run)
+        with autocast:
+            forecasts = _compute_forecasts(model, run, inputs, horizon_days)
 
-    cutoff_date = rows[-1]["date"]
     if run.cell_type == "GRU":
         table = GruForecast
     else:
         table = LstmForecast
-    _store_forecast_rows(
+    results: dict[int, list[dict[str, Any]]] = {}
+    for crypto_id, forecast_rows in forecasts.items():
+        if not forecast_rows:
+            continue
+        _store_forecast_rows(
+            session,
+            table,
+            crypto_id,
+            forecast_rows,
+            horizon_days,
+            cutoff_dates[crypto_id],
+            run.id,
+        )
+        results[crypto_id] = forecast_rows
+    return results
+
+
+def predict_with_global_model(
+    session,
+    model_run_id: int,
+    crypto_id: int,
+    horizon_days: int | None = None,
+    allow_unseen: bool = True,
+    inference_dtype: str | None = None,
+) -> list[dict[str, Any]]:
+    results = predict_with_global_model_batch(
         session,
-        table,
-        crypto_id,
-        forecast_rows,
-        horizon_days,
-        cutoff_date,
-        run.id,
+        model_run_id,
+        [crypto_id],
+        horizon_days=horizon_days,
+        allow_unseen=allow_unseen,
+        inference_dtype=inference_dtype,
     )
-    return forecast_rows
+    return results.get(crypto_id, [])
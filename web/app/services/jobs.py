@@ -1,20 +1,51 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 import logging
 import threading
+import time
 from typing import Any, Callable
+import uuid
+
+from sqlalchemy import select
+
+try:
+    from celery import Celery
+except ImportError:  # pragma: no cover - optional dependency fallback
+    Celery = None
+
+from ..db import get_session
+from ..models import JobRun
 
 logger = logging.getLogger(__name__)
 
 _JOB_LOCK = threading.Lock()
+_JOB_FINISHED = threading.Condition(_JOB_LOCK)
 _JOBS: dict[str, dict[str, Any]] = {}
+_CELERY = None
+
+_CELERY_RUNNING_STATES = {"PENDING", "RECEIVED", "STARTED", "RETRY"}
+
+JOB_WAIT_MAX_SECONDS = 25
+CELERY_WAIT_INTERVAL = 1.0
+# A task still PENDING this long after it was queued was lost by the broker or
+# its result expired; the run is closed so it can be started again.
+CELERY_PENDING_TIMEOUT = 600.0
+
+# Response mapping shared by the routes that start and poll jobs.
+JOB_STATUS_CODES = {"running": 202}
+JOB_FLASH_CATEGORIES = {"done": "success", "error": "error", "busy": "warning"}
 
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 def _find_running_job() -> dict[str, Any] | None:
     for job in _JOBS.values():
         if job.get("state") == "running":
@@ -22,56 +53,264 @@ def _find_running_job() -> dict[str, Any] | None:
     return None
 
 
+def _busy_job(
+    job_key: str, job_type: str, label: str, running_job: dict[str, Any]
+) -> dict[str, Any]:
+    active_label = running_job.get("label", "Another")
+    return {
+        "job_key": job_key,
+        "job_type": job_type,
+        "label": label,
+        "state": "busy",
+        "message": (
+            "Update not started because "
+            f"{active_label} update is already running."
+        ),
+        "active_job_key": running_job.get("job_key"),
+        "active_job_type": running_job.get("job_type"),
+        "active_label": active_label,
+    }
+
+
+def _idle_job(job_key: str, job_type: str, label: str) -> dict[str, Any]:
+    return {
+        "job_key": job_key,
+        "job_type": job_type,
+        "label": label,
+        "state": "idle",
+        "message": "",
+    }
+
+
+def _task_name(target: Callable[..., Any]) -> str:
+    return f"{target.__module__}.{target.__qualname__}"
+
+
+def make_celery(app):
+    # Forecast fits are CPU-bound; with a broker configured they run in
+    # separate worker processes instead of threads inside the web server.
+    global _CELERY
+    broker_url = app.config.get("CELERY_BROKER_URL")
+    if Celery is None or not broker_url:
+        _CELERY = None
+        return None
+    backend_url = app.config.get("CELERY_RESULT_BACKEND") or broker_url
+    if backend_url.startswith("rpc"):
+        # rpc:// results are only visible to the process that sent the task;
+        # every web process polls task states.
+        raise RuntimeError(
+            "CELERY_RESULT_BACKEND must be a shared store such as redis://"
+        )
+    celery = Celery(app.import_name, broker=broker_url, backend=backend_url)
+    celery.conf.update(
+        task_track_started=True,
+        task_acks_late=True,
+        worker_prefetch_multiplier=1,
+    )
+
+    class AppContextTask(celery.Task):
+        def __call__(self, *args, **kwargs):
+            with app.app_context():
+                return self.run(*args, **kwargs)
+
+    celery.Task = AppContextTask
+    from .forecast_jobs import JOB_TARGETS
+
+    for target in JOB_TARGETS:
+        celery.task(name=_task_name(target))(target)
+    _CELERY = celery
+    return celery
+
+
+def _finish_job(job: dict[str, Any], result: Any, error_message: str | None) -> None:
+    job["finished_at"] = _now_iso()
+    if error_message:
+        job["state"] = "error"
+        job["message"] = error_message
+        job["error"] = error_message
+        return
+
+    job["state"] = "done"
+    job["result"] = result
+    if result:
+        job["message"] = f"{job.get('label', 'Forecast')} updated: {result} points."
+    else:
+        job["message"] = f"{job.get('label', 'Forecast')} completed."
+
+
+def _new_job(job_key: str, job_type: str, label: str) -> dict[str, Any]:
+    return {
+        "job_key": job_key,
+        "job_type": job_type,
+        "label": label,
+        "state": "running",
+        "message": f"{label} update running.",
+        "result": None,
+        "error": None,
+        "started_at": _now_iso(),
+        "finished_at": None,
+    }
+
+
+@contextmanager
+def _job_runs():
+    # Commits right away: the connection goes back to the pool between polls
+    # and other web processes see the run as soon as it is queued.
+    session = get_session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
+def _run_snapshot(run: JobRun) -> dict[str, Any]:
+    return {
+        "job_key": run.job_key,
+        "job_type": run.job_type,
+        "label": run.label,
+        "state": run.state,
+        "message": run.message,
+        "result": run.result,
+        "error": run.error,
+        "started_at": run.started_at.replace(tzinfo=timezone.utc).isoformat(),
+        "finished_at": (
+            run.finished_at.replace(tzinfo=timezone.utc).isoformat()
+            if run.finished_at
+            else None
+        ),
+        "task_id": run.task_id,
+    }
+
+
+def _finish_run(run: JobRun, result: Any, error_message: str | None) -> None:
+    job = _run_snapshot(run)
+    _finish_job(job, result, error_message)
+    run.state = job["state"]
+    run.message = job["message"]
+    run.result = job["result"]
+    run.error = job["error"]
+    run.finished_at = _utcnow()
+
+
+def _refresh_run(run: JobRun) -> None:
+    # Only running rows ask the result backend; finished ones keep the state
+    # stored when the task was first seen done.
+    result = _CELERY.AsyncResult(run.task_id)
+    state = result.state
+    if state == "PENDING":
+        age = _utcnow() - run.started_at
+        if age > timedelta(seconds=CELERY_PENDING_TIMEOUT):
+            _finish_run(
+                run, None, "No worker picked up the update; start it again."
+            )
+        return
+    if state in _CELERY_RUNNING_STATES:
+        return
+    if state == "SUCCESS":
+        _finish_run(run, result.result, None)
+    else:
+        _finish_run(run, None, str(result.result).strip() or "Update failed.")
+
+
+def _start_celery_job(
+    job_key: str,
+    job_type: str,
+    label: str,
+    target: Callable[..., Any],
+    kwargs: dict[str, Any],
+) -> dict[str, Any]:
+    with _job_runs() as session:
+        running = session.execute(
+            select(JobRun).where(JobRun.state == "running")
+        ).scalars().all()
+        for run in running:
+            _refresh_run(run)
+        running = [run for run in running if run.state == "running"]
+        for run in running:
+            if run.job_key == job_key:
+                return _run_snapshot(run)
+        if running:
+            return _busy_job(job_key, job_type, label, _run_snapshot(running[0]))
+        run = session.get(JobRun, job_key)
+        if run is None:
+            run = JobRun(job_key=job_key)
+            session.add(run)
+        job = _new_job(job_key, job_type, label)
+        run.job_type = job_type
+        run.label = label
+        # Each run gets its own task id so a re-queue never reads the previous
+        # run's stored result.
+        run.task_id = str(uuid.uuid4())
+        run.state = job["state"]
+        run.message = job["message"]
+        run.result = None
+        run.error = None
+        run.started_at = _utcnow()
+        run.finished_at = None
+        snapshot = _run_snapshot(run)
+    try:
+        _CELERY.send_task(
+            _task_name(target), kwargs=kwargs, task_id=snapshot["task_id"]
+        )
+    except Exception as exc:
+        logger.exception("Job not queued: %s", job_key)
+        with _job_runs() as session:
+            run = session.get(JobRun, job_key)
+            _finish_run(run, None, str(exc).strip() or "Update not queued.")
+            return _run_snapshot(run)
+    return snapshot
+
+
+def _celery_job_status(job_key: str, job_type: str, label: str) -> dict[str, Any]:
+    with _job_runs() as session:
+        run = session.get(JobRun, job_key)
+        if run is None:
+            return _idle_job(job_key, job_type, label)
+        if run.state == "running":
+            _refresh_run(run)
+        return _run_snapshot(run)
+
+
 def start_job(
-    job_key: str, job_type: str, label: str, target: Callable[[], Any]
+    job_key: str,
+    job_type: str,
+    label: str,
+    target: Callable[..., Any],
+    kwargs: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
+    kwargs = kwargs or {}
+    if _CELERY is not None:
+        return _start_celery_job(job_key, job_type, label, target, kwargs)
     with _JOB_LOCK:
         running_job = _find_running_job()
         if running_job and running_job.get("job_key") != job_key:
-            active_label = running_job.get("label", "Another")
-            return {
-                "job_key": job_key,
-                "job_type": job_type,
-                "label": label,
-                "state": "busy",
-                "message": (
-                    "Update not started because "
-                    f"{active_label} update is already running."
-                ),
-                "active_job_key": running_job.get("job_key"),
-                "active_job_type": running_job.get("job_type"),
-                "active_label": active_label,
-            }
+            return _busy_job(job_key, job_type, label, running_job)
 
         existing = _JOBS.get(job_key)
         if existing and existing.get("state") == "running":
-            return existing
-
-        job = {
-            "job_key": job_key,
-            "job_type": job_type,
-            "label": label,
-            "state": "running",
-            "message": f"{label} update running.",
-            "result": None,
-            "error": None,
-            "started_at": _now_iso(),
-            "finished_at": None,
-        }
+            return dict(existing)
+
+        job = _new_job(job_key, job_type, label)
         _JOBS[job_key] = job
+        # The worker thread finishes the stored job; callers get a snapshot.
+        snapshot = dict(job)
 
     thread = threading.Thread(
-        target=_run_job, args=(job_key, target), daemon=True
+        target=_run_job, args=(job_key, target, kwargs), daemon=True
     )
     thread.start()
-    return job
+    return snapshot
 
 
-def _run_job(job_key: str, target: Callable[[], Any]) -> None:
+def _run_job(
+    job_key: str, target: Callable[..., Any], kwargs: dict[str, Any]
+) -> None:
     result = None
     error_message = None
     try:
-        result = target()
+        result = target(**kwargs)
     except Exception as exc:
         error_message = str(exc).strip() or "Update failed."
         logger.exception("Job failed: %s", job_key)
@@ -80,32 +319,36 @@ def _run_job(job_key: str, target: Callable[[], Any]) -> None:
         job = _JOBS.get(job_key)
         if not job:
             return
-        job["finished_at"] = _now_iso()
-        if error_message:
-            job["state"] = "error"
-            job["message"] = error_message
-            job["error"] = error_message
-            return
-
-        job["state"] = "done"
-        job["result"] = result
-        if result:
-            job["message"] = (
-                f"{job.get('label', 'Forecast')} updated: {result} points."
-            )
-        else:
-            job["message"] = f"{job.get('label', 'Forecast')} completed."
+        _finish_job(job, result, error_message)
+        _JOB_FINISHED.notify_all()
 
 
 def get_job_status(job_key: str, job_type: str, label: str) -> dict[str, Any]:
+    if _CELERY is not None:
+        return _celery_job_status(job_key, job_type, label)
     with _JOB_LOCK:
         job = _JOBS.get(job_key)
         if not job:
-            return {
-                "job_key": job_key,
-                "job_type": job_type,
-                "label": label,
-                "state": "idle",
-                "message": "",
-            }
+            return _idle_job(job_key, job_type, label)
         return dict(job)
+
+
+def wait_for_job(
+    job_key: str, job_type: str, label: str, timeout: float
+) -> dict[str, Any]:
+    # Long-poll support: hold the request until the job leaves "running" or
+    # the timeout expires, instead of the client re-polling every few seconds.
+    if _CELERY is not None:
+        deadline = time.monotonic() + timeout
+        while True:
+            job = _celery_job_status(job_key, job_type, label)
+            remaining = deadline - time.monotonic()
+            if job["state"] != "running" or remaining <= 0:
+                return job
+            time.sleep(min(CELERY_WAIT_INTERVAL, remaining))
+    with _JOB_FINISHED:
+        _JOB_FINISHED.wait_for(
+            lambda: (_JOBS.get(job_key) or {}).get("state") != "running",
+            timeout,
+        )
+    return get_job_status(job_key, job_type, label)
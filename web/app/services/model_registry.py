@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import date
+from functools import lru_cache
 import hashlib
 import json
 import logging
@@ -21,36 +22,69 @@ except ImportError:  # pragma: no cover - optional dependency fallback
 logger = logging.getLogger(__name__)
 
 
-def _normalize_config(value: Any) -> Any:
+def _freeze_config(value: Any) -> Any:
+    # Sorted, hashable form of the config; leaves carry their type so that
+    # 1, 1.0 and True do not share a cache entry (they serialize differently).
     if isinstance(value, dict):
-        return {str(key): _normalize_config(value[key]) for key in sorted(value)}
+        return (
+            "dict",
+            tuple((str(key), _freeze_config(value[key])) for key in sorted(value)),
+        )
     if isinstance(value, (list, tuple)):
-        return [_normalize_config(item) for item in value]
-    return value
+        return ("list", tuple(_freeze_config(item) for item in value))
+    return (type(value), value)
 
 
-def _default_work_dir() -> str:
-    return os.environ.get("DARTS_WORK_DIR", "/var/lib/app/darts")
+def _thaw_config(frozen: Any) -> Any:
+    kind, value = frozen
+    if kind == "dict":
+        return {key: _thaw_config(item) for key, item in value}
+    if kind == "list":
+        return [_thaw_config(item) for item in value]
+    return value
 
 
-def canonical_model_key(
+@lru_cache(maxsize=1024)
+def _model_digest(
     scope: str,
     model_family: str,
     cell_type: str,
     horizon_days: int,
     transform: str,
-    hyperparams: dict[str, Any],
-) -> tuple[str, str, str]:
+    frozen_hyperparams: Any,
+) -> str:
     payload = {
         "scope": scope,
         "model_family": model_family,
         "cell_type": cell_type,
         "horizon_days": horizon_days,
         "transform": transform,
-        "hyperparams": _normalize_config(hyperparams),
+        "hyperparams": _thaw_config(frozen_hyperparams),
     }
     encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
-    digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:8]
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:8]
+
+
+def _default_work_dir() -> str:
+    return os.environ.get("DARTS_WORK_DIR", "/var/lib/app/darts")
+
+
+def canonical_model_key(
+    scope: str,
+    model_family: str,
+    cell_type: str,
+    horizon_days: int,
+    transform: str,
+    hyperparams: dict[str, Any],
+) -> tuple[str, str, str]:
+    digest = _model_digest(
+        scope,
+        model_family,
+        cell_type,
+        horizon_days,
+        transform,
+        _freeze_config(hyperparams),
+    )
     scope_slug = "global" if scope == "global_shared" else "percrypto"
     family_slug = "blockrnn" if model_family == "BlockRNNModel" else "rnn"
     cell_slug = cell_type.lower()
@@ -5,10 +5,11 @@ from decimal import Decimal
 import time as time_module
 from typing import Any
 
+import numpy as np
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy import func, select
 
-from ..db import get_session
+from ..db import bulk_upsert_prices, bump_prices_version, get_session
 from ..models import Cryptocurrency, Price
 from .coingecko import CoinGeckoClient, CoinGeckoError
 from .coincap import CoincapClient, CoincapError
@@ -58,6 +59,7 @@ def _upsert_price(
         set_={"price": price_decimal},
     )
     session.execute(stmt)
+    bump_prices_version(session, [crypto_id])
 
 
 def _price_exists(session, crypto_id: int, as_of: date) -> bool:
@@ -72,6 +74,19 @@ def _price_exists(session, crypto_id: int, as_of: date) -> bool:
     )
 
 
+def _price_date_bounds(
+    session, crypto_id: int
+) -> tuple[date | None, date | None]:
+    # MIN and MAX in one pass over the (crypto_id, date) index.
+    return tuple(
+        session.execute(
+            select(func.min(Price.date), func.max(Price.date)).where(
+                Price.crypto_id == crypto_id
+            )
+        ).one()
+    )
+
+
 def update_crypto_price(
     session,
     client: CoinGeckoClient,
@@ -172,21 +187,36 @@ def _fetch_daily_prices_range_coingecko(
     return by_date
 
 
+def _missing_day_ordinals(
+    start_date: date, end_date: date, existing_dates: set[date]
+) -> np.ndarray:
+    days = np.arange(start_date.toordinal(), end_date.toordinal() + 1)
+    existing = np.fromiter(
+        (day.toordinal() for day in existing_dates),
+        dtype=days.dtype,
+        count=len(existing_dates),
+    )
+    return days[~np.isin(days, existing)]
+
+
+def _ordinal_ranges(ordinals: np.ndarray) -> list[tuple[date, date]]:
+    if ordinals.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(ordinals) != 1) + 1
+    starts = ordinals[np.concatenate(([0], breaks))]
+    ends = ordinals[np.concatenate((breaks - 1, [ordinals.size - 1]))]
+    return [
+        (date.fromordinal(range_start), date.fromordinal(range_end))
+        for range_start, range_end in zip(starts.tolist(), ends.tolist())
+    ]
+
+
 def _compute_missing_ranges(
     start_date: date, end_date: date, existing_dates: set[date]
 ) -> list[tuple[date, date]]:
-    missing_ranges: list[tuple[date, date]] = []
-    current = start_date
-    while current <= end_date:
-        if current not in existing_dates:
-            range_start = current
-            while current <= end_date and current not in existing_dates:
-                current += timedelta(days=1)
-            range_end = current - timedelta(days=1)
-            missing_ranges.append((range_start, range_end))
-        else:
-            current += timedelta(days=1)
-    return missing_ranges
+    return _ordinal_ranges(
+        _missing_day_ordinals(start_date, end_date, existing_dates)
+    )
 
 
 def _split_date_range(
@@ -207,19 +237,50 @@ def _split_date_range(
 def _split_ranges_by_boundary(
     ranges: list[tuple[date, date]], boundary: date
 ) -> tuple[list[tuple[date, date]], list[tuple[date, date]]]:
-    historical: list[tuple[date, date]] = []
-    recent: list[tuple[date, date]] = []
-    for range_start, range_end in ranges:
-        if range_end < boundary:
-            historical.append((range_start, range_end))
-        elif range_start >= boundary:
-            recent.append((range_start, range_end))
-        else:
-            historical.append((range_start, boundary - timedelta(days=1)))
-            recent.append((boundary, range_end))
+    if not ranges:
+        return [], []
+    bounds = np.array(ranges, dtype="datetime64[D]")
+    starts, ends = bounds[:, 0], bounds[:, 1]
+    boundary64 = np.datetime64(boundary, "D")
+    # A range straddling the boundary contributes to both sides, clipped.
+    historical_mask = starts < boundary64
+    recent_mask = ends >= boundary64
+    historical = list(
+        zip(
+            starts[historical_mask].tolist(),
+            np.minimum(ends[historical_mask], boundary64 - 1).tolist(),
+        )
+    )
+    recent = list(
+        zip(
+            np.maximum(starts[recent_mask], boundary64).tolist(),
+            ends[recent_mask].tolist(),
+        )
+    )
     return historical, recent
 
 
+def _insert_missing_prices(
+    session,
+    crypto_id: int,
+    by_date: dict[date, Decimal],
+    existing_dates: set[date],
+) -> int:
+    # Callers already drop known dates; the database skips any that raced in.
+    records = [
+        {"crypto_id": crypto_id, "date": day, "price": price}
+        for day, price in by_date.items()
+    ]
+    try:
+        inserted = bulk_upsert_prices(session, records)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    existing_dates.update(by_date.keys())
+    return inserted
+
+
 def backfill_historical_prices(
     crypto_id: int,
     client: CoinGeckoClient,
@@ -256,12 +317,7 @@ def backfill_historical_prices(
     if not crypto:
         raise ValueError("Crypto not found")
 
-    latest_date = session.execute(
-        select(func.max(Price.date)).where(Price.crypto_id == crypto_id)
-    ).scalar_one_or_none()
-    earliest_date = session.execute(
-        select(func.min(Price.date)).where(Price.crypto_id == crypto_id)
-    ).scalar_one_or_none()
+    earliest_date, latest_date = _price_date_bounds(session, crypto_id)
 
     anchor_latest = latest_date or (today - timedelta(days=1))
     min_allowed_date = anchor_latest - timedelta(days=max_days - 1)
@@ -308,27 +364,6 @@ def backfill_historical_prices(
     if coincap_request_delay is None:
         coincap_request_delay = request_delay
 
-    def persist_prices(by_date: dict[date, Decimal]) -> int:
-        if not by_date:
-            return 0
-        records = [
-            {"crypto_id": crypto.id, "date": day, "price": price}
-            for day, price in by_date.items()
-        ]
-        stmt = insert(Price).values(records)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=[Price.crypto_id, Price.date],
-            set_={"price": stmt.excluded.price},
-        )
-        try:
-            session.execute(stmt)
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        existing_dates.update(by_date.keys())
-        return len(records)
-
     for idx, (range_start, range_end) in enumerate(request_ranges):
         from_ts = _to_timestamp_ms(range_start, end_of_day=False)
         to_ts = _to_timestamp_ms(range_end, end_of_day=True)
@@ -351,7 +386,9 @@ def backfill_historical_prices(
                 if dt in existing_dates:
                     continue
                 by_date[dt] = Decimal(str(price))
-            inserted_total += persist_prices(by_date)
+            inserted_total += _insert_missing_prices(
+                session, crypto.id, by_date, existing_dates
+            )
 
         requested += 1
         ranges_info.append(
@@ -373,12 +410,7 @@ def _load_missing_price_info(session, crypto_id: int) -> dict[str, Any]:
     if not crypto:
         raise ValueError("Crypto not found")
 
-    start_date = session.execute(
-        select(func.min(Price.date)).where(Price.crypto_id == crypto_id)
-    ).scalar_one_or_none()
-    end_date = session.execute(
-        select(func.max(Price.date)).where(Price.crypto_id == crypto_id)
-    ).scalar_one_or_none()
+    start_date, end_date = _price_date_bounds(session, crypto_id)
     if not start_date or not end_date:
         return {
             "crypto": crypto,
@@ -399,13 +431,9 @@ def _load_missing_price_info(session, crypto_id: int) -> dict[str, Any]:
         .where(Price.date <= end_date)
     ).all()
     existing_dates = {row[0] for row in rows}
-    missing_ranges = _compute_missing_ranges(start_date, end_date, existing_dates)
-    missing_dates: list[date] = []
-    for range_start, range_end in missing_ranges:
-        current = range_start
-        while current <= range_end:
-            missing_dates.append(current)
-            current += timedelta(days=1)
+    missing_ordinals = _missing_day_ordinals(start_date, end_date, existing_dates)
+    missing_ranges = _ordinal_ranges(missing_ordinals)
+    missing_dates = [date.fromordinal(day) for day in missing_ordinals.tolist()]
 
     total_days = (end_date - start_date).days + 1
     stored_days = len(existing_dates)
@@ -476,27 +504,6 @@ def fill_missing_prices(
     requested = 0
     ranges_info: list[dict[str, str]] = []
 
-    def persist_prices(by_date: dict[date, Decimal]) -> int:
-        if not by_date:
-            return 0
-        records = [
-            {"crypto_id": crypto.id, "date": day, "price": price}
-            for day, price in by_date.items()
-        ]
-        stmt = insert(Price).values(records)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=[Price.crypto_id, Price.date],
-            set_={"price": stmt.excluded.price},
-        )
-        try:
-            session.execute(stmt)
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        existing_dates.update(by_date.keys())
-        return len(records)
-
     for idx, (range_start, range_end) in enumerate(request_ranges):
         from_ts = _to_timestamp_ms(range_start, end_of_day=False)
         to_ts = _to_timestamp_ms(range_end, end_of_day=True)
@@ -519,7 +526,9 @@ def fill_missing_prices(
                 if dt in existing_dates:
                     continue
                 by_date[dt] = Decimal(str(price))
-            inserted_total += persist_prices(by_date)
+            inserted_total += _insert_missing_prices(
+                session, crypto.id, by_date, existing_dates
+            )
 
         requested += 1
         ranges_info.append(
@@ -601,13 +610,9 @@ def update_daily_prices(
             if not by_date:
                 skipped += 1
                 continue
-            records = [
-                Price(crypto_id=crypto.id, date=day, price=price)
-                for day, price in sorted(by_date.items())
-            ]
-            session.add_all(records)
-            session.commit()
-            inserted_total += len(records)
+            inserted_total += _insert_missing_prices(
+                session, crypto.id, by_date, set()
+            )
             updated += 1
         except Exception as exc:
             session.rollback()
@@ -67,11 +67,16 @@ def store_prophet_forecast(
 def fetch_prophet_forecast(
     session, crypto_id: int, start_date: date | None
 ) -> list[dict[str, Any]]:
-    stmt = select(ProphetForecast).where(ProphetForecast.crypto_id == crypto_id)
+    stmt = select(
+        ProphetForecast.date,
+        ProphetForecast.yhat,
+        ProphetForecast.yhat_lower,
+        ProphetForecast.yhat_upper,
+    ).where(ProphetForecast.crypto_id == crypto_id)
     if start_date is not None:
         stmt = stmt.where(ProphetForecast.date >= start_date)
     stmt = stmt.order_by(ProphetForecast.date.asc())
-    rows = session.execute(stmt).scalars().all()
+    rows = session.execute(stmt).all()
 
     return [
         {
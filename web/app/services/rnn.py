@@ -602,11 +602,13 @@ def _fetch_forecast(
     crypto_id: int,
     start_date: date | None,
 ) -> list[dict[str, Any]]:
-    stmt = select(table).where(table.crypto_id == crypto_id)
+    stmt = select(
+        table.date, table.yhat, table.yhat_lower, table.yhat_upper
+    ).where(table.crypto_id == crypto_id)
     if start_date is not None:
         stmt = stmt.where(table.date >= start_date)
     stmt = stmt.order_by(table.date.asc())
-    rows = session.execute(stmt).scalars().all()
+    rows = session.execute(stmt).all()
     return [
         {
             "date": row.date.isoformat(),
@@ -1,10 +1,30 @@
 from datetime import date, timedelta
 
-from sqlalchemy import select
+import numpy as np
+from flask import g, has_app_context
+from sqlalchemy import func, select
 
 from ..models import Price
 
 
+def current_date() -> date:
+    # Pinned on the app context so every window computed while serving one
+    # request agrees, even if midnight passes mid-render.
+    if not has_app_context():
+        return date.today()
+    today = g.get("_today")
+    if today is None:
+        today = g._today = date.today()
+    return today
+
+
+def window_start(days: int) -> date | None:
+    # Oldest date of a trailing window; None means the full history.
+    if days <= 0:
+        return None
+    return current_date() - timedelta(days=days)
+
+
 def clamp_days(days_raw: str, max_days: int) -> int:
     days = int(days_raw) if days_raw.isdigit() else 0
     if days > max_days:
@@ -12,12 +32,71 @@ def clamp_days(days_raw: str, max_days: int) -> int:
     return days
 
 
-def fetch_price_series(session, crypto_id: int, days: int) -> list[dict[str, object]]:
+def _price_series_query(crypto_id: int, days: int):
     query = select(Price.date, Price.price).where(Price.crypto_id == crypto_id)
-    if days > 0:
-        start_date = date.today() - timedelta(days=days)
+    start_date = window_start(days)
+    if start_date is not None:
+        query = query.where(Price.date >= start_date)
+    return query.order_by(Price.date.asc())
+
+
+def fetch_price_series(session, crypto_id: int, days: int) -> list[dict[str, object]]:
+    # Plain row tuples straight off the cursor; no RowMapping per row.
+    return [
+        {"date": price_date, "price": float(price)}
+        for price_date, price in session.execute(
+            _price_series_query(crypto_id, days)
+        )
+    ]
+
+
+def fetch_price_arrays(
+    session, crypto_id: int, days: int
+) -> tuple[np.ndarray, np.ndarray]:
+    # Column arrays for the vectorized indicators, skipping the per-row dicts.
+    rows = session.execute(_price_series_query(crypto_id, days)).all()
+    dates = np.array([row[0] for row in rows], dtype="datetime64[D]")
+    prices = np.fromiter(
+        (row[1] for row in rows), dtype=np.float64, count=len(rows)
+    )
+    return dates, prices
+
+
+def fetch_price_series_many(
+    session, crypto_ids: list[int], days: int
+) -> dict[int, list[dict[str, object]]]:
+    if not crypto_ids:
+        return {}
+    query = select(Price.crypto_id, Price.date, Price.price).where(
+        Price.crypto_id.in_(crypto_ids)
+    )
+    start_date = window_start(days)
+    if start_date is not None:
         query = query.where(Price.date >= start_date)
-    query = query.order_by(Price.date.asc())
+    query = query.order_by(Price.crypto_id.asc(), Price.date.asc())
+
+    series: dict[int, list[dict[str, object]]] = {}
+    for crypto_id, price_date, price in session.execute(query):
+        series.setdefault(crypto_id, []).append(
+            {"date": price_date, "price": float(price)}
+        )
+    return series
 
-    rows = session.execute(query).mappings().all()
-    return [{"date": row["date"], "price": float(row["price"])} for row in rows]
+
+def crypto_ids_with_min_prices(
+    session, crypto_ids: list[int], days: int, minimum: int
+) -> list[int]:
+    # One grouped COUNT for the whole batch; keeps the caller's order.
+    if not crypto_ids:
+        return []
+    query = (
+        select(Price.crypto_id)
+        .where(Price.crypto_id.in_(crypto_ids))
+        .group_by(Price.crypto_id)
+        .having(func.count() >= minimum)
+    )
+    start_date = window_start(days)
+    if start_date is not None:
+        query = query.where(Price.date >= start_date)
+    eligible = set(session.execute(query).scalars())
+    return [crypto_id for crypto_id in crypto_ids if crypto_id in eligible]
@@ -101,6 +101,7 @@ document.addEventListener("DOMContentLoaded", () => {
   };
 
   const jobPollers = new Map();
+  const jobWaitSeconds = 25;
   const jobToasts = new Map();
   const jobSpinnerHtml =
     '<span class="spinner-border spinner-border-sm me-2" role="status" aria-hidden="true"></span>';
@@ -137,7 +138,7 @@ document.addEventListener("DOMContentLoaded", () => {
   const stopJobPolling = (jobType) => {
     const poller = jobPollers.get(jobType);
     if (poller) {
-      clearInterval(poller);
+      poller.stopped = true;
       jobPollers.delete(jobType);
     }
     const toast = jobToasts.get(jobType);
@@ -165,37 +166,49 @@ document.addEventListener("DOMContentLoaded", () => {
     }
     setJobGroupDisabled(jobGroup, true);
 
+    // Long-poll: the server holds each request until the job leaves the
+    // running state (or its wait cap), so one request replaces many polls.
+    const poller = { stopped: false };
+    jobPollers.set(jobType, poller);
+    const separator = statusUrl.includes("?") ? "&" : "?";
+    const waitUrl = `${statusUrl}${separator}wait=${jobWaitSeconds}`;
     const poll = async () => {
-      try {
-        const response = await fetch(statusUrl, {
-          headers: { Accept: "application/json" },
-        });
-        if (!response.ok) {
-          return;
-        }
-        const payload = await response.json();
-        if (!payload || payload.state === "running") {
+      while (!poller.stopped) {
+        try {
+          const response = await fetch(waitUrl, {
+            headers: { Accept: "application/json" },
+          });
+          if (!response.ok) {
+            await new Promise((resolve) => setTimeout(resolve, 3000));
+            continue;
+          }
+          const payload = await response.json();
+          if (poller.stopped) {
+            return;
+          }
+          if (!payload || payload.state === "running") {
+            continue;
+          }
+          stopJobPolling(jobType);
+          if (payload.state === "done") {
+            showToast(payload.message || doneMessage, "success");
+            window.location.reload();
+            return;
+          }
+          if (payload.state === "error") {
+            showToast(payload.message || errorMessage, "danger");
+          }
+          setJobGroupDisabled(jobGroup, false);
           return;
-        }
-        stopJobPolling(jobType);
-        if (payload.state === "done") {
-          showToast(payload.message || doneMessage, "success");
-          window.location.reload();
+        } catch (error) {
+          stopJobPolling(jobType);
+          showToast(errorMessage, "danger");
+          setJobGroupDisabled(jobGroup, false);
           return;
         }
-        if (payload.state === "error") {
-          showToast(payload.message || errorMessage, "danger");
-        }
-        setJobGroupDisabled(jobGroup, false);
-      } catch (error) {
-        stopJobPolling(jobType);
-        showToast(errorMessage, "danger");
-        setJobGroupDisabled(jobGroup, false);
       }
     };
 
-    const interval = setInterval(poll, 3000);
-    jobPollers.set(jobType, interval);
     poll();
   };
 
@@ -61,15 +61,17 @@ if (rangeSelect && rangeSelect.form) {
   }
 }
 
-if (chartEl) {
-  const series = JSON.parse(chartEl.dataset.series || "[]");
+const renderChart = (payload) => {
+  const series = Array.isArray(payload.series) ? payload.series : [];
   const currency = chartEl.dataset.currency || "USD";
   if (series.length) {
     const dates = series.map((row) => row.date);
     const prices = series.map((row) => row.price);
     const sma50 = series.map((row) => row.sma_50);
     const sma20 = series.map((row) => row.sma_20);
-    const seriesPadding = JSON.parse(chartEl.dataset.seriesPadding || "[]");
+    const seriesPadding = Array.isArray(payload.series_padding)
+      ? payload.series_padding
+      : [];
     const paddingPrices = seriesPadding.map((row) => row.price);
     const buildEmaWithPadding = (period) => {
       const paddingNeeded = Math.max(period - 1, 0);
@@ -113,14 +115,14 @@ if (chartEl) {
     const ema50 = buildEmaWithPadding(50);
     const bbUpper = series.map((row) => row.bb_upper);
     const bbLower = series.map((row) => row.bb_lower);
-    const prophetForecastRaw = JSON.parse(chartEl.dataset.prophet || "[]");
-    const prophetForecast = Array.isArray(prophetForecastRaw)
-      ? prophetForecastRaw
-      : [];
-    const lstmForecastRaw = JSON.parse(chartEl.dataset.lstm || "[]");
-    const lstmForecast = Array.isArray(lstmForecastRaw) ? lstmForecastRaw : [];
-    const gruForecastRaw = JSON.parse(chartEl.dataset.gru || "[]");
-    const gruForecast = Array.isArray(gruForecastRaw) ? gruForecastRaw : [];
+    const forecastBundle = (name) => payload[name] || {};
+    const forecastRows = (name) => {
+      const rows = forecastBundle(name).forecast;
+      return Array.isArray(rows) ? rows : [];
+    };
+    const prophetForecast = forecastRows("prophet");
+    const lstmForecast = forecastRows("lstm");
+    const gruForecast = forecastRows("gru");
     const toNumber = (value) =>
       value === null || value === undefined ? null : Number(value);
     const chartColors = {
@@ -154,12 +156,12 @@ if (chartEl) {
       rnn: 1.6,
       rnnHistory: 1.2,
     };
-    const prophetCutoff = chartEl.dataset.prophetCutoff || null;
-    const prophetLineDate = chartEl.dataset.prophetLine || null;
-    const lstmCutoff = chartEl.dataset.lstmCutoff || null;
-    const lstmLineDate = chartEl.dataset.lstmLine || null;
-    const gruCutoff = chartEl.dataset.gruCutoff || null;
-    const gruLineDate = chartEl.dataset.gruLine || null;
+    const prophetCutoff = forecastBundle("prophet").cutoff || null;
+    const prophetLineDate = prophetCutoff;
+    const lstmCutoff = forecastBundle("lstm").cutoff || null;
+    const lstmLineDate = lstmCutoff;
+    const gruCutoff = forecastBundle("gru").cutoff || null;
+    const gruLineDate = gruCutoff;
     const buildForecastTraces = ({
       rows,
       cutoffDate,
@@ -1076,4 +1078,19 @@ if (chartEl) {
     applyToggleState(priceModeToggle, "priceMode");
     applyToggleState(rulerToggle, "ruler");
   }
+};
+
+if (chartEl && chartEl.dataset.url) {
+  // The page ships without chart data; the browser revalidates this request
+  // with its ETag, so unchanged series come back as 304. The <link
+  // rel="preload"> in the head starts it while Plotly is still downloading;
+  // keep the request mode and headers identical so the preload is reused.
+  fetch(chartEl.dataset.url, { credentials: "same-origin" })
+    .then((response) => (response.ok ? response.json() : null))
+    .then((payload) => {
+      if (payload) {
+        renderChart(payload);
+      }
+    })
+    .catch(() => {});
 }